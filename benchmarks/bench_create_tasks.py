@@ -0,0 +1,80 @@
+"""Benchmark `TaskScheduler.create_tasks` against a loop of `create_task` calls.
+
+Each `create_task` call looks its folder up by name from the root folder and lists the
+folder before registering, `create_tasks` looks each folder up once and reuses the
+folder handle, on the calling thread or on a pool of threads with their own connections.
+By default `create_tasks` registers each task with a single `RegisterTask` call of its
+compiled xml, `method="com"` builds each definition a property at a time instead.
+Use `--latency` to give each simulated COM call the cost of a round trip.
+
+    python benchmarks/bench_create_tasks.py --tasks 300 --latency 0.0005
+"""
+import argparse
+import time
+from dataclasses import astuple
+from datetime import date, time as dtime
+from pytask_scheduler import TaskScheduler, TaskSpec, MemoryBackend
+
+def specs(count: int, folder_count: int) -> list[TaskSpec]:
+    return [
+        TaskSpec(
+            task_name=f"etl{i}",
+            folder_name=f"Pipeline{i % folder_count}",
+            trigger_type="daily",
+            start_date=date(2024, 9, 1),
+            start_time=dtime(1 + i % 4, i % 60),
+            action_file=f"C:\\etl\\job{i}.exe",
+            days_interval=1,
+            action_arg="--run",
+            task_description=f"Pipeline job {i}",
+            execution_time_limit="PT2H"
+        )
+        for i in range(count)
+    ]
+
+def run(name, fn, backend):
+    backend.calls.clear()
+    start = time.perf_counter()
+    fn()
+    print(f"{name:<18} {time.perf_counter() - start:8.2f} s  calls={sum(backend.calls.values())}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--folders", type=int, default=5, help="pipeline folders the tasks go to")
+    parser.add_argument("--tree", type=int, default=500, help="folders already in the tree")
+    parser.add_argument("--latency", type=float, default=0.0005, help="seconds per simulated COM call")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    backend = MemoryBackend(args.tree, 2, latency=args.latency)
+    scheduler = TaskScheduler(backend=backend)
+    for i in range(args.folders):
+        scheduler.root_folder.CreateFolder(f"Pipeline{i}")
+    task_specs = specs(args.tasks, args.folders)
+
+    # create_task takes the spec attributes positionally in its own order.
+    def create_task_loop():
+        for spec in task_specs:
+            (task_name, folder_name, trigger_type, start_date, start_time, action_file,
+             days_interval, weeks_interval, days_of_week, days_of_month, months_of_year,
+             weeks_of_month, action_type, action_arg, action_working_dir, task_description,
+             *settings) = astuple(spec)
+            scheduler.create_task(
+                folder_name, trigger_type, start_date, start_time, days_interval,
+                weeks_interval, days_of_week, days_of_month, months_of_year, weeks_of_month,
+                action_type, action_arg, action_file, action_working_dir, task_name,
+                task_description, *settings
+            )
+
+    run("create_task loop", create_task_loop, backend)
+    for method in ("com", "xml"):
+        run(f"create_tasks {method}", lambda: scheduler.create_tasks(task_specs, method=method), backend)
+        run(
+            f"  {args.workers} threads",
+            lambda: scheduler.create_tasks(task_specs, workers=args.workers, method=method),
+            backend
+        )
+
+if __name__ == "__main__":
+    main()
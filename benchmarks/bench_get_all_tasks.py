@@ -0,0 +1,75 @@
+"""Benchmark `TaskScheduler.get_all_tasks` against a synthetic folder tree.
+
+The previous enumeration looked every subfolder up again by name from the root
+folder, which is reproduced here as the baseline. The baseline is timed on a tree
+with unique folder names, then both are run on a tree where folder names repeat.
+The single pass is also run reading each task definition property over COM instead
+of from the task xml, and on a pool of worker threads with their own connections.
+The frame listed by the worker threads is checked to equal the single pass frame,
+row for row. Use `--latency` to give each simulated COM call the cost of a round trip.
+
+    python benchmarks/bench_get_all_tasks.py --folders 5000
+"""
+import argparse
+import time
+import polars as pl
+from pytask_scheduler import TaskScheduler, MemoryBackend
+
+def name_lookup_walk(scheduler: TaskScheduler) -> pl.DataFrame:
+    """The enumeration before the single pass walk, finding each subfolder by name."""
+    tasks_info_list = []
+
+    def walk(folder):
+        for t in folder.tasks:
+            tasks_info_list.append(folder.get_task(t).info("com"))
+        for sf in folder.subfolders:
+            walk(scheduler.get_folder(sf))
+
+    walk(scheduler.get_folder())
+    return pl.DataFrame(tasks_info_list)
+
+def run(name, fn, service):
+    service.calls.clear()
+    start = time.perf_counter()
+    try:
+        df = fn()
+    except RecursionError:
+        print(f"{name:<12} did not terminate, a subfolder name resolved to one of its ancestors")
+        return None
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<12} {elapsed:8.2f} s  tasks={df.height:<6} "
+        f"distinct paths={df['task_path'].n_unique():<6} "
+        f"GetFolders={service.calls['GetFolders']:<9} GetTasks={service.calls['GetTasks']:<6} "
+        f"property reads={service.calls['property']}"
+    )
+    return df
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folders", type=int, default=5000)
+    parser.add_argument("--tasks-per-folder", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per simulated COM call")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    for distinct_names in (None, args.folders // 10):
+        service = MemoryBackend(
+            args.folders,
+            args.tasks_per_folder,
+            distinct_names=distinct_names,
+            latency=args.latency
+        )
+        scheduler = TaskScheduler(backend=service)
+        print(f"{args.folders} folders, " + ("unique names" if distinct_names is None else f"{distinct_names} distinct names"))
+
+        serial = run("single pass", lambda: scheduler.get_all_tasks(workers=1), service)
+        run("  com info", lambda: scheduler.get_all_tasks(source="com"), service)
+        threaded = run(f"  {args.workers} threads", lambda: scheduler.get_all_tasks(workers=args.workers), service)
+        assert threaded.equals(serial), "the threaded listing differs from the single pass"
+        if not args.skip_baseline:
+            run("name lookup", lambda: name_lookup_walk(scheduler), service)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark the cold start of `import pytask_scheduler` and of its first used features.
+
+Each statement runs in a fresh interpreter, timed over `--repeat` runs keeping the fastest,
+and lists the heavy dependencies it loaded. The last statement imports every subpackage,
+which is what `import pytask_scheduler` cost before the subpackages were loaded lazily.
+
+    python benchmarks/bench_import.py --repeat 5
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+STATEMENTS = [
+    "import pytask_scheduler",
+    "from pytask_scheduler import EventIDs, TaskTriggerTypes",
+    "from pytask_scheduler import MemoryBackend",
+    "from pytask_scheduler import TasksDataFrame",
+    "from pytask_scheduler import TaskScheduler",
+    "from pytask_scheduler import get_task_scheduler_history",
+    "import pytask_scheduler.objects, pytask_scheduler.functions, pytask_scheduler.store"
+]
+
+HEAVY_MODULES = ["polars", "Evtx", "win32com", "pythoncom"]
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+def time_statement(statement: str, repeat: int) -> tuple[float, list]:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(out.stdout))
+    return min(runs)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for statement in STATEMENTS:
+        elapsed, loaded = time_statement(statement, args.repeat)
+        print(f"{statement:<86} {elapsed * 1000:8.1f} ms  loads {', '.join(loaded) or '-'}")
+
+if __name__ == "__main__":
+    main()
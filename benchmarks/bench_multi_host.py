@@ -0,0 +1,67 @@
+"""Benchmark `MultiHostScheduler.get_all_tasks` against simulated remote computers.
+
+Each host is a synthetic folder tree behind a connection latency, a few hosts refuse
+the connection and one never answers. The hosts are listed one after another, the
+way a loop over `TaskScheduler` instances would, and then concurrently.
+
+    python benchmarks/bench_multi_host.py --hosts 50 --connect-latency 0.2
+"""
+import argparse
+import time
+import polars as pl
+from pytask_scheduler import MultiHostScheduler, TaskScheduler, MemoryBackend
+
+def sequential(backend: MemoryBackend, hosts: list[str], skip: set) -> pl.DataFrame:
+    """Lists each host in turn, hosts known to hang are skipped so the loop ends."""
+    frames = []
+    for host in hosts:
+        if host in skip:
+            continue
+        try:
+            scheduler = TaskScheduler(backend=backend, client=backend.connect(host))
+        except ConnectionError:
+            continue
+        frames.append(scheduler.get_all_tasks().with_columns(pl.lit(host).alias("host")))
+    return pl.concat(frames)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=50)
+    parser.add_argument("--folders", type=int, default=50)
+    parser.add_argument("--connect-latency", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per simulated COM call")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    hosts = [f"HOST{i:03}" for i in range(args.hosts)]
+    failing = hosts[1::10]
+    hanging = hosts[:1]
+    backend = MemoryBackend(
+        args.folders,
+        2,
+        latency=args.latency,
+        connect_latency={h: 3600 if h in hanging else args.connect_latency for h in hosts},
+        unreachable=failing
+    )
+
+    start = time.perf_counter()
+    df = sequential(backend, hosts, set(hanging))
+    print(
+        f"{'sequential':<12} {time.perf_counter() - start:8.2f} s  tasks={df.height:<7} "
+        f"hosts={df['host'].n_unique()} (hanging host skipped by hand)"
+    )
+
+    scheduler = MultiHostScheduler(
+        hosts, workers=args.workers, timeout=args.timeout, backend=backend
+    )
+    start = time.perf_counter()
+    df = scheduler.get_all_tasks()
+    print(
+        f"{'concurrent':<12} {time.perf_counter() - start:8.2f} s  tasks={df.height:<7} "
+        f"hosts={df['host'].n_unique()} failed={len(scheduler.errors)} "
+        f"timed out={sum(isinstance(e, TimeoutError) for e in scheduler.errors.values())}"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the live tail of `watch_task_scheduler_history` against polling by a full reread.
+
+A synthetic event log starts with `--backlog` events, then `--rate` events a second are
+appended to it and flushed for `--seconds` seconds, the way the Task Scheduler service
+grows its log. The watcher only decodes the appended records, its delivery latency is
+measured from each flush to the callback and its CPU time from its thread. Polling
+rereads the whole log at every interval, its CPU time is one full read per interval.
+
+    python benchmarks/bench_tail.py --backlog 20000 --rate 50 --seconds 10
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+from itertools import islice
+from evtx_writer import EvtxWriter
+from fixtures import task_events
+from pytask_scheduler import get_task_scheduler_history, watch_task_scheduler_history
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backlog", type=int, default=20_000, help="events in the log before the watch")
+    parser.add_argument("--rate", type=int, default=50, help="events appended a second")
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    fpath = os.path.join(tempfile.mkdtemp(), "live.evtx")
+    events = task_events(args.backlog + args.rate * args.seconds)
+    writer = EvtxWriter(fpath)
+    writer.add(islice(events, args.backlog)).flush()
+
+    flushed = {}
+    latencies = []
+    cpu = [0.0]
+    def callback(batch):
+        now = time.monotonic()
+        latencies.extend(now - flushed[int(i)] for i in batch["Event Record ID"])
+        cpu[0] = time.thread_time()
+
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=watch_task_scheduler_history,
+        args=(callback,),
+        kwargs={"evt_fpath":fpath, "interval":args.interval, "stop":stop}
+    )
+    watcher.start()
+    time.sleep(args.interval)
+    for _ in range(args.seconds * 10):
+        first = writer.next_record
+        writer.add(islice(events, args.rate // 10))
+        flushed.update(dict.fromkeys(range(first, writer.next_record), time.monotonic()))
+        writer.flush()
+        time.sleep(0.1)
+    time.sleep(args.interval * 2)
+    stop.set()
+    watcher.join()
+
+    latencies.sort()
+    print(f"events delivered       {len(latencies):>8} of {len(flushed)}")
+    print(f"latency p50 / max      {latencies[len(latencies) // 2]:8.2f} / {latencies[-1]:.2f} s")
+    print(f"watch CPU              {cpu[0]:8.2f} s")
+
+    start = time.process_time()
+    get_task_scheduler_history(evt_fpath=fpath)
+    full_read = time.process_time() - start
+    polls = args.seconds / args.interval
+    print(f"full reread CPU        {full_read * polls:8.2f} s  ({polls:.0f} reads of {full_read:.2f} s)")
+
+if __name__ == "__main__":
+    main()
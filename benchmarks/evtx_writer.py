@@ -0,0 +1,351 @@
+"""Writer of synthetic Task Scheduler event logs, used by the benchmarks for EVTX fixtures.
+
+Records are written as binary xml with a System template and an EventData template per
+event id, the way the Task Scheduler provider logs them, so python-evtx and the fast
+substitution reader both parse them. Full chunks are written out as soon as they fill up,
+and `flush` writes the chunk being filled, so a file can be appended to while it is read.
+"""
+import binascii
+import hashlib
+import struct
+import uuid
+from datetime import datetime, timezone
+
+FILE_HEADER_SIZE = 0x1000
+CHUNK_SIZE = 0x10000
+CHUNK_HEADER_SIZE = 0x200
+
+EVENT_NS = "http://schemas.microsoft.com/win/2004/08/events/event"
+PROVIDER_NAME = "Microsoft-Windows-TaskScheduler"
+PROVIDER_GUID = "{de7b24ea-73c8-4a09-985d-5bdadcfa9017}"
+CHANNEL = "Microsoft-Windows-TaskScheduler/Operational"
+
+# event data names written for each event id, roughly what the provider emits.
+EVENT_DATA = {
+    100: ("TaskName", "UserContext", "InstanceId"),
+    101: ("TaskName", "UserContext", "ResultCode"),
+    102: ("TaskName", "UserContext", "InstanceId"),
+    103: ("TaskName", "UserContext", "InstanceId", "ResultCode"),
+    107: ("TaskName", "InstanceId"),
+    110: ("TaskName", "InstanceId", "UserContext"),
+    111: ("TaskName", "InstanceId"),
+    129: ("TaskName", "Path", "ProcessID", "Priority"),
+    140: ("TaskName", "UserName"),
+    200: ("TaskName", "ActionName", "TaskInstanceId", "EnginePID"),
+    201: ("TaskName", "TaskInstanceId", "ActionName", "ResultCode", "EnginePID"),
+    203: ("TaskName", "TaskInstanceId", "ActionName", "ResultCode"),
+}
+
+# variant types
+T_NULL, T_WSTRING, T_UINT8, T_UINT16, T_UINT32, T_UINT64 = 0x00, 0x01, 0x04, 0x06, 0x08, 0x0A
+T_GUID, T_FILETIME, T_HEX64, T_BXML = 0x0F, 0x11, 0x15, 0x21
+
+
+def filetime(dt: datetime) -> int:
+    """FILETIME of a datetime, naive datetimes are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - datetime(1601, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 10**7 + delta.microseconds * 10
+
+
+def name_hash(name: str) -> int:
+    """Hash of a name in the chunk string table."""
+    h = 0
+    for c in name:
+        h = (h * 65 + ord(c)) & 0xFFFF
+    return h
+
+
+class _ChunkState:
+    """Chunk being filled, with the offsets of the strings and templates it defines."""
+    def __init__(self):
+        self.buf = bytearray(CHUNK_SIZE)
+        self.pos = CHUNK_HEADER_SIZE
+        self.strings = {}
+        self.templates = {}
+        self.first = None
+        self.last = None
+        self.last_offset = 0
+
+    def snapshot(self):
+        return dict(self.strings), dict(self.templates)
+
+    def restore(self, snap):
+        self.strings, self.templates = snap
+
+
+class _Builder:
+    """Builds binary xml at a known chunk offset."""
+
+    def __init__(self, chunk: _ChunkState, base: int):
+        self.chunk = chunk
+        self.base = base
+        self.out = bytearray()
+
+    @property
+    def here(self):
+        return self.base + len(self.out)
+
+    def _name(self, name, inline_at):
+        if name in self.chunk.strings:
+            return self.chunk.strings[name], b""
+        self.chunk.strings[name] = inline_at
+        data = name.encode("utf-16-le")
+        return inline_at, struct.pack("<IHH", 0, name_hash(name), len(name)) + data + b"\x00\x00"
+
+    def element(self, node):
+        tag, attrs, children = node
+        start = len(self.out)
+        token = 0x41 if attrs else 0x01
+        self.out += struct.pack("<BHI", token, 0xFFFF, 0)
+        offset, inline = self._name(tag, self.here + 4)
+        self.out += struct.pack("<I", offset) + inline
+        if attrs:
+            attr_size_pos = len(self.out)
+            self.out += b"\x00\x00\x00\x00"
+            attr_start = len(self.out)
+            for i, (aname, value) in enumerate(attrs):
+                more = i < len(attrs) - 1
+                self.out += struct.pack("<B", 0x46 if more else 0x06)
+                offset, inline = self._name(aname, self.here + 4)
+                self.out += struct.pack("<I", offset) + inline
+                self.content(value)
+            struct.pack_into("<I", self.out, attr_size_pos, len(self.out) - attr_start)
+        if children:
+            self.out.append(0x02)
+            for child in children:
+                self.content(child)
+            self.out.append(0x04)
+        else:
+            self.out.append(0x03)
+        struct.pack_into("<I", self.out, start + 3, len(self.out) - start - 7)
+
+    def content(self, value):
+        if isinstance(value, tuple) and value[0] == "sub":
+            _, index, type_, optional = value
+            self.out += struct.pack("<BHB", 0x0E if optional else 0x0D, index, type_)
+        elif isinstance(value, str):
+            data = value.encode("utf-16-le")
+            self.out += struct.pack("<BBH", 0x05, T_WSTRING, len(value)) + data
+        else:
+            self.element(value)
+
+    def root(self, template_key, template_tree, values):
+        """values: list of (type, bytes)."""
+        self.out += b"\x0f\x01\x01\x00"
+        guid = uuid.UUID(bytes=hashlib.md5(repr(template_key).encode()).digest())
+        template_id = struct.unpack("<I", guid.bytes_le[:4])[0]
+        if template_key in self.chunk.templates:
+            self.out += struct.pack("<BBII", 0x0C, 0x01, template_id, self.chunk.templates[template_key])
+        else:
+            toff = self.here + 10
+            self.chunk.templates[template_key] = toff
+            self.out += struct.pack("<BBII", 0x0C, 0x01, template_id, toff)
+            header_pos = len(self.out)
+            self.out += struct.pack("<I", 0) + guid.bytes_le + struct.pack("<I", 0)
+            data_start = len(self.out)
+            self.out += b"\x0f\x01\x01\x00"
+            self.element(template_tree)
+            self.out.append(0x00)
+            struct.pack_into("<I", self.out, header_pos + 20, len(self.out) - data_start)
+        self.out += struct.pack("<I", len(values))
+        decl_pos = len(self.out)
+        self.out += b"\x00" * (4 * len(values))
+        for i, (type_, payload) in enumerate(values):
+            start = len(self.out)
+            if callable(payload):
+                payload(self)
+            else:
+                self.out += payload
+            struct.pack_into("<HBB", self.out, decl_pos + 4 * i, len(self.out) - start, type_, 0)
+
+
+def _sub(index, type_, optional=False):
+    return ("sub", index, type_, optional)
+
+
+# system template substitution layout, same ordering windows uses.
+_SYSTEM = [
+    ("Provider", [("Name", PROVIDER_NAME), ("Guid", PROVIDER_GUID)], []),
+    ("EventID", [], [_sub(3, T_UINT16)]),
+    ("Version", [], [_sub(4, T_UINT8)]),
+    ("Level", [], [_sub(0, T_UINT8)]),
+    ("Task", [], [_sub(1, T_UINT16)]),
+    ("Opcode", [], [_sub(2, T_UINT8)]),
+    ("Keywords", [], [_sub(5, T_HEX64)]),
+    ("TimeCreated", [("SystemTime", _sub(6, T_FILETIME))], []),
+    ("EventRecordID", [], [_sub(7, T_UINT64)]),
+    ("Correlation", [("ActivityID", _sub(8, T_GUID, True)), ("RelatedActivityID", _sub(9, T_GUID, True))], []),
+    ("Execution", [("ProcessID", _sub(10, T_UINT32)), ("ThreadID", _sub(11, T_UINT32))], []),
+    ("Channel", [], [CHANNEL]),
+    ("Computer", [], [_sub(12, T_WSTRING)]),
+    ("Security", [("UserID", _sub(13, T_NULL, True))], []),
+]
+_N_SYSTEM_SUBS = 14
+
+
+def _event_data_tree(names, first_index):
+    return ("EventData", [("Name", "TaskEvent")], [
+        ("Data", [("Name", n)], [_sub(first_index + i, T_WSTRING)]) for i, n in enumerate(names)
+    ])
+
+
+def _template(event_id, nested):
+    names = EVENT_DATA.get(event_id, ("TaskName",))
+    system = ("System", [], list(_SYSTEM))
+    if nested:
+        tree = ("Event", [("xmlns", EVENT_NS)], [system, _sub(_N_SYSTEM_SUBS, T_BXML)])
+        return names, tree, _event_data_tree(names, 0)
+    tree = ("Event", [("xmlns", EVENT_NS)], [system, _event_data_tree(names, _N_SYSTEM_SUBS)])
+    return names, tree, None
+
+
+def _wstr(s):
+    return (T_WSTRING, str(s).encode("utf-16-le"))
+
+
+class EvtxWriter:
+    """Writes task scheduler events to an EVTX file that python-evtx can read.
+
+    Events are dicts with `time`, `event_id`, `task_name` and optional `level`,
+    `activity_id` (`uuid.UUID`), `result_code`, `computer` and other event data.
+    """
+
+    def __init__(self, path, computer="SYNTHETIC-HOST", nested_event_data=(201, 102)):
+        self.path = path
+        self.computer = computer
+        self.nested = set(nested_event_data)
+        self.chunk = None
+        self.chunk_count = 0
+        self.next_record = 1
+        with open(self.path, "wb") as f:
+            f.write(self._file_header())
+
+    def _new_chunk(self):
+        if self.chunk is not None:
+            self._write_chunk()
+        self.chunk = _ChunkState()
+        self.chunk_count += 1
+        return self.chunk
+
+    def _record_bytes(self, chunk, base, event, record_num):
+        event_id = event["event_id"]
+        nested = event_id in self.nested
+        names, tree, data_tree = _template(event_id, nested)
+        ft = filetime(event["time"])
+        activity = event.get("activity_id")
+        b = _Builder(chunk, base + 0x18)
+        values = [
+            (T_UINT8, struct.pack("<B", event.get("level", 4))),
+            (T_UINT16, struct.pack("<H", event_id)),
+            (T_UINT8, struct.pack("<B", 0)),
+            (T_UINT16, struct.pack("<H", event_id)),
+            (T_UINT8, struct.pack("<B", 1)),
+            (T_HEX64, struct.pack("<Q", 0x8000000000000000)),
+            (T_FILETIME, struct.pack("<Q", ft)),
+            (T_UINT64, struct.pack("<Q", record_num)),
+            (T_GUID, activity.bytes_le) if activity else (T_NULL, b""),
+            (T_NULL, b""),
+            (T_UINT32, struct.pack("<I", 1234)),
+            (T_UINT32, struct.pack("<I", 5678)),
+            _wstr(event.get("computer", self.computer)),
+            (T_NULL, b""),
+        ]
+        data = {"TaskName": event["task_name"], "UserContext": "SYNTH\\user",
+                "InstanceId": "{%s}" % activity if activity else "", "TaskInstanceId": "{%s}" % activity if activity else "",
+                "ActionName": "C:\\Windows\\System32\\cmd.exe", "EnginePID": "4321", "Path": "C:\\x.exe",
+                "ProcessID": "4321", "Priority": "16384", "UserName": "SYNTH\\user",
+                "ResultCode": event.get("result_code", 0)}
+        data.update(event.get("data", {}))
+        data_values = [_wstr(data.get(n, "")) for n in names]
+        if nested:
+            def nested_root(builder):
+                inner = _Builder(chunk, builder.here)
+                inner.root(("data", names), data_tree, data_values)
+                builder.out += inner.out
+            values.append((T_BXML, nested_root))
+        else:
+            values.extend(data_values)
+        b.root(("event", names, nested), tree, values)
+        body = bytes(b.out)
+        size = 0x18 + len(body) + 4
+        size += (-size) % 8
+        rec = bytearray(size)
+        struct.pack_into("<IIQQ", rec, 0, 0x00002A2A, size, record_num, ft)
+        rec[0x18:0x18 + len(body)] = body
+        struct.pack_into("<I", rec, size - 4, size)
+        return bytes(rec)
+
+    def add(self, events):
+        """Adds events as the next records, the records are on disk after `flush`."""
+        for event in events:
+            chunk = self.chunk or self._new_chunk()
+            record_num = self.next_record
+            snap = chunk.snapshot()
+            rec = self._record_bytes(chunk, chunk.pos, event, record_num)
+            if chunk.pos + len(rec) > CHUNK_SIZE:
+                chunk.restore(snap)
+                chunk = self._new_chunk()
+                rec = self._record_bytes(chunk, chunk.pos, event, record_num)
+            chunk.buf[chunk.pos:chunk.pos + len(rec)] = rec
+            chunk.last_offset = chunk.pos
+            chunk.pos += len(rec)
+            chunk.first = chunk.first or record_num
+            chunk.last = record_num
+            self.next_record += 1
+        return self
+
+    def _finalize_chunk(self, chunk):
+        """Writes the chunk header, string and template tables and checksums."""
+        buf = chunk.buf
+        buf[0x80:0x200] = b"\x00" * 0x180
+        # string hash table with chains
+        heads = {}
+        for name, off in sorted(chunk.strings.items(), key=lambda kv: kv[1]):
+            bucket = name_hash(name) % 64
+            struct.pack_into("<I", buf, off, heads.get(bucket, 0))
+            heads[bucket] = off
+        for bucket, off in heads.items():
+            struct.pack_into("<I", buf, 0x80 + bucket * 4, off)
+        heads = {}
+        for off in sorted(chunk.templates.values()):
+            template_id = struct.unpack_from("<I", buf, off + 4)[0]
+            bucket = template_id % 32
+            struct.pack_into("<I", buf, off, heads.get(bucket, 0))
+            heads[bucket] = off
+        for bucket, off in heads.items():
+            struct.pack_into("<I", buf, 0x180 + bucket * 4, off)
+        buf[0:8] = b"ElfChnk\x00"
+        struct.pack_into("<QQQQIII", buf, 8, chunk.first, chunk.last, chunk.first, chunk.last,
+                         0x80, chunk.last_offset, chunk.pos)
+        struct.pack_into("<I", buf, 0x34, binascii.crc32(bytes(buf[0x200:chunk.pos])) & 0xFFFFFFFF)
+        struct.pack_into("<I", buf, 0x7C, binascii.crc32(bytes(buf[0:0x78]) + bytes(buf[0x80:0x200])) & 0xFFFFFFFF)
+
+    def _file_header(self):
+        hdr = bytearray(FILE_HEADER_SIZE)
+        hdr[0:8] = b"ElfFile\x00"
+        struct.pack_into("<QQQIHHHH", hdr, 8, 0, max(self.chunk_count - 1, 0), self.next_record,
+                         0x80, 1, 3, 0x1000, self.chunk_count)
+        struct.pack_into("<I", hdr, 0x78, 0)
+        struct.pack_into("<I", hdr, 0x7C, binascii.crc32(bytes(hdr[0:0x78])) & 0xFFFFFFFF)
+        return hdr
+
+    def _write_chunk(self):
+        """Writes the chunk being filled in its place in the file."""
+        self._finalize_chunk(self.chunk)
+        with open(self.path, "r+b") as f:
+            f.seek(FILE_HEADER_SIZE + (self.chunk_count - 1) * CHUNK_SIZE)
+            f.write(self.chunk.buf)
+
+    def flush(self):
+        """Writes the chunk being filled and the file header."""
+        if self.chunk is not None:
+            self._write_chunk()
+        with open(self.path, "r+b") as f:
+            f.write(self._file_header())
+        return self.path
+
+    def write(self):
+        """Writes the rest of the file, same as `flush`."""
+        return self.flush()
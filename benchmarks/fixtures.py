@@ -0,0 +1,146 @@
+"""Generated fixtures of the benchmark suite.
+
+EVTX files are written once into the fixtures directory and reused by later runs, the
+task inventories and raw history frames are built in memory with polars expressions.
+"""
+import os
+import uuid
+import random
+import polars as pl
+from datetime import datetime, timedelta
+from pytask_scheduler.constants import EventIDs, EventLogType
+from evtx_writer import EvtxWriter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fixtures")
+
+# event id of the launch, and the events of a run after it.
+TRIGGER_EVENTS = [107, 107, 107, 110, 118]
+END_EVENTS = [(102, 0, 4), (102, 0, 4), (102, 0, 4), (101, 2147942402, 2), (111, 0, 3)]
+
+def task_events(count: int, tasks: int=500, start: datetime=datetime(2024, 9, 1), seed: int=0):
+    """Yields `count` events of task runs, each run is a launch, start, process, \
+    action end and instance end event sharing an activity id."""
+    rng = random.Random(seed)
+    emitted = 0
+    time = start
+    while emitted < count:
+        activity_id = uuid.UUID(int=rng.getrandbits(128))
+        task_name = f"\\Folder{rng.randrange(tasks) % 50}\\Task{rng.randrange(tasks)}"
+        end_id, result_code, level = rng.choice(END_EVENTS)
+        duration = timedelta(seconds=rng.randrange(1, 600))
+        run = [
+            dict(time=time, event_id=rng.choice(TRIGGER_EVENTS)),
+            dict(time=time, event_id=100),
+            dict(time=time + timedelta(seconds=1), event_id=129),
+            dict(time=time + duration, event_id=201, result_code=result_code),
+            dict(time=time + duration, event_id=end_id, result_code=result_code, level=level)
+        ]
+        for event in run[:count - emitted]:
+            yield {"task_name":task_name, "activity_id":activity_id, **event}
+        emitted += len(run)
+        time += timedelta(seconds=rng.randrange(1, 20))
+
+def evtx_fixture(records: int, fixtures_dir: str=FIXTURES_DIR) -> str:
+    """Path of an EVTX file with `records` task events, written on first use."""
+    fpath = os.path.join(fixtures_dir, f"history-{records}.evtx")
+    if not os.path.exists(fpath):
+        os.makedirs(fixtures_dir, exist_ok=True)
+        writer = EvtxWriter(fpath + ".tmp")
+        writer.add(task_events(records)).write()
+        os.replace(fpath + ".tmp", fpath)
+    return fpath
+
+def _pick(index: pl.Expr, values: list, seed: int) -> pl.Expr:
+    """Pseudo random value from a list for each row."""
+    return pl.lit(pl.Series(values)).get(index.hash(seed) % len(values))
+
+def inventory_fixture(rows: int) -> pl.DataFrame:
+    """Raw task inventory with the columns of `RegisteredTask.info`, as listed by \
+    `TaskScheduler.get_all_tasks` before preprocessing. Some tasks are due today."""
+    now = datetime.now().replace(microsecond=0)
+    i = pl.int_range(rows, dtype=pl.UInt64)
+    folder = (i.hash(1) % max(rows // 10, 1)).cast(pl.String)
+    enabled = i.hash(2) % 20 != 0
+    return pl.select(
+        name=pl.format("Task{}", i),
+        enabled=enabled,
+        task_state=pl.when(enabled).then(_pick(i, [3, 3, 3, 4, 2], 3)).otherwise(1),
+        next_run_time=pl.lit(now) + pl.duration(minutes=(i.hash(4) % (3 * 24 * 60)).cast(pl.Int64)),
+        last_run_time=pl.lit(now) - pl.duration(minutes=(i.hash(5) % (2 * 24 * 60)).cast(pl.Int64)),
+        last_task_result=_pick(i, [0] * 17 + [1, 2, 267011], 6),
+        number_of_missed_runs=_pick(i, [0] * 18 + [1, 3], 7),
+        task_path=pl.format("\\Folder{}\\Task{}", folder, i),
+        author=_pick(i, ["svc_etl", "svc_reports", "admin", "Microsoft Corporation"], 8),
+        registration_date=pl.lit("2024-09-01T00:00:00"),
+        task_description=pl.format("Synthetic task {}", i),
+        task_source=pl.lit(None, pl.String),
+        AllowDemandStart=pl.lit(True),
+        StartWhenAvailable=i.hash(9) % 2 == 0,
+        Enabled=enabled,
+        Hidden=pl.lit(False),
+        RestartInterval=_pick(i, [None, "PT5M", "PT1H"], 10),
+        RestartCount=_pick(i, [0, 3], 11),
+        ExecutionTimeLimit=_pick(i, ["PT72H", "PT2H", "PT1H"], 12),
+        MultipleInstances=_pick(i, [0, 1, 2, 2, 3], 13),
+        execution_path=pl.format("C:\\jobs\\Task{}.exe", i),
+        execution_arguments=pl.lit("--run"),
+        working_directory=pl.lit("C:\\jobs"),
+        action_count=pl.lit(1),
+        trigger_types=_pick(i, [["CalendarTrigger"], ["TimeTrigger"], []], 14),
+        user_id=pl.lit("S-1-5-18"),
+        logon_type=pl.lit("ServiceAccount"),
+        run_level=_pick(i, ["LeastPrivilege", "HighestAvailable"], 15)
+    )
+
+def triggers_fixture(rows: int) -> pl.DataFrame:
+    """Triggers with the columns of `TaskScheduler.get_all_triggers`, mostly nightly daily \
+    and weekly triggers."""
+    i = pl.int_range(rows, dtype=pl.UInt64)
+    trigger_type = _pick(i, ["daily"] * 6 + ["weekly"] * 2 + ["monthly", "monthlydow", "one-time"], 1)
+    start = pl.lit(datetime(2024, 9, 1)) \
+        + pl.duration(days=(i.hash(2) % 30).cast(pl.Int64)) \
+        + pl.duration(minutes=_pick(i, [0, 60, 120, 180, 240, 300, 1200, 1320], 3) + (i.hash(4) % 60).cast(pl.Int64))
+    mask = lambda seed, bits: (i.hash(seed) % (2**bits - 1) + 1).cast(pl.Int64)
+    return pl.select(
+        task_path=pl.format("\\Folder{}\\Task{}", i.hash(5) % 50, i),
+        trigger_type=trigger_type,
+        start_boundary=start,
+        end_boundary=pl.lit(None, pl.Datetime("us")),
+        enabled=i.hash(6) % 20 != 0,
+        days_interval=pl.when(trigger_type == "daily").then(_pick(i, [1, 1, 1, 2, 7], 7)),
+        weeks_interval=pl.when(trigger_type == "weekly").then(_pick(i, [1, 1, 2], 8)),
+        days_of_week=pl.when(trigger_type.is_in(["weekly", "monthlydow"])).then(mask(9, 7)),
+        days_of_month=pl.when(trigger_type == "monthly").then(mask(10, 31)),
+        months_of_year=pl.when(trigger_type.is_in(["monthly", "monthlydow"])).then(mask(11, 12)),
+        weeks_of_month=pl.when(trigger_type == "monthlydow").then(mask(12, 4)),
+        run_on_last_week_of_month=i.hash(13) % 4 == 0
+    )
+
+def runs_fixture(tasks: int, runs_per_task: int=20) -> pl.DataFrame:
+    """Runs of the tasks of `triggers_fixture`, with the columns of `HistoryDataFrame.runs` \
+    used for the durations. Most runs take minutes, some take hours."""
+    i = pl.int_range(tasks * runs_per_task, dtype=pl.UInt64)
+    minutes = _pick(i, [1, 2, 5, 10, 15, 30, 60, 180], 1)
+    return pl.select(
+        **{"Task Name":pl.format("Task{}", i // runs_per_task)},
+        Duration=pl.duration(seconds=(i.hash(2) % (minutes * 60).cast(pl.UInt64) + 1).cast(pl.Int64))
+    )
+
+def raw_history_fixture(rows: int) -> pl.DataFrame:
+    """Raw history columns, as read from the event log before preprocessing."""
+    i = pl.int_range(rows, dtype=pl.UInt64)
+    event_id = _pick(i, ["100", "102", "107", "129", "201", "101", "111"], 1)
+    level = pl.when(event_id == "101").then(pl.lit("2")) \
+        .when(event_id == "111").then(pl.lit("3")).otherwise(pl.lit("4"))
+    created = pl.lit(datetime(2024, 9, 1)) + pl.duration(seconds=(i * 3).cast(pl.Int64))
+    return pl.select(
+        event_created_time=created.dt.strftime("%Y-%m-%d %H:%M:%S%.6f"),
+        event_level=level,
+        event_id=event_id,
+        task_name=pl.format("\\Folder{}\\Task{}", i.hash(2) % 50, i.hash(3) % 500),
+        event_record_id=(i + 1).cast(pl.String),
+        activity_id=pl.concat_str(pl.lit("{"), (i // 5).hash(4).cast(pl.String), pl.lit("}"))
+    ).with_columns(
+        pl.col("event_id").replace(EventIDs.DESCRIPTIONS).alias("event_id_description"),
+        pl.col("event_level").replace(EventLogType.DESCRIPTIONS).alias("event_log_description")
+    )
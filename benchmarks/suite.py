@@ -0,0 +1,233 @@
+"""Benchmark suite of the history parsing, task enumeration, schedule and data frame hot paths.
+
+Each case runs in its own process, so its peak RSS is measured apart from the other cases,
+and is timed over `--repeat` runs keeping the fastest. Fixtures are generated on first use,
+the EVTX files are kept in `--fixtures` for later runs.
+
+    python benchmarks/suite.py --quick                  # smallest size of each case
+    python benchmarks/suite.py -k history --output before.json
+    python benchmarks/suite.py --compare before.json    # exits 1 on a regression
+
+Cases are named `<case>[<size>]`, `-k` selects the cases containing any of the given words.
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+import polars as pl
+from datetime import datetime, timedelta
+from pytask_scheduler import (
+    HistoryDataFrame,
+    MemoryBackend,
+    TaskScheduler,
+    TasksDataFrame,
+    expand_triggers,
+    forecast_concurrency,
+    get_task_scheduler_history,
+    plan_start_times,
+    task_durations
+)
+from fixtures import (
+    FIXTURES_DIR,
+    evtx_fixture,
+    inventory_fixture,
+    raw_history_fixture,
+    runs_fixture,
+    triggers_fixture
+)
+
+def history_parse(size: int, fixtures_dir: str):
+    fpath = evtx_fixture(size, fixtures_dir)
+    return lambda: get_task_scheduler_history(evt_fpath=fpath)
+
+def history_parse_filtered(size: int, fixtures_dir: str):
+    fpath = evtx_fixture(size, fixtures_dir)
+    return lambda: get_task_scheduler_history(evt_fpath=fpath, event_ids=[101, 111])
+
+def history_preprocess(size: int, fixtures_dir: str):
+    raw = raw_history_fixture(size)
+    return lambda: HistoryDataFrame(raw).preprocess()
+
+def history_runs(size: int, fixtures_dir: str):
+    history = HistoryDataFrame(raw_history_fixture(size)).preprocess()
+    return lambda: history.runs()
+
+def tasks_preprocess(size: int, fixtures_dir: str):
+    raw = inventory_fixture(size)
+    return lambda: TasksDataFrame(raw).preprocess()
+
+def tasks_stats(size: int, fixtures_dir: str):
+    tasks = TasksDataFrame(inventory_fixture(size)).preprocess()
+    # a new frame each time, the statistics are cached on the frame after the first call.
+    return lambda: TasksDataFrame(tasks).stats()
+
+def tasks_due_today(size: int, fixtures_dir: str):
+    tasks = TasksDataFrame(inventory_fixture(size)).preprocess()
+    return lambda: tasks.get_tasks_due_today()
+
+def get_all_tasks(size: int, fixtures_dir: str):
+    scheduler = TaskScheduler(backend=MemoryBackend(folder_count=size // 10, tasks_per_folder=10))
+    return lambda: scheduler.get_all_tasks()
+
+def get_all_tasks_com(size: int, fixtures_dir: str):
+    scheduler = TaskScheduler(backend=MemoryBackend(folder_count=size // 10, tasks_per_folder=10))
+    return lambda: scheduler.get_all_tasks(source="com")
+
+def schedule_expand(size: int, fixtures_dir: str):
+    triggers = triggers_fixture(size)
+    start = datetime(2024, 9, 1)
+    return lambda: expand_triggers(triggers, start, start + timedelta(days=90))
+
+def schedule_forecast(size: int, fixtures_dir: str):
+    start = datetime(2024, 9, 1)
+    schedule = expand_triggers(triggers_fixture(size), start, start + timedelta(days=30))
+    durations = task_durations(runs_fixture(size))
+    return lambda: forecast_concurrency(schedule, durations).peak_windows()
+
+def schedule_plan(size: int, fixtures_dir: str):
+    # after the start boundaries of all the fixture triggers.
+    start = datetime(2024, 10, 1)
+    triggers = triggers_fixture(size)
+    durations = task_durations(runs_fixture(size))
+    return lambda: plan_start_times(triggers, durations, start, start + timedelta(days=7))
+
+# case name to the setup function and the sizes it runs with, smallest first.
+CASES = {
+    "history_parse":(history_parse, [10_000, 100_000, 1_000_000]),
+    "history_parse_filtered":(history_parse_filtered, [10_000, 100_000, 1_000_000]),
+    "history_preprocess":(history_preprocess, [10_000, 100_000, 1_000_000]),
+    "history_runs":(history_runs, [10_000, 100_000, 1_000_000]),
+    "tasks_preprocess":(tasks_preprocess, [1_000, 10_000, 100_000]),
+    "tasks_stats":(tasks_stats, [1_000, 10_000, 100_000]),
+    "tasks_due_today":(tasks_due_today, [1_000, 10_000, 100_000]),
+    "get_all_tasks":(get_all_tasks, [1_000, 10_000, 50_000]),
+    "get_all_tasks_com":(get_all_tasks_com, [1_000, 10_000]),
+    "schedule_expand":(schedule_expand, [1_000, 10_000, 100_000]),
+    "schedule_forecast":(schedule_forecast, [1_000, 5_000, 20_000]),
+    "schedule_plan":(schedule_plan, [1_000, 5_000])
+}
+
+def _reset_peak_rss() -> bool:
+    """Resets the peak RSS of this process, only Linux can."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss() -> float|None:
+    """Peak RSS of this process in MiB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except (ImportError, AttributeError):
+        return None
+
+def run_case(name: str, size: int, repeat: int, fixtures_dir: str) -> dict:
+    """Sets up and times a case in this process."""
+    setup, _ = CASES[name]
+    fn = setup(size, fixtures_dir)
+    setup_rss = _peak_rss()
+    reset = _reset_peak_rss()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "case":f"{name}[{size}]",
+        "wall_s":min(times),
+        "mean_s":sum(times) / len(times),
+        "peak_rss_mb":_peak_rss(),
+        # without a reset the peak includes the setup.
+        "setup_rss_mb":setup_rss if not reset else None
+    }
+
+def selected_cases(keywords: list[str], quick: bool) -> list[tuple[str, int]]:
+    """Cases and sizes to run."""
+    cases = []
+    for name, (_, sizes) in CASES.items():
+        for size in sizes[:1] if quick else sizes:
+            case = f"{name}[{size}]"
+            if not keywords or any(k in case for k in keywords):
+                cases.append((name, size))
+    return cases
+
+def compare(results: list[dict], baseline_fpath: str, threshold: float) -> list[str]:
+    """Cases slower or using more memory than the baseline by more than the threshold."""
+    with open(baseline_fpath) as f:
+        baseline = {r["case"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for r in results:
+        b = baseline.get(r["case"])
+        if b is None:
+            continue
+        for key in ("wall_s", "peak_rss_mb"):
+            if r[key] and b[key] and r[key] > b[key] * (1 + threshold):
+                regressions.append(f"{r['case']} {key} {b[key]:.3f} -> {r[key]:.3f}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="keywords", action="append", default=[])
+    parser.add_argument("--quick", action="store_true", help="run the smallest size of each case")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--output", help="write the results to a json file")
+    parser.add_argument("--compare", help="results json file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio")
+    parser.add_argument("--run-case", nargs=2, metavar=("NAME", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        name, size = args.run_case
+        print(json.dumps(run_case(name, int(size), args.repeat, args.fixtures)))
+        return
+
+    results = []
+    for name, size in selected_cases(args.keywords, args.quick):
+        out = subprocess.run(
+            [sys.executable, __file__, "--run-case", name, str(size),
+             "--repeat", str(args.repeat), "--fixtures", args.fixtures],
+            capture_output=True, text=True, check=True
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{result['case']:<34} {result['wall_s']:9.3f} s  peak RSS {result['peak_rss_mb'] or 0:8.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python":sys.version.split()[0],
+                "polars":pl.__version__,
+                "platform":sys.platform,
+                "results":results
+            }, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from importlib import import_module
 from pytask_scheduler.constants import (
     TaskTriggerTypes,
     MonthlyTriggerValues,
@@ -9,12 +10,48 @@ from pytask_scheduler.constants import (
     TaskExecutionLimit,
     TaskInstancePolicy,
     EventIDs,
-    EventLogType
+    EventLogType,
+    TaskRunEvents
 )
 
-from pytask_scheduler.objects import TaskScheduler, TasksDataFrame, HistoryDataFrame
+# public names of the subpackages, imported on first use so that `import pytask_scheduler`
+# does not load polars, python-evtx or pywin32 before a feature needs them.
+_LAZY_IMPORTS = {
+    "ComBackend":"pytask_scheduler.backends",
+    "MemoryBackend":"pytask_scheduler.backends",
+    "TaskScheduler":"pytask_scheduler.objects",
+    "MultiHostScheduler":"pytask_scheduler.objects",
+    "TaskInfoCache":"pytask_scheduler.objects",
+    "TaskSpec":"pytask_scheduler.objects",
+    "TasksDataFrame":"pytask_scheduler.objects",
+    "TasksQuery":"pytask_scheduler.objects",
+    "HistoryDataFrame":"pytask_scheduler.objects",
+    "HistoryQuery":"pytask_scheduler.objects",
+    "get_task_scheduler_history":"pytask_scheduler.functions",
+    "iter_task_scheduler_history":"pytask_scheduler.functions",
+    "get_new_task_scheduler_history":"pytask_scheduler.functions",
+    "iter_new_task_scheduler_history":"pytask_scheduler.functions",
+    "watch_task_scheduler_history":"pytask_scheduler.functions",
+    "tail_task_scheduler_history":"pytask_scheduler.functions",
+    "collect":"pytask_scheduler.functions",
+    "HistoryStore":"pytask_scheduler.store",
+    "expand_triggers":"pytask_scheduler.schedule",
+    "task_durations":"pytask_scheduler.schedule",
+    "forecast_concurrency":"pytask_scheduler.schedule",
+    "ConcurrencyForecast":"pytask_scheduler.schedule",
+    "plan_start_times":"pytask_scheduler.schedule"
+}
 
-from pytask_scheduler.functions import get_task_scheduler_history
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 __all__ = [
     "TaskTriggerTypes",
@@ -26,10 +63,30 @@ __all__ = [
     "TaskRestartIntervals",
     "TaskExecutionLimit",
     "TaskInstancePolicy",
+    "ComBackend",
+    "MemoryBackend",
     "TaskScheduler",
+    "MultiHostScheduler",
+    "TaskInfoCache",
+    "TaskSpec",
     "TasksDataFrame",
+    "TasksQuery",
     "HistoryDataFrame",
+    "HistoryQuery",
     "EventIDs",
     "EventLogType",
-    "get_task_scheduler_history"
+    "TaskRunEvents",
+    "get_task_scheduler_history",
+    "iter_task_scheduler_history",
+    "get_new_task_scheduler_history",
+    "iter_new_task_scheduler_history",
+    "watch_task_scheduler_history",
+    "tail_task_scheduler_history",
+    "collect",
+    "HistoryStore",
+    "expand_triggers",
+    "task_durations",
+    "forecast_concurrency",
+    "ConcurrencyForecast",
+    "plan_start_times"
 ]
\ No newline at end of file
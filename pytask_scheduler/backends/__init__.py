@@ -0,0 +1,6 @@
+from .backends import ComBackend, MemoryBackend
+
+__all__ = [
+    "ComBackend",
+    "MemoryBackend"
+]
\ No newline at end of file
@@ -0,0 +1,791 @@
+import time
+import random
+import threading
+import xml.etree.ElementTree as ET
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from typing import Callable
+from xml.sax.saxutils import escape
+from pytask_scheduler.constants import (
+    MonthlyTriggerValues,
+    TaskActionTypes,
+    TaskCreationTypes,
+    TaskInstancePolicy,
+    TaskTriggerTypes
+)
+
+# namespace of the task definition xml.
+TASK_XML_NAMESPACE = "http://schemas.microsoft.com/windows/2004/02/mit/task"
+XML_NS = {"t":TASK_XML_NAMESPACE}
+
+# LogonType and RunLevel values of the Principal object written in the task xml.
+XML_LOGON_TYPES = {
+    1:"Password",
+    2:"S4U",
+    3:"InteractiveToken",
+    4:"Group",
+    5:"ServiceAccount",
+    6:"InteractiveTokenOrPassword"
+}
+XML_RUN_LEVELS = {0:"LeastPrivilege", 1:"HighestAvailable"}
+
+class ComBackend:
+    """
+    Task Scheduler service of Windows, through the Schedule.Service COM object of win32com.
+    """
+    def connect(
+        self,
+        server: str|None=None,
+        user: str|None=None,
+        domain: str|None=None,
+        password: str|None=None
+    ):
+        """Connects to the Task Scheduler service of the local or a remote computer, \
+        only the given connection arguments are passed on.
+
+        Returns:
+            Connected Schedule.Service object.
+        """
+        import win32com.client
+        client = win32com.client.gencache.EnsureDispatch("Schedule.Service")
+        args = {"serverName":server, "user":user, "domain":domain, "password":password}
+        client.Connect(**{k: v for k, v in args.items() if v is not None})
+        return client
+
+    @contextmanager
+    def apartment(self):
+        """Initializes COM on the calling thread for the duration of the block."""
+        import pythoncom
+        pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        try:
+            yield
+        finally:
+            pythoncom.CoUninitialize()
+
+class CallCounter(Counter):
+    """Counts the calls to the in-memory objects by kind, sleeping for the latency on each."""
+    def __init__(self, latency: float=0.0):
+        super().__init__()
+        self.latency = latency
+        self.__lock = threading.Lock()
+
+    def call(self, kind: str):
+        """Counts a call, `property` for the property reads and writes, else the method name."""
+        with self.__lock:
+            self[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+class MemoryObject:
+    """In-memory scripting object, every read or write of a property is counted as a call.
+
+    Properties are the attributes starting with a capital letter, as in the COM API.
+    """
+    def __init__(self, calls: CallCounter, **properties):
+        object.__setattr__(self, "_calls", calls)
+        object.__setattr__(self, "_properties", properties)
+
+    def __getattr__(self, name):
+        properties = object.__getattribute__(self, "_properties")
+        if name not in properties:
+            raise AttributeError(f"{type(self).__name__} has no property {name}")
+        self._calls.call("property")
+        return properties[name]
+
+    def __setattr__(self, name, value):
+        if not name[:1].isupper():
+            object.__setattr__(self, name, value)
+            return
+        self._calls.call("property")
+        self._properties[name] = value
+
+class MemoryCollection(MemoryObject):
+    """Triggers or Actions collection of a task definition."""
+    def __init__(self, calls: CallCounter, defaults: dict):
+        super().__init__(calls)
+        self._items = []
+        self._defaults = defaults
+
+    def Create(self, type_: int) -> MemoryObject:
+        self._calls.call("Create")
+        item = MemoryObject(self._calls, Type=type_, **self._defaults.get(type_, {}))
+        self._items.append(item)
+        return item
+
+    def Item(self, index: int) -> MemoryObject:
+        self._calls.call("Item")
+        return self._items[index - 1]
+
+    @property
+    def Count(self) -> int:
+        self._calls.call("property")
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+# properties of a new trigger by trigger type.
+TRIGGER_COMMON = {"StartBoundary":"", "EndBoundary":"", "Enabled":True}
+TRIGGER_DEFAULTS = {
+    TaskTriggerTypes.TASK_TRIGGER_TIME:TRIGGER_COMMON,
+    TaskTriggerTypes.TASK_TRIGGER_DAILY:{**TRIGGER_COMMON, "DaysInterval":1},
+    TaskTriggerTypes.TASK_TRIGGER_WEEKLY:{**TRIGGER_COMMON, "WeeksInterval":1, "DaysOfWeek":0},
+    TaskTriggerTypes.TASK_TRIGGER_MONTHLY:{**TRIGGER_COMMON, "DaysOfMonth":0, "MonthsOfYear":0},
+    TaskTriggerTypes.TASK_TRIGGER_MONTHLYDOW:{
+        **TRIGGER_COMMON,
+        "WeeksOfMonth":0,
+        "DaysOfWeek":0,
+        "MonthsOfYear":0,
+        "RunOnLastWeekOfMonth":False
+    }
+}
+
+ACTION_DEFAULTS = {
+    TaskActionTypes.TASK_ACTION_EXEC:{"Path":"", "Arguments":"", "WorkingDirectory":""}
+}
+
+class MemoryTaskDefinition(MemoryObject):
+    """TaskDefinition object with the defaults of `Schedule.Service.NewTask`."""
+    def __init__(self, calls: CallCounter):
+        super().__init__(
+            calls,
+            RegistrationInfo=MemoryObject(
+                calls, Author=None, Date=None, Description=None, Source=None, URI=None
+            ),
+            Settings=MemoryObject(
+                calls,
+                AllowDemandStart=True,
+                StartWhenAvailable=False,
+                Enabled=True,
+                Hidden=False,
+                RestartInterval="",
+                RestartCount=0,
+                ExecutionTimeLimit="PT72H",
+                MultipleInstances=TaskInstancePolicy.TASK_INSTANCES_IGNORE_NEW
+            ),
+            Principal=MemoryObject(calls, UserId=None, GroupId=None, LogonType=3, RunLevel=0),
+            Triggers=MemoryCollection(calls, TRIGGER_DEFAULTS),
+            Actions=MemoryCollection(calls, ACTION_DEFAULTS)
+        )
+
+    @property
+    def XmlText(self) -> str:
+        self._calls.call("property")
+        return _definition_xml(self)
+
+def _element(tag: str, value) -> str:
+    """Xml element of a property, nothing when the property is not set."""
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        value = str(value).lower()
+    return f"<{tag}>{escape(str(value))}</{tag}>"
+
+def _mask_elements(mask: int, values: dict, tag: str|None=None) -> str:
+    """Xml elements of the bits set in a trigger bitmask, see `MonthlyTriggerValues`."""
+    if tag is None:
+        return "".join(f"<{name}/>" for name, bit in values.items() if mask & bit)
+    return "".join(_element(tag, name) for name, bit in values.items() if mask & bit)
+
+def _trigger_xml(trigger: MemoryObject) -> str:
+    """Xml of a trigger object."""
+    props = trigger._properties
+    common = (
+        _element("StartBoundary", props["StartBoundary"])
+        + _element("EndBoundary", props["EndBoundary"])
+        + _element("Enabled", props["Enabled"])
+    )
+    days_of_week = lambda: _mask_elements(props["DaysOfWeek"], MonthlyTriggerValues.DAYS_OF_WEEK)
+    months = lambda: _mask_elements(props["MonthsOfYear"], MonthlyTriggerValues.MONTHS_OF_YEAR)
+
+    match props["Type"]:
+        case TaskTriggerTypes.TASK_TRIGGER_TIME:
+            return f"<TimeTrigger>{common}</TimeTrigger>"
+        case TaskTriggerTypes.TASK_TRIGGER_DAILY:
+            schedule = "<ScheduleByDay>" \
+                f"{_element('DaysInterval', props['DaysInterval'])}</ScheduleByDay>"
+        case TaskTriggerTypes.TASK_TRIGGER_WEEKLY:
+            schedule = "<ScheduleByWeek>" \
+                f"{_element('WeeksInterval', props['WeeksInterval'])}" \
+                f"<DaysOfWeek>{days_of_week()}</DaysOfWeek></ScheduleByWeek>"
+        case TaskTriggerTypes.TASK_TRIGGER_MONTHLY:
+            days = {str(k): v for k, v in MonthlyTriggerValues.DAYS_OF_MONTH.items()}
+            schedule = "<ScheduleByMonth>" \
+                f"<DaysOfMonth>{_mask_elements(props['DaysOfMonth'], days, 'Day')}</DaysOfMonth>" \
+                f"<Months>{months()}</Months></ScheduleByMonth>"
+        case TaskTriggerTypes.TASK_TRIGGER_MONTHLYDOW:
+            weeks = dict(zip("1234", MonthlyTriggerValues.WEEKS_OF_MONTH.values()))
+            last = _element("Week", "Last") if props["RunOnLastWeekOfMonth"] else ""
+            schedule = "<ScheduleByMonthDayOfWeek>" \
+                f"<Weeks>{_mask_elements(props['WeeksOfMonth'], weeks, 'Week')}{last}</Weeks>" \
+                f"<DaysOfWeek>{days_of_week()}</DaysOfWeek>" \
+                f"<Months>{months()}</Months></ScheduleByMonthDayOfWeek>"
+        case _:
+            return ""
+    return f"<CalendarTrigger>{common}{schedule}</CalendarTrigger>"
+
+def _action_xml(action: MemoryObject) -> str:
+    """Xml of an action object, only execution actions are written."""
+    props = action._properties
+    if props["Type"] != TaskActionTypes.TASK_ACTION_EXEC:
+        return ""
+    return "<Exec>" \
+        f"{_element('Command', props['Path'])}" \
+        f"{_element('Arguments', props['Arguments'])}" \
+        f"{_element('WorkingDirectory', props['WorkingDirectory'])}</Exec>"
+
+def _definition_xml(definition: MemoryTaskDefinition) -> str:
+    """Task Scheduler 2.0 xml of a task definition object."""
+    props = definition._properties
+    reg = props["RegistrationInfo"]._properties
+    settings = props["Settings"]._properties
+    principal = props["Principal"]._properties
+    policies = {v: k for k, v in TaskInstancePolicy.xml_policies.items()}
+
+    restart = ""
+    if settings["RestartInterval"]:
+        restart = "<RestartOnFailure>" \
+            f"{_element('Interval', settings['RestartInterval'])}" \
+            f"{_element('Count', settings['RestartCount'])}</RestartOnFailure>"
+
+    return (
+        '<?xml version="1.0" encoding="UTF-16"?>'
+        f'<Task version="1.2" xmlns="{TASK_XML_NAMESPACE}">'
+        "<RegistrationInfo>"
+        f"{_element('URI', reg['URI'])}{_element('Source', reg['Source'])}"
+        f"{_element('Date', reg['Date'])}{_element('Author', reg['Author'])}"
+        f"{_element('Description', reg['Description'])}"
+        "</RegistrationInfo>"
+        f"<Triggers>{''.join(_trigger_xml(t) for t in props['Triggers']._items)}</Triggers>"
+        '<Principals><Principal id="Author">'
+        f"{_element('UserId', principal['UserId'])}"
+        f"{_element('LogonType', XML_LOGON_TYPES.get(principal['LogonType']))}"
+        f"{_element('GroupId', principal['GroupId'])}"
+        f"{_element('RunLevel', XML_RUN_LEVELS.get(principal['RunLevel']))}"
+        "</Principal></Principals>"
+        "<Settings>"
+        f"{_element('AllowStartOnDemand', settings['AllowDemandStart'])}{restart}"
+        f"{_element('MultipleInstancesPolicy', policies.get(settings['MultipleInstances']))}"
+        f"{_element('StartWhenAvailable', settings['StartWhenAvailable'])}"
+        f"{_element('Enabled', settings['Enabled'])}{_element('Hidden', settings['Hidden'])}"
+        f"{_element('ExecutionTimeLimit', settings['ExecutionTimeLimit'])}"
+        "</Settings>"
+        f'<Actions Context="Author">{"".join(_action_xml(a) for a in props["Actions"]._items)}</Actions>'
+        "</Task>"
+    )
+
+def _xml_mask(parent, tag: str, values: dict) -> int:
+    """Trigger bitmask of the child elements of a schedule element, see `MonthlyTriggerValues`."""
+    node = parent.find(f"t:{tag}", XML_NS)
+    if node is None:
+        return 0
+    names = [child.text if child.text else child.tag.split("}")[-1] for child in node]
+    return sum(values[name] for name in names if name in values)
+
+def _definition_from_xml(calls: CallCounter, xml: str) -> MemoryTaskDefinition:
+    """Task definition object of a Task Scheduler 2.0 xml, raises ValueError on malformed xml.
+
+    The definition is built by the service, none of it is counted as calls.
+    """
+    try:
+        root = ET.fromstring(xml)
+    except ET.ParseError as e:
+        raise ValueError(f"Malformed task xml: {e}") from e
+    if root.tag != f"{{{TASK_XML_NAMESPACE}}}Task":
+        raise ValueError(f"Task xml root is {root.tag}, expected Task.")
+
+    definition = MemoryTaskDefinition(calls)
+    text = lambda node, tag: node.findtext(f"t:{tag}", None, XML_NS)
+    props = lambda name: definition._properties[name]._properties
+    items = lambda name: definition._properties[name]._items
+
+    reg = root.find("t:RegistrationInfo", XML_NS)
+    if reg is not None:
+        for tag in ("Author", "Date", "Description", "Source", "URI"):
+            props("RegistrationInfo")[tag] = text(reg, tag)
+
+    settings = root.find("t:Settings", XML_NS)
+    if settings is not None:
+        target = props("Settings")
+        for tag, name in (
+            ("AllowStartOnDemand", "AllowDemandStart"),
+            ("StartWhenAvailable", "StartWhenAvailable"),
+            ("Enabled", "Enabled"),
+            ("Hidden", "Hidden")
+        ):
+            if text(settings, tag) is not None:
+                target[name] = text(settings, tag) == "true"
+        restart = settings.find("t:RestartOnFailure", XML_NS)
+        if restart is not None:
+            target["RestartInterval"] = text(restart, "Interval") or ""
+            target["RestartCount"] = int(text(restart, "Count") or 0)
+        if text(settings, "ExecutionTimeLimit") is not None:
+            target["ExecutionTimeLimit"] = text(settings, "ExecutionTimeLimit")
+        if text(settings, "MultipleInstancesPolicy") is not None:
+            target["MultipleInstances"] = TaskInstancePolicy.xml_policies[
+                text(settings, "MultipleInstancesPolicy")
+            ]
+
+    principal = root.find("t:Principals/t:Principal", XML_NS)
+    if principal is not None:
+        target = props("Principal")
+        target["UserId"] = text(principal, "UserId")
+        target["GroupId"] = text(principal, "GroupId")
+        logon_types = {v: k for k, v in XML_LOGON_TYPES.items()}
+        run_levels = {v: k for k, v in XML_RUN_LEVELS.items()}
+        target["LogonType"] = logon_types.get(text(principal, "LogonType"), target["LogonType"])
+        target["RunLevel"] = run_levels.get(text(principal, "RunLevel"), target["RunLevel"])
+
+    days = {str(k): v for k, v in MonthlyTriggerValues.DAYS_OF_MONTH.items()}
+    weeks = dict(zip("1234", MonthlyTriggerValues.WEEKS_OF_MONTH.values()))
+    days_of_week = lambda node: _xml_mask(node, "DaysOfWeek", MonthlyTriggerValues.DAYS_OF_WEEK)
+    months = lambda node: _xml_mask(node, "Months", MonthlyTriggerValues.MONTHS_OF_YEAR)
+    for node in root.iterfind("t:Triggers/*", XML_NS):
+        kind = node.tag.split("}")[-1]
+        if kind == "TimeTrigger":
+            type_, schedule = TaskTriggerTypes.TASK_TRIGGER_TIME, {}
+        elif kind != "CalendarTrigger":
+            raise NotImplementedError(f"{kind} is not supported by the in-memory scheduler.")
+        elif (by := node.find("t:ScheduleByDay", XML_NS)) is not None:
+            type_ = TaskTriggerTypes.TASK_TRIGGER_DAILY
+            schedule = {"DaysInterval":int(text(by, "DaysInterval") or 1)}
+        elif (by := node.find("t:ScheduleByWeek", XML_NS)) is not None:
+            type_ = TaskTriggerTypes.TASK_TRIGGER_WEEKLY
+            schedule = {
+                "WeeksInterval":int(text(by, "WeeksInterval") or 1),
+                "DaysOfWeek":days_of_week(by)
+            }
+        elif (by := node.find("t:ScheduleByMonth", XML_NS)) is not None:
+            type_ = TaskTriggerTypes.TASK_TRIGGER_MONTHLY
+            schedule = {"DaysOfMonth":_xml_mask(by, "DaysOfMonth", days), "MonthsOfYear":months(by)}
+        elif (by := node.find("t:ScheduleByMonthDayOfWeek", XML_NS)) is not None:
+            type_ = TaskTriggerTypes.TASK_TRIGGER_MONTHLYDOW
+            schedule = {
+                "WeeksOfMonth":_xml_mask(by, "Weeks", weeks),
+                "RunOnLastWeekOfMonth":any(
+                    w.text == "Last" for w in by.iterfind("t:Weeks/t:Week", XML_NS)
+                ),
+                "DaysOfWeek":days_of_week(by),
+                "MonthsOfYear":months(by)
+            }
+        else:
+            raise ValueError("CalendarTrigger has no schedule.")
+        items("Triggers").append(MemoryObject(
+            calls,
+            Type=type_,
+            StartBoundary=text(node, "StartBoundary") or "",
+            EndBoundary=text(node, "EndBoundary") or "",
+            Enabled=text(node, "Enabled") != "false",
+            **schedule
+        ))
+
+    for node in root.iterfind("t:Actions/t:Exec", XML_NS):
+        items("Actions").append(MemoryObject(
+            calls,
+            Type=TaskActionTypes.TASK_ACTION_EXEC,
+            Path=text(node, "Command") or "",
+            Arguments=text(node, "Arguments") or "",
+            WorkingDirectory=text(node, "WorkingDirectory") or ""
+        ))
+    if not items("Actions"):
+        raise ValueError("Task xml has no execution action.")
+    return definition
+
+class MemoryTask:
+    """RegisteredTask object of the in-memory scheduler.
+
+    The definition is either given with its xml, or built on first use by a function \
+    returning both.
+    """
+    def __init__(
+        self,
+        calls: CallCounter,
+        name: str,
+        path: str,
+        runtime: dict,
+        definition: MemoryTaskDefinition|None=None,
+        xml: str|None=None,
+        build: Callable|None=None
+    ):
+        self._calls = calls
+        self._name = name
+        self._path = path
+        self._runtime = runtime
+        self._definition = definition
+        self._xml = xml
+        self._build = build
+
+    def __property(self, value):
+        self._calls.call("property")
+        return value
+
+    def __task_definition(self) -> MemoryTaskDefinition:
+        if self._definition is None:
+            self._definition, self._xml = self._build()
+        return self._definition
+
+    Name = property(lambda self: self.__property(self._name))
+    Path = property(lambda self: self.__property(self._path))
+    State = property(lambda self: self.__property(self._runtime["State"]))
+    NextRunTime = property(lambda self: self.__property(self._runtime["NextRunTime"]))
+    LastRunTime = property(lambda self: self.__property(self._runtime["LastRunTime"]))
+    LastTaskResult = property(lambda self: self.__property(self._runtime["LastTaskResult"]))
+    NumberOfMissedRuns = property(lambda self: self.__property(self._runtime["NumberOfMissedRuns"]))
+
+    @property
+    def Enabled(self) -> bool:
+        return self.__property(self.__task_definition()._properties["Settings"]._properties["Enabled"])
+
+    @property
+    def Definition(self) -> MemoryTaskDefinition:
+        return self.__property(self.__task_definition())
+
+    @property
+    def Xml(self) -> str:
+        self.__task_definition()
+        return self.__property(self._xml)
+
+class MemoryFolder:
+    """TaskFolder object of the in-memory scheduler."""
+    def __init__(self, calls: CallCounter, name: str, path: str):
+        self._calls = calls
+        self._folders = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.Name = name
+        self.Path = path
+
+    def _child_path(self, name: str) -> str:
+        return self.Path.rstrip("\\") + "\\" + name
+
+    def GetFolders(self, flags: int=0) -> list:
+        self._calls.call("GetFolders")
+        return list(self._folders.values())
+
+    def GetFolder(self, name: str):
+        self._calls.call("GetFolder")
+        if name not in self._folders:
+            raise FileNotFoundError(f"{self._child_path(name)} does not exist.")
+        return self._folders[name]
+
+    def CreateFolder(self, name: str, sddl=None):
+        self._calls.call("CreateFolder")
+        with self._lock:
+            if name in self._folders:
+                raise FileExistsError(f"{self._child_path(name)} already exists.")
+            folder = MemoryFolder(self._calls, name, self._child_path(name))
+            self._folders[name] = folder
+        return folder
+
+    def DeleteFolder(self, name: str, flags: int=0):
+        self._calls.call("DeleteFolder")
+        with self._lock:
+            if name not in self._folders:
+                raise FileNotFoundError(f"{self._child_path(name)} does not exist.")
+            del self._folders[name]
+
+    def GetTasks(self, flags: int=0) -> list:
+        self._calls.call("GetTasks")
+        return list(self._tasks.values())
+
+    def GetTask(self, name: str) -> MemoryTask:
+        self._calls.call("GetTask")
+        if name not in self._tasks:
+            raise FileNotFoundError(f"{self._child_path(name)} does not exist.")
+        return self._tasks[name]
+
+    def DeleteTask(self, name: str, flags: int=0):
+        self._calls.call("DeleteTask")
+        with self._lock:
+            if name not in self._tasks:
+                raise FileNotFoundError(f"{self._child_path(name)} does not exist.")
+            del self._tasks[name]
+
+    def __register(self, name: str, definition: MemoryTaskDefinition, flags: int) -> MemoryTask|None:
+        path = self._child_path(name)
+        if flags & TaskCreationTypes.TASK_VALIDATE_ONLY:
+            return None
+        with self._lock:
+            exists = name in self._tasks
+            if exists and not flags & TaskCreationTypes.TASK_UPDATE:
+                raise FileExistsError(f"{path} already exists.")
+            if not exists and not flags & TaskCreationTypes.TASK_CREATE:
+                raise FileNotFoundError(f"{path} does not exist.")
+
+            reg = definition.RegistrationInfo._properties
+            reg["URI"] = path
+            if not reg["Date"]:
+                reg["Date"] = datetime.now().replace(microsecond=0).isoformat()
+            runtime = {
+                "State":3 if definition.Settings._properties["Enabled"] else 1,
+                "NextRunTime":None,
+                "LastRunTime":None,
+                "LastTaskResult":267011,
+                "NumberOfMissedRuns":0
+            }
+            # the registered xml is the service's own copy of the definition.
+            task = MemoryTask(
+                self._calls, name, path, runtime, definition, _definition_xml(definition)
+            )
+            self._tasks[name] = task
+        return task
+
+    def RegisterTaskDefinition(
+        self,
+        name: str,
+        definition: MemoryTaskDefinition,
+        flags: int,
+        user_id=None,
+        password=None,
+        logon_type=None,
+        sddl=None
+    ) -> MemoryTask|None:
+        self._calls.call("RegisterTaskDefinition")
+        return self.__register(name, definition, flags)
+
+    def RegisterTask(
+        self,
+        name: str,
+        xml: str,
+        flags: int,
+        user_id=None,
+        password=None,
+        logon_type=None,
+        sddl=None
+    ) -> MemoryTask|None:
+        self._calls.call("RegisterTask")
+        return self.__register(name, _definition_from_xml(self._calls, xml), flags)
+
+class MemoryService:
+    """Schedule.Service object of the in-memory scheduler."""
+    def __init__(self, calls: CallCounter, server: str|None):
+        self._calls = calls
+        self.root = MemoryFolder(calls, "\\", "\\")
+        self.TargetServer = server
+        self.Connected = False
+
+    def Connect(self, serverName=None, user=None, domain=None, password=None):
+        self._calls.call("Connect")
+        self.Connected = True
+
+    def GetFolder(self, path: str) -> MemoryFolder:
+        self._calls.call("GetFolder")
+        folder = self.root
+        for name in filter(None, path.split("\\")):
+            if name not in folder._folders:
+                raise FileNotFoundError(f"{path} does not exist.")
+            folder = folder._folders[name]
+        return folder
+
+    def NewTask(self, flags: int=0) -> MemoryTaskDefinition:
+        self._calls.call("NewTask")
+        return MemoryTaskDefinition(self._calls)
+
+def _synthetic_definition(calls: CallCounter, spec: dict) -> tuple[MemoryTaskDefinition, str]:
+    """Task definition and task xml of a generated task."""
+    definition = MemoryTaskDefinition(calls)
+    props = definition._properties
+    props["RegistrationInfo"]._properties.update(
+        Author=spec["author"], Date="2024-09-01T00:00:00", Description=spec["description"]
+    )
+    props["Settings"]._properties.update(
+        Enabled=spec["enabled"],
+        StartWhenAvailable=True,
+        RestartInterval="PT5M",
+        RestartCount=3,
+        ExecutionTimeLimit="PT2H"
+    )
+    props["Principal"]._properties.update(UserId="S-1-5-18", LogonType=5, RunLevel=1)
+
+    trigger = MemoryObject(
+        calls,
+        Type=spec["trigger_type"],
+        **TRIGGER_DEFAULTS[spec["trigger_type"]]
+    )
+    trigger._properties.update(spec["trigger"])
+    props["Triggers"]._items.append(trigger)
+
+    action = MemoryObject(calls, Type=TaskActionTypes.TASK_ACTION_EXEC)
+    action._properties.update(
+        Path=f"C:\\jobs\\{spec['name']}.exe", Arguments="--run", WorkingDirectory="C:\\jobs"
+    )
+    props["Actions"]._items.append(action)
+
+    # pad the description up to the wanted xml size.
+    xml = _definition_xml(definition)
+    padding = spec["xml_size"] - len(xml)
+    if padding > 0:
+        padding = " " + "." * (padding - 1)
+        props["RegistrationInfo"]._properties["Description"] += padding
+        xml = xml.replace("</Description>", padding + "</Description>", 1)
+    return definition, xml
+
+def _synthetic_trigger(rng: random.Random) -> tuple[int, dict]:
+    """Random trigger of a generated task, mostly nightly schedules."""
+    hour = rng.choice([0, 1, 1, 2, 2, 2, 3, 4, 5, 6, 8, 12, 18, 22, 23])
+    start = datetime(2024, 9, 1, hour, rng.randrange(0, 60, 5)).isoformat()
+    kind = rng.choices(
+        [
+            TaskTriggerTypes.TASK_TRIGGER_DAILY,
+            TaskTriggerTypes.TASK_TRIGGER_WEEKLY,
+            TaskTriggerTypes.TASK_TRIGGER_MONTHLY,
+            TaskTriggerTypes.TASK_TRIGGER_MONTHLYDOW,
+            TaskTriggerTypes.TASK_TRIGGER_TIME
+        ],
+        weights=[6, 2, 1, 1, 1]
+    )[0]
+
+    trigger = {"StartBoundary":start}
+    match kind:
+        case TaskTriggerTypes.TASK_TRIGGER_DAILY:
+            trigger["DaysInterval"] = rng.choice([1, 1, 1, 2, 7])
+        case TaskTriggerTypes.TASK_TRIGGER_WEEKLY:
+            trigger["WeeksInterval"] = rng.choice([1, 1, 2])
+            trigger["DaysOfWeek"] = rng.randrange(1, 128)
+        case TaskTriggerTypes.TASK_TRIGGER_MONTHLY:
+            trigger["DaysOfMonth"] = 1 << rng.randrange(28)
+            trigger["MonthsOfYear"] = 4095
+        case TaskTriggerTypes.TASK_TRIGGER_MONTHLYDOW:
+            trigger["WeeksOfMonth"] = 1 << rng.randrange(4)
+            trigger["DaysOfWeek"] = 1 << rng.randrange(7)
+            trigger["MonthsOfYear"] = 4095
+        case TaskTriggerTypes.TASK_TRIGGER_TIME:
+            trigger["StartBoundary"] = (datetime(2024, 9, 1, hour) + timedelta(
+                days=rng.randrange(60))).isoformat()
+    return kind, trigger
+
+class MemoryBackend:
+    """
+    In-memory Task Scheduler with synthetic folder trees, for profiling and load testing \
+    off Windows.
+
+    Each computer gets its own tree of `folder_count` folders with `tasks_per_folder` tasks \
+    each, generated from the same seed. Every method call and property read of the object \
+    model is counted in `calls` and waits `latency` seconds, standing in for the COM round \
+    trip to the service.
+
+    Attributes:
+        calls (`CallCounter`): Number of calls by kind, shared by every computer.
+
+    Parameters:
+        folder_count (`int`): Number of folders under the root folder, nested `branching` \
+            folders per parent.
+        tasks_per_folder (`int`): Number of tasks in each folder, the root folder included.
+        branching (`int`): Number of subfolders of each folder.
+        xml_size (`int`): Minimum length of the task xml, padded with the task description.
+        latency (`float`): Seconds waited on each call.
+        distinct_names (`int`): Number of distinct folder names, by default every folder \
+            name is unique. Folder names repeat in different branches like the \
+            `Microsoft\\Windows` leaves of a real machine.
+        connect_latency (`float|dict`): Seconds waited on connecting, or host name to seconds.
+        unreachable (`list`): Host names that refuse the connection.
+        seed (`int`): Seed of the generated tasks.
+    """
+    def __init__(
+        self,
+        folder_count: int=0,
+        tasks_per_folder: int=0,
+        branching: int=8,
+        xml_size: int=0,
+        latency: float=0.0,
+        distinct_names: int|None=None,
+        connect_latency: float|dict=0.0,
+        unreachable: list[str]=(),
+        seed: int=0
+    ):
+        self.folder_count = folder_count
+        self.tasks_per_folder = tasks_per_folder
+        self.branching = branching
+        self.xml_size = xml_size
+        self.distinct_names = distinct_names
+        self.connect_latency = connect_latency
+        self.unreachable = set(unreachable)
+        self.seed = seed
+        self.calls = CallCounter(latency)
+        self.__services = {}
+        self.__lock = threading.Lock()
+
+    def service(self, server: str|None=None) -> MemoryService:
+        """Schedule.Service of a computer, the tree is generated on first use.
+
+        Parameters:
+            server (`str`): Name of the computer, by default the local computer.
+        """
+        with self.__lock:
+            if server not in self.__services:
+                self.__services[server] = self.__generate(server)
+            return self.__services[server]
+
+    def __generate(self, server: str|None) -> MemoryService:
+        """Generates the folder tree of a computer."""
+        service = MemoryService(self.calls, server)
+        rng = random.Random(self.seed)
+        parents = [service.root]
+        for i in range(self.folder_count):
+            parent = parents[i // self.branching]
+            name = f"Folder{i % self.distinct_names if self.distinct_names else i}"
+            if name in parent._folders:
+                name = f"Folder{i}"
+            folder = MemoryFolder(self.calls, name, parent._child_path(name))
+            parent._folders[name] = folder
+            parents.append(folder)
+
+        for folder in parents:
+            for j in range(self.tasks_per_folder):
+                self.__add_task(folder, f"Task{j}", rng)
+        return service
+
+    def __add_task(self, folder: MemoryFolder, name: str, rng: random.Random):
+        """Adds a generated task to a folder."""
+        path = folder._child_path(name)
+        trigger_type, trigger = _synthetic_trigger(rng)
+        enabled = rng.random() > 0.05
+        spec = {
+            "name":name,
+            "author":rng.choice(["svc_etl", "svc_reports", "admin", "Microsoft Corporation"]),
+            "description":f"Synthetic task {path}",
+            "xml_size":self.xml_size,
+            "enabled":enabled,
+            "trigger_type":trigger_type,
+            "trigger":trigger
+        }
+        last_run = datetime(2024, 9, 1, rng.randrange(24), rng.randrange(60))
+        runtime = {
+            "State":3 if enabled else 1,
+            "NextRunTime":last_run + timedelta(days=1),
+            "LastRunTime":last_run,
+            "LastTaskResult":rng.choices([0, 1, 2, 267011], weights=[90, 5, 3, 2])[0],
+            "NumberOfMissedRuns":rng.choices([0, 1, 3], weights=[95, 4, 1])[0]
+        }
+        folder._tasks[name] = MemoryTask(
+            self.calls, name, path, runtime, build=lambda: _synthetic_definition(self.calls, spec)
+        )
+
+    def connect(
+        self,
+        server: str|None=None,
+        user: str|None=None,
+        domain: str|None=None,
+        password: str|None=None
+    ) -> MemoryService:
+        """Connects to the in-memory Task Scheduler of a computer.
+
+        Returns:
+            Connected Schedule.Service object.
+        """
+        latency = self.connect_latency
+        if isinstance(latency, dict):
+            latency = latency.get(server, 0.0)
+        if latency:
+            time.sleep(latency)
+        if server in self.unreachable:
+            raise ConnectionError(f"The RPC server {server} is unavailable.")
+
+        service = self.service(server)
+        service.Connect(server, user, domain, password)
+        return service
+
+    def apartment(self):
+        """The in-memory objects need no COM apartment."""
+        return nullcontext()
@@ -9,7 +9,8 @@ from .constants import (
     TaskExecutionLimit,
     TaskInstancePolicy,
     EventIDs,
-    EventLogType
+    EventLogType,
+    TaskRunEvents
 )
 
 __all__ = [
@@ -23,5 +24,6 @@ __all__ = [
     "TaskExecutionLimit",
     "TaskInstancePolicy",
     "EventIDs",
-    "EventLogType"
+    "EventLogType",
+    "TaskRunEvents"
 ]
\ No newline at end of file
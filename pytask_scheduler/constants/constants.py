@@ -204,6 +204,14 @@ class TaskInstancePolicy:
         3:"Stops the existing instance and runs the new instance."
     }
 
+    # MultipleInstancesPolicy values written in the task xml.
+    xml_policies = {
+        "Parallel":0,
+        "Queue":1,
+        "IgnoreNew":2,
+        "StopExisting":3
+    }
+
     TASK_INSTANCES_PARALLEL = 0
     TASK_INSTANCES_QUEUE = 1
     TASK_INSTANCES_IGNORE_NEW = 2
@@ -476,3 +484,40 @@ class EventIDs:
         411:ID411,
         412:ID412
     }
+
+@dataclass
+class TaskRunEvents:
+    """Task scheduler event ids marking the start, end and trigger of a task instance.
+    Every event of an instance carries the instance id as its ActivityID.
+    """
+    START = 100
+
+    # event id of the instance end to the run status.
+    END = {
+        102:"COMPLETED",
+        101:"FAILED",
+        103:"FAILED",
+        202:"FAILED",
+        203:"FAILED",
+        111:"TERMINATED",
+        329:"TERMINATED",
+        330:"STOPPED"
+    }
+
+    # event id of the instance launch to the trigger type.
+    TRIGGERS = {
+        107:"TIME",
+        108:"EVENT",
+        109:"REGISTRATION",
+        110:"USER",
+        114:"MISSED",
+        117:"IDLE",
+        118:"BOOT",
+        119:"LOGON",
+        120:"SESSION",
+        121:"SESSION",
+        122:"SESSION",
+        123:"SESSION",
+        124:"SESSION",
+        125:"SESSION"
+    }
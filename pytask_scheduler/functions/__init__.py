@@ -1,5 +1,19 @@
-from .functions import get_task_scheduler_history
+from .functions import (
+    get_task_scheduler_history,
+    iter_task_scheduler_history,
+    get_new_task_scheduler_history,
+    iter_new_task_scheduler_history,
+    watch_task_scheduler_history,
+    tail_task_scheduler_history,
+    collect
+)
 
 __all__ = [
-    "get_task_scheduler_history"
+    "get_task_scheduler_history",
+    "iter_task_scheduler_history",
+    "get_new_task_scheduler_history",
+    "iter_new_task_scheduler_history",
+    "watch_task_scheduler_history",
+    "tail_task_scheduler_history",
+    "collect"
 ]
\ No newline at end of file
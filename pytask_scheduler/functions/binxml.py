@@ -0,0 +1,169 @@
+from datetime import datetime
+from Evtx.Nodes import (
+    get_variant_value,
+    AttributeNode,
+    BXmlTypeNode,
+    ConditionalSubstitutionNode,
+    FiletimeTypeNode,
+    NormalSubstitutionNode,
+    NullTypeNode,
+    OpenStartElementNode,
+    ValueNode,
+    NODE_TYPES
+)
+
+SYSTEM_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+class TemplateLayout:
+    """Where each field of a binary xml template gets its value from.
+
+    Elements are keyed by their tag name, attributes by their attribute name and \
+    `Data` elements by the value of their `Name` attribute, e.g. `TaskName`.
+
+    Attributes:
+        substitutions (`dict`): Field name to substitution index.
+        literals (`dict`): Field name to the literal value written in the template.
+        nested (`list`): Substitution indices holding nested binary xml, such as EventData.
+        first_data (`str`): Field name of the first `Data` element.
+    """
+    def __init__(self):
+        self.substitutions = {}
+        self.literals = {}
+        self.nested = []
+        self.first_data = None
+
+    def add(self, field: str, node):
+        """Adds the value node of a field to the layout."""
+        if isinstance(node, (NormalSubstitutionNode, ConditionalSubstitutionNode)):
+            if node.type() == NODE_TYPES.BXML:
+                self.nested.append(node.index())
+            else:
+                self.substitutions.setdefault(field, node.index())
+        elif isinstance(node, ValueNode):
+            self.literals.setdefault(field, node.children()[0].string())
+
+    def walk(self, node):
+        """Walks the template elements once and records the field positions."""
+        for child in node.children():
+            if not isinstance(child, OpenStartElementNode):
+                continue
+
+            field = child.tag_name()
+            attributes = [c for c in child.children() if isinstance(c, AttributeNode)]
+            for attr in attributes:
+                value = attr.attribute_value()
+                if field == "Data" and attr.attribute_name().string() == "Name" \
+                        and isinstance(value, ValueNode):
+                    field = value.children()[0].string()
+                else:
+                    self.add(attr.attribute_name().string(), value)
+
+            if child.tag_name() == "Data" and self.first_data is None:
+                self.first_data = field
+
+            for c in child.children():
+                if not isinstance(c, AttributeNode):
+                    self.add(field, c)
+            self.walk(child)
+
+# layouts are shared by every record using the same template definition.
+_layout_cache = {}
+
+def template_layout(root) -> TemplateLayout:
+    """Returns the cached layout of the template used by a record's root node."""
+    template = root.template()
+    key = (template.guid(), template.data_length())
+    layout = _layout_cache.get(key)
+    if layout is None:
+        layout = TemplateLayout()
+        layout.walk(template)
+        _layout_cache[key] = layout
+    return layout
+
+def format_system_time(value: str|datetime|None) -> str|None:
+    """Formats a SystemTime value the same way for every python-evtx version."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=None).strftime(SYSTEM_TIME_FORMAT)
+
+def _substitution_value(sub) -> str|None:
+    """Renders a substitution value as text, without building any xml."""
+    if isinstance(sub, NullTypeNode):
+        return None
+    if isinstance(sub, FiletimeTypeNode):
+        return format_system_time(sub.filetime())
+    value = sub.string()
+    return value if value != "" else None
+
+def _field_value(layout: TemplateLayout, subs: list, field: str) -> str|None:
+    """Value of a single field of the layout."""
+    if field in layout.substitutions:
+        return _substitution_value(subs[layout.substitutions[field]])
+    return layout.literals.get(field)
+
+def _collect_fields(root, fields: tuple, values: dict):
+    """Collects the wanted fields from a root node and its nested binary xml."""
+    layout = template_layout(root)
+    subs = root.substitutions()
+
+    for field in fields:
+        if field not in values and (field in layout.substitutions or field in layout.literals):
+            values[field] = _field_value(layout, subs, field)
+
+    if layout.first_data is not None and "_first_data" not in values:
+        values["_first_data"] = _field_value(layout, subs, layout.first_data)
+
+    for index in layout.nested:
+        if isinstance(subs[index], BXmlTypeNode):
+            _collect_fields(subs[index].root(), fields, values)
+
+def substitution_field(root, field: str) -> str|None:
+    """Reads a single substitution field of a root node without parsing the other \
+    substitution values.
+
+    Parameters:
+        root (`Evtx.Nodes.RootNode`): Root node of a record.
+        field (`str`): Field name, e.g. `EventID`.
+
+    Returns:
+        Field value, or None when the template does not hold the field as a substitution.
+    """
+    layout = template_layout(root)
+    index = layout.substitutions.get(field)
+    if index is None:
+        return None
+
+    ofs = root.tag_and_children_length()
+    sub_count = root.unpack_dword(ofs)
+    value_ofs = ofs + 4 + sub_count * 4
+    for i in range(index):
+        value_ofs += root.unpack_word(ofs + 4 + i * 4)
+    size = root.unpack_word(ofs + 4 + index * 4)
+    type_ = root.unpack_byte(ofs + 4 + index * 4 + 0x2)
+
+    sub = get_variant_value(root._buf, root.offset() + value_ofs, root._chunk, root, type_, length=size)
+    return _substitution_value(sub)
+
+def extract_fields(root, fields: tuple) -> dict|None:
+    """Reads fields straight from a record's substitution values.
+
+    The task name falls back to the first `Data` value for events without a \
+    `TaskName`, the same node the xml view reads.
+
+    Parameters:
+        root (`Evtx.Nodes.RootNode`): Root node of a record.
+        fields (`tuple`): Field names, e.g. `("EventID", "SystemTime", "TaskName")`.
+
+    Returns:
+        Dictionary of field values, or None when the record's template does not \
+        contain an EventID.
+    """
+    values = {}
+    _collect_fields(root, fields, values)
+    if "EventID" not in values:
+        return None
+    if values.get("TaskName") is None:
+        values["TaskName"] = values.get("_first_data")
+    return values
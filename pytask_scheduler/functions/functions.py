@@ -1,38 +1,958 @@
 import os
+import glob
+import json
+import mmap
+import time
+import asyncio
+import inspect
+import threading
 import polars as pl
 import xml.etree.ElementTree as ET
-from Evtx.Evtx import Evtx
-from pytask_scheduler import EventIDs, EventLogType, HistoryDataFrame
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from Evtx.Evtx import ChunkHeader, Evtx, Record
+from pytask_scheduler import EventIDs, EventLogType, HistoryDataFrame, HistoryQuery
+from .binxml import extract_fields, format_system_time, substitution_field
 
-def get_task_scheduler_history() -> HistoryDataFrame:
-    """Get the task scheduler event history."""
-    evt_fpath = r"C:\Windows\System32\winevt\Logs\Microsoft-Windows-TaskScheduler%4Operational.evtx"
-    
-    if os.access(evt_fpath, os.R_OK):
-        event_data = []
+TASK_SCHEDULER_EVTX_PATH = r"C:\Windows\System32\winevt\Logs\Microsoft-Windows-TaskScheduler%4Operational.evtx"
+
+# raw column layout of the history batches before preprocessing.
+HISTORY_SCHEMA = {
+    "event_created_time":pl.String,
+    "event_level":pl.String,
+    "event_id":pl.String,
+    "task_name":pl.String,
+    "event_record_id":pl.String,
+    "activity_id":pl.String
+}
+
+# event fields read for each raw column, the event record id comes from the record header.
+HISTORY_FIELDS = {
+    "event_created_time":"SystemTime",
+    "event_level":"Level",
+    "event_id":"EventID",
+    "task_name":"TaskName",
+    "activity_id":"ActivityID"
+}
+
+# number of 64 KiB chunks handed to a worker process at a time.
+CHUNK_RANGE_SIZE = 16
+
+# column holding the computer name of each record while reading several files.
+COMPUTER_KEY = "_computer"
+
+# record header layout, used to read record timestamps without parsing the records.
+RECORD_OFFSET = 0x200
+RECORD_MAGIC = 0x00002a2a
+RECORD_TIMESTAMP_OFFSET = 0x10
+FILETIME_EPOCH = datetime(1601, 1, 1)
+
+# file layout, the 64 KiB chunks follow the 4 KiB file header.
+FILE_HEADER_SIZE = 0x1000
+CHUNK_SIZE = 0x10000
+
+def _history_schema(fields: tuple) -> dict:
+    """Raw column layout including the extra event fields."""
+    return {**HISTORY_SCHEMA, **{f: pl.String for f in fields if f not in HISTORY_SCHEMA}}
+
+def _empty_event_data(fields: tuple) -> dict:
+    """Empty event columns for a new batch."""
+    return {col: [] for col in _history_schema(fields)}
+
+def _xml_field(root, field: str) -> str|None:
+    """Finds an extra field in the rendered xml by element, attribute or Data name."""
+    for elem in root.iter():
+        if elem.tag.split("}")[-1] == field or elem.attrib.get("Name") == field:
+            return elem.text
+        if field in elem.attrib:
+            return elem.attrib[field]
+    return None
+
+def _event_fields_xml(record, fields: tuple) -> dict:
+    """Reads the event fields by rendering the record to xml, used for records \
+    whose template does not hold the system fields."""
+    root = ET.fromstring(record.xml())
+
+    # extracts the event data from the xml string.
+    values = {
+        "SystemTime":format_system_time(root[0][7].attrib.get("SystemTime")),
+        "Level":root[0][3].text,
+        "EventID":root[0][1].text,
+        "TaskName":root[1][0].text,
+        "ActivityID":root[0][9].attrib.get("ActivityID") or None
+    }
+    for field in fields:
+        if field not in values:
+            values[field] = _xml_field(root, field)
+    return values
+
+def _filetime(value: datetime) -> int:
+    """Converts a datetime to a FILETIME, naive datetimes are taken as UTC like the \
+    `Event Created` column."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - FILETIME_EPOCH) // timedelta(microseconds=1) * 10
+
+class _HistoryFilter:
+    """Predicates pushed down into the event log reads.
+
+    The time window is checked against the record header timestamps, the time each \
+    event was written to the log, and the event id against its single substitution \
+    value, before the event fields are extracted.
+    """
+    def __init__(
+        self,
+        since: datetime|None=None,
+        until: datetime|None=None,
+        event_ids: Iterable[int]|None=None,
+        task_names: Iterable[str]|None=None
+    ):
+        self.since = _filetime(since) if since is not None else None
+        self.until = _filetime(until) if until is not None else None
+        self.event_ids = {str(i) for i in event_ids} if event_ids is not None else None
+        self.task_names = set(task_names) if task_names is not None else None
+        if self.since is not None and self.until is not None and self.since > self.until:
+            raise ValueError("since must not be later than until.")
+
+    def skip_chunk(self, chunk) -> bool:
+        """Whether the timestamps of every record of the chunk are outside the time window.
+
+        Records are not written in timestamp order, so the headers of all the records \
+        are walked for the earliest and latest timestamp, without parsing the records.
+        """
+        if self.since is None and self.until is None:
+            return False
+
+        first = last = None
+        offset = RECORD_OFFSET
+        end = chunk.next_record_offset()
+        while offset < end:
+            if chunk.unpack_dword(offset) != RECORD_MAGIC:
+                return False
+            size = chunk.unpack_dword(offset + 4)
+            if size < 0x18:
+                return False
+            timestamp = chunk.unpack_qword(offset + RECORD_TIMESTAMP_OFFSET)
+            first = timestamp if first is None else min(first, timestamp)
+            last = timestamp if last is None else max(last, timestamp)
+            offset += size
+
+        if first is None:
+            return False
+        return (self.since is not None and last < self.since) \
+            or (self.until is not None and first > self.until)
+
+    def keep_record(self, record, root) -> bool:
+        """Checks the record header timestamp and event id."""
+        if self.since is not None or self.until is not None:
+            timestamp = record.unpack_qword(RECORD_TIMESTAMP_OFFSET)
+            if (self.since is not None and timestamp < self.since) \
+                    or (self.until is not None and timestamp > self.until):
+                return False
+
+        if self.event_ids is not None:
+            event_id = substitution_field(root, "EventID")
+            if event_id is not None and event_id not in self.event_ids:
+                return False
+        return True
+
+    def keep_values(self, values: dict) -> bool:
+        """Checks the extracted event id and task name, the task name matches on the \
+        full task path or the task name alone."""
+        if self.event_ids is not None and values.get("EventID") not in self.event_ids:
+            return False
+        if self.task_names is not None:
+            task_name = values.get("TaskName")
+            if task_name is None:
+                return False
+            if task_name not in self.task_names \
+                    and task_name.split("\\")[-1] not in self.task_names:
+                return False
+        return True
+
+def _extract_event(
+    record,
+    event_data: dict,
+    fields: tuple=(),
+    history_filter: _HistoryFilter|None=None,
+    seen: set|None=None
+) -> bool:
+    """Extracts the event data of a record and appends it to the event columns.
+
+    The values are read from the record's substitution values and header, the \
+    record is only rendered to xml when its template does not hold the system fields.
+    Records whose (computer, event record id) key is in `seen` are skipped before \
+    their fields are extracted. Returns False when the record is filtered out.
+    """
+    root = record.root()
+    key = None
+    if seen is not None or COMPUTER_KEY in event_data:
+        key = (substitution_field(root, "Computer"), record.record_num())
+        if seen is not None and key in seen:
+            return False
+
+    if history_filter is not None and not history_filter.keep_record(record, root):
+        return False
+
+    values = extract_fields(root, tuple(HISTORY_FIELDS.values()) + fields)
+    if values is None:
+        values = _event_fields_xml(record, fields)
+    if history_filter is not None and not history_filter.keep_values(values):
+        return False
+
+    for col, field in HISTORY_FIELDS.items():
+        event_data[col].append(values.get(field))
+    event_data["event_record_id"].append(str(record.record_num()))
+    for field in fields:
+        if field not in HISTORY_SCHEMA:
+            event_data[field].append(values.get(field))
+    if COMPUTER_KEY in event_data:
+        event_data[COMPUTER_KEY].append(key[0])
+    if seen is not None:
+        seen.add(key)
+    return True
+
+def _drop_seen(df: pl.DataFrame, seen: set) -> pl.DataFrame:
+    """Drops the records already read, from another file or earlier in the batch, using \
+    the hash set of (computer, event record id) keys read so far."""
+    keep = []
+    for key in zip(df[COMPUTER_KEY].to_list(), df["event_record_id"].to_list()):
+        keep.append(key not in seen)
+        seen.add(key)
+    return df.filter(pl.Series(keep, dtype=pl.Boolean)).drop(COMPUTER_KEY)
+
+def _resolve_evtx_paths(evt_fpath: str) -> list[str]:
+    """Resolves an event log path, glob pattern or directory to the event log files, \
+    sorted by name so archived logs are read before the live log."""
+    if os.path.isdir(evt_fpath):
+        return sorted(glob.glob(os.path.join(evt_fpath, "*.evtx")))
+    if glob.has_magic(evt_fpath):
+        return sorted(glob.glob(evt_fpath))
+    return [evt_fpath]
+
+def _build_history_frame(event_data: dict|pl.DataFrame, fields: tuple=()) -> HistoryDataFrame:
+    """Builds the preprocessed history data frame from the extracted event columns."""
+    if isinstance(event_data, pl.DataFrame):
+        df = event_data
+    else:
+        df = pl.DataFrame(event_data, schema=_history_schema(fields))
+
+    lf = df.lazy().with_columns(
+        pl.col("event_id").replace(EventIDs.DESCRIPTIONS).alias("event_id_description"),
+        pl.col("event_level").replace(EventLogType.DESCRIPTIONS).alias("event_log_description")
+    )
+
+    return HistoryQuery(lf).preprocess().collect()
+
+def _iter_history_batches(
+    evt_fpaths: list[str],
+    batch_size: int,
+    fields: tuple,
+    history_filter: _HistoryFilter|None=None
+) -> Iterator[HistoryDataFrame]:
+    """Reads the event log records and yields them in batches of `batch_size`.
+
+    Records of several files are deduplicated by their (computer, event record id) key.
+    """
+    event_data = _empty_event_data(fields)
+    batch_len = 0
+    seen = set() if len(evt_fpaths) > 1 else None
+
+    for evt_fpath in evt_fpaths:
+        with Evtx(evt_fpath) as t:
+            for chunk in t.chunks():
+                if history_filter is not None and history_filter.skip_chunk(chunk):
+                    continue
+
+                for r in chunk.records():
+                    if not _extract_event(r, event_data, fields, history_filter, seen):
+                        continue
+                    batch_len += 1
+
+                    if batch_len == batch_size:
+                        yield _build_history_frame(event_data, fields)
+                        event_data = _empty_event_data(fields)
+                        batch_len = 0
+
+    if batch_len > 0:
+        yield _build_history_frame(event_data, fields)
+
+def _parse_chunk_range(
+    evt_fpath: str,
+    first_chunk: int,
+    last_chunk: int,
+    fields: tuple,
+    history_filter: _HistoryFilter|None=None,
+    keyed: bool=False
+) -> pl.DataFrame:
+    """Parses the records of the chunks in `[first_chunk, last_chunk)` into a column batch.
+
+    This runs inside the worker processes, so it opens its own view of the event log. \
+    Keyed batches hold the computer name of each record for deduplication.
+    """
+    event_data = _empty_event_data(fields)
+    schema = _history_schema(fields)
+    if keyed:
+        event_data[COMPUTER_KEY] = []
+        schema[COMPUTER_KEY] = pl.String
+
+    with Evtx(evt_fpath) as t:
+        for chunk in islice(t.chunks(), first_chunk, last_chunk):
+            if history_filter is not None and history_filter.skip_chunk(chunk):
+                continue
+            for r in chunk.records():
+                _extract_event(r, event_data, fields, history_filter)
+    return pl.DataFrame(event_data, schema=schema)
+
+def _iter_history_batches_parallel(
+    evt_fpaths: list[str],
+    batch_size: int,
+    workers: int,
+    fields: tuple,
+    history_filter: _HistoryFilter|None=None
+) -> Iterator[HistoryDataFrame]:
+    """Parses chunk ranges of every file across a process pool and yields batches \
+    in file and record order.
+
+    Records of several files are deduplicated by their (computer, event record id) key \
+    as the ranges are merged.
+    """
+    chunk_ranges = []
+    for evt_fpath in evt_fpaths:
         with Evtx(evt_fpath) as t:
-            for event_record in [r.xml() for r in list(t.records())]:
-                root = ET.fromstring(event_record)
-
-                # extracts the event data from the xml string.
-                event_data.append(
-                    {
-                        "event_created_time":root[0][7].attrib.get("SystemTime"),
-                        "event_level":root[0][3].text,
-                        "event_id":root[0][1].text,
-                        "task_name":root[1][0].text
-                    }
+            chunk_count = t.get_file_header().chunk_count()
+        chunk_ranges.extend(
+            (evt_fpath, i, min(i + CHUNK_RANGE_SIZE, chunk_count))
+            for i in range(0, chunk_count, CHUNK_RANGE_SIZE)
+        )
+    chunk_ranges = iter(chunk_ranges)
+    keyed = len(evt_fpaths) > 1
+    seen = set()
+    pending = []
+    pending_len = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep a bounded number of chunk ranges in flight so memory stays flat.
+        futures = deque(
+            executor.submit(_parse_chunk_range, evt_fpath, first, last, fields, history_filter, keyed)
+            for evt_fpath, first, last in islice(chunk_ranges, workers * 2)
+        )
+        while futures:
+            df = futures.popleft().result()
+            for evt_fpath, first, last in islice(chunk_ranges, 1):
+                futures.append(
+                    executor.submit(
+                        _parse_chunk_range, evt_fpath, first, last, fields, history_filter, keyed
+                    )
                 )
+            if keyed:
+                df = _drop_seen(df, seen)
+
+            pending.append(df)
+            pending_len += df.height
+            while pending_len >= batch_size:
+                df = pl.concat(pending)
+                yield _build_history_frame(df.head(batch_size), fields)
+                pending = [df.slice(batch_size)]
+                pending_len = pending[0].height
 
-        df = pl.DataFrame(event_data)
+    if pending_len > 0:
+        yield _build_history_frame(pl.concat(pending), fields)
 
-        df = df.with_columns(
-            pl.col("event_id").replace(EventIDs.DESCRIPTIONS).alias("event_id_description"),
-            pl.col("event_level").replace(EventLogType.DESCRIPTIONS).alias("event_log_description")
+def _read_checkpoint(checkpoint_fpath: str) -> dict|None:
+    """Reads the incremental read checkpoint, returns None when there is no checkpoint yet."""
+    if not os.path.exists(checkpoint_fpath):
+        return None
+    with open(checkpoint_fpath, "r") as f:
+        return json.load(f)
+
+def _write_checkpoint(
+    checkpoint_fpath: str,
+    oldest_record_id: int,
+    last_record_id: int,
+    chunk_index: int,
+    chunk_first_record_id: int,
+    last_record_time: int
+):
+    """Writes the incremental read checkpoint, replacing the previous one atomically."""
+    tmp_fpath = checkpoint_fpath + ".tmp"
+    with open(tmp_fpath, "w") as f:
+        json.dump(
+            {
+                "oldest_record_id":oldest_record_id,
+                "last_record_id":last_record_id,
+                "last_record_time":last_record_time,
+                "chunk_index":chunk_index,
+                "chunk_first_record_id":chunk_first_record_id
+            },
+            f
         )
+    os.replace(tmp_fpath, checkpoint_fpath)
+
+def _record_time(chunks: list, record_id: int) -> int|None:
+    """Header timestamp of a record, None when the record is no longer in the log."""
+    for chunk in chunks:
+        if chunk.log_first_record_number() <= record_id <= chunk.log_last_record_number():
+            for r in chunk.records():
+                if r.record_num() == record_id:
+                    return r.unpack_qword(RECORD_TIMESTAMP_OFFSET)
+    return None
+
+def _log_cleared(checkpoint: dict, chunks: list, oldest_record_id: int) -> bool:
+    """Whether the log was cleared since the checkpoint.
+
+    Record ids only grow while a log is written, so the log was cleared when its newest \
+    record id is below the checkpoint, when the first record id of its oldest chunk is \
+    below the one saved in the checkpoint, or when the checkpoint record id is now held \
+    by a record with another timestamp because the cleared log was refilled past it.
+    """
+    last_record_id = checkpoint["last_record_id"]
+    newest_record_id = max((c.log_last_record_number() for c in chunks), default=0)
+    if newest_record_id < last_record_id:
+        return True
+    if oldest_record_id < checkpoint.get("oldest_record_id", oldest_record_id):
+        return True
+    if "last_record_time" in checkpoint:
+        record_time = _record_time(chunks, last_record_id)
+        if record_time is not None and record_time != checkpoint["last_record_time"]:
+            return True
+    return False
+
+def _iter_new_history_batches(
+    evt_fpath: str,
+    checkpoint_fpath: str,
+    batch_size: int,
+    fields: tuple
+) -> Iterator[HistoryDataFrame]:
+    """Yields the records appended since the checkpoint, saving the checkpoint as \
+    each batch is consumed."""
+    checkpoint = _read_checkpoint(checkpoint_fpath)
+    event_data = _empty_event_data(fields)
+    batch_len = 0
+    position = None
+
+    with Evtx(evt_fpath) as t:
+        fh = t.get_file_header()
+        chunks = list(t.chunks())
+        start = fh.oldest_chunk() if fh.oldest_chunk() < len(chunks) else 0
+        oldest_record_id = chunks[start].log_first_record_number() if chunks else 0
+        last_record_id = 0
+
+        if checkpoint is not None and not _log_cleared(checkpoint, chunks, oldest_record_id):
+            last_record_id = checkpoint["last_record_id"]
+            index = checkpoint["chunk_index"]
+            if (index < len(chunks)
+                and chunks[index].log_first_record_number() == checkpoint["chunk_first_record_id"]):
+                start = index
+            # otherwise the checkpoint chunk was overwritten by a log wrap, so every chunk \
+            # is scanned from the oldest one.
+
+        for index in chain(range(start, len(chunks)), range(0, start)):
+            chunk = chunks[index]
+            if chunk.log_last_record_number() <= last_record_id:
+                continue
+
+            for r in chunk.records():
+                record_id = r.record_num()
+                if record_id <= last_record_id:
+                    continue
+
+                _extract_event(r, event_data, fields)
+                batch_len += 1
+                position = (
+                    record_id,
+                    index,
+                    chunk.log_first_record_number(),
+                    r.unpack_qword(RECORD_TIMESTAMP_OFFSET)
+                )
 
-        df = HistoryDataFrame(df).preprocess()
-        return df
+                if batch_len == batch_size:
+                    yield _build_history_frame(event_data, fields)
+                    _write_checkpoint(checkpoint_fpath, oldest_record_id, *position)
+                    event_data = _empty_event_data(fields)
+                    batch_len = 0
+
+    if batch_len > 0:
+        yield _build_history_frame(event_data, fields)
+    if position is not None:
+        _write_checkpoint(checkpoint_fpath, oldest_record_id, *position)
+
+class _HistoryTail:
+    """Reads the records appended to an event log since the last read, keeping the file open.
+
+    The position is the last record id read, its timestamp and offset, and the chunk and \
+    offset after it. Each read maps the file again only when it has grown, rereads the \
+    header of the chunk at the position and decodes the records past the offset, then \
+    moves on to the next chunks while they hold newer records. When the chunk at the \
+    position was overwritten, by a log wrap or clear, the chunks are searched for the \
+    records after the last record id. The log was cleared when its record ids are all \
+    below the last record id, or when that record id is held by a record with another \
+    timestamp because the cleared log was refilled past it.
+    """
+    def __init__(
+        self,
+        evt_fpath: str,
+        fields: tuple=(),
+        history_filter: _HistoryFilter|None=None,
+        from_start: bool=False
+    ):
+        self.fields = fields
+        self.history_filter = history_filter
+        self.f = open(evt_fpath, "rb")
+        self.buf = None
+        self.size = 0
+        self.last_record_id = 0
+        self.last_record_time = None
+        self.last_record_offset = None
+        self.chunk_index = None
+        self.chunk_first_record_id = None
+        self.offset = RECORD_OFFSET
+
+        if not from_start:
+            # starts after the newest record, only the records appended later are read.
+            self.__remap()
+            chunks = [(c.log_last_record_number(), i, c) for i, c in self.__chunks()]
+            if chunks:
+                self.last_record_id, index, chunk = max(chunks, key=lambda c: c[0])
+                self.__move(index, chunk, chunk.next_record_offset())
+                self.last_record_offset = chunk.last_record_offset()
+                self.last_record_time = chunk.unpack_qword(
+                    self.last_record_offset + RECORD_TIMESTAMP_OFFSET
+                )
+
+    def close(self):
+        if self.buf is not None:
+            self.buf.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __remap(self):
+        """Maps the file again when it has grown."""
+        size = os.fstat(self.f.fileno()).st_size
+        if size != self.size and size > 0:
+            if self.buf is not None:
+                self.buf.close()
+            self.buf = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.size = size
+
+    def __chunk(self, index: int) -> ChunkHeader|None:
+        """Header of a chunk, None when the chunk has not been written yet."""
+        offset = FILE_HEADER_SIZE + index * CHUNK_SIZE
+        if offset + CHUNK_SIZE > self.size:
+            return None
+        chunk = ChunkHeader(self.buf, offset)
+        return chunk if chunk.check_magic() else None
+
+    def __chunks(self) -> Iterator[tuple[int, ChunkHeader]]:
+        for index in range(max(self.size - FILE_HEADER_SIZE, 0) // CHUNK_SIZE):
+            chunk = self.__chunk(index)
+            if chunk is not None:
+                yield index, chunk
+
+    def __move(self, index: int, chunk: ChunkHeader, offset: int):
+        self.chunk_index = index
+        self.chunk_first_record_id = chunk.log_first_record_number()
+        self.offset = offset
+        self.last_record_offset = None
+
+    def __overwritten(self, chunk: ChunkHeader) -> bool:
+        """Whether the chunk at the position no longer holds the records read from it."""
+        if chunk.log_first_record_number() != self.chunk_first_record_id \
+                or chunk.log_last_record_number() < self.last_record_id:
+            return True
+        if self.last_record_offset is None:
+            return False
+        offset = self.last_record_offset
+        return chunk.unpack_dword(offset) != RECORD_MAGIC \
+            or chunk.unpack_qword(offset + 8) != self.last_record_id \
+            or chunk.unpack_qword(offset + RECORD_TIMESTAMP_OFFSET) != self.last_record_time
+
+    def __next_chunk(self) -> tuple[int, ChunkHeader]|None:
+        """Chunk holding the oldest record after the last record id."""
+        chunks = [(c.log_first_record_number(), i, c) for i, c in self.__chunks()]
+        if chunks and max(c.log_last_record_number() for _, _, c in chunks) < self.last_record_id:
+            # the log was cleared, its record ids start over.
+            self.last_record_id = 0
+        elif self.last_record_time is not None:
+            record_time = _record_time([c for _, _, c in chunks], self.last_record_id)
+            if record_time is not None and record_time != self.last_record_time:
+                # the log was cleared and refilled past the last record id.
+                self.last_record_id = 0
+        newer = [c for c in chunks if c[2].log_last_record_number() > self.last_record_id]
+        if not newer:
+            return None
+        _, index, chunk = min(newer, key=lambda c: c[0])
+        return index, chunk
+
+    def __new_records(self) -> Iterator[Record]:
+        """Records after the position, the position moves past each record yielded."""
+        chunk = None
+        if self.chunk_index is not None:
+            chunk = self.__chunk(self.chunk_index)
+            if chunk is not None and self.__overwritten(chunk):
+                chunk = None
+        if chunk is None:
+            found = self.__next_chunk()
+            if found is None:
+                return
+            self.__move(found[0], found[1], RECORD_OFFSET)
+            chunk = found[1]
+
+        while True:
+            end = chunk.next_record_offset()
+            while self.offset < end:
+                if chunk.unpack_dword(self.offset) != RECORD_MAGIC:
+                    return
+                record = Record(self.buf, chunk.offset() + self.offset, chunk)
+                if record.size() < 0x18 or not record.verify():
+                    # the record is still being written, it is read on the next call.
+                    return
+                offset = self.offset
+                self.offset += record.size()
+                if record.record_num() > self.last_record_id:
+                    self.last_record_id = record.record_num()
+                    self.last_record_time = record.unpack_qword(RECORD_TIMESTAMP_OFFSET)
+                    self.last_record_offset = offset
+                    yield record
+
+            # the chunk is full when the next chunk holds newer records.
+            index = self.chunk_index + 1
+            next_chunk = self.__chunk(index)
+            if next_chunk is None or next_chunk.log_first_record_number() <= self.last_record_id:
+                index, next_chunk = 0, self.__chunk(0)
+                if next_chunk is None or next_chunk.log_first_record_number() <= self.last_record_id:
+                    return
+            self.__move(index, next_chunk, RECORD_OFFSET)
+            chunk = next_chunk
+
+    def read(self, batch_size: int) -> Iterator[HistoryDataFrame]:
+        """Yields the records appended since the last read in batches of `batch_size`."""
+        self.__remap()
+        if self.buf is None:
+            return
+        event_data = _empty_event_data(self.fields)
+        batch_len = 0
+        for record in self.__new_records():
+            if not _extract_event(record, event_data, self.fields, self.history_filter):
+                continue
+            batch_len += 1
+            if batch_len == batch_size:
+                yield _build_history_frame(event_data, self.fields)
+                event_data = _empty_event_data(self.fields)
+                batch_len = 0
+        if batch_len > 0:
+            yield _build_history_frame(event_data, self.fields)
+
+def iter_task_scheduler_history(
+    batch_size: int=10_000,
+    evt_fpath: str=TASK_SCHEDULER_EVTX_PATH,
+    workers: int|None=None,
+    fields: list[str]|None=None,
+    since: datetime|None=None,
+    until: datetime|None=None,
+    event_ids: list[int]|None=None,
+    task_names: list[str]|None=None
+) -> Iterator[HistoryDataFrame]:
+    """Iterate over the task scheduler event history in batches.
+
+    Only one batch of records is held in memory at a time, use `collect` to combine \
+    the batches into a single data frame.
+
+    The `since`, `until`, `event_ids` and `task_names` filters are checked while the log \
+    is read, before the event fields are extracted. Chunks of the log whose records are \
+    all outside the time window are skipped without being parsed.
+
+    Several event log files, such as archived logs or exports collected from many \
+    computers, are parsed concurrently across a process pool and merged back in file \
+    name order, and records found in more than one file are only returned once, by their \
+    computer name and EventRecordID.
+
+    Parameters:
+        batch_size (`int`): Maximum number of events in each batch.
+        evt_fpath (`str`): Path to the task scheduler operational event log file, a glob \
+            pattern such as `Archive-Microsoft-Windows-TaskScheduler%4Operational-*.evtx` \
+            or a directory of event log files.
+        workers (`int`): Number of worker processes used to parse the logs. Ranges of \
+            event log chunks of every file are shared out to the workers and merged back \
+            in record order. By default a single file is parsed on the calling process \
+            and several files across one worker per CPU, pass `workers=1` to parse them \
+            on the calling process. On Windows the calling script must be guarded by \
+            `if __name__ == "__main__":`.
+        fields (`list[str]`): Extra event fields to add as columns, by System element or \
+            attribute name or EventData name, e.g. `["ResultCode", "UserContext"]`.
+        since (`datetime`): Only events written to the log at or after this time, by the \
+            record header timestamp. Naive datetimes are taken as UTC, the same clock as \
+            the `Event Created` column.
+        until (`datetime`): Only events written to the log at or before this time.
+        event_ids (`list[int]`): Only events with these event ids, e.g. `[101, 201]`.
+        task_names (`list[str]`): Only events of these tasks, by task name or full task path.
+
+    Returns:
+        Iterator of HistoryDataFrame objects.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer.")
+
+    fields = tuple(fields or ())
+    history_filter = None
+    if any(arg is not None for arg in (since, until, event_ids, task_names)):
+        history_filter = _HistoryFilter(since, until, event_ids, task_names)
+
+    evt_fpaths = _resolve_evtx_paths(evt_fpath)
+    if not evt_fpaths:
+        raise FileNotFoundError(f"No event log files found at {evt_fpath}.")
+
+    if workers is None and len(evt_fpaths) > 1:
+        workers = os.cpu_count() or 1
+
+    if all(os.access(f, os.R_OK) for f in evt_fpaths):
+        if workers is not None and workers > 1:
+            return _iter_history_batches_parallel(
+                evt_fpaths, batch_size, workers, fields, history_filter
+            )
+        return _iter_history_batches(evt_fpaths, batch_size, fields, history_filter)
     else:
         raise Exception("Read access denied for Task Scheduler operations event logs.")
-    
+
+def iter_new_task_scheduler_history(
+    checkpoint_fpath: str,
+    batch_size: int=10_000,
+    evt_fpath: str=TASK_SCHEDULER_EVTX_PATH,
+    fields: list[str]|None=None
+) -> Iterator[HistoryDataFrame]:
+    """Iterate over the task scheduler events appended since the last read.
+
+    The last EventRecordID and chunk position consumed are saved to the checkpoint file \
+    as each batch is consumed, so the next call only parses the records appended since \
+    then. The first record id of the oldest chunk and the timestamp of the last record \
+    are saved too, so a log that was cleared, even when refilled past the checkpoint \
+    record id, is read again from its first record. When the log has wrapped over the \
+    checkpoint chunk, every chunk is scanned for the newer records.
+
+    The events are delivered at least once. The checkpoint moves past a batch when the \
+    next batch is requested or the iterator is exhausted, so a batch whose processing \
+    failed is read again. A consumer that stops iterating early also gets its last \
+    batch again on the next call.
+
+    Parameters:
+        checkpoint_fpath (`str`): Path to the checkpoint file, created on the first read.
+        batch_size (`int`): Maximum number of events in each batch.
+        evt_fpath (`str`): Path to the task scheduler operational event log file.
+        fields (`list[str]`): Extra event fields to add as columns.
+
+    Returns:
+        Iterator of HistoryDataFrame objects.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+
+    fields = tuple(fields or ())
+    if os.access(evt_fpath, os.R_OK):
+        return _iter_new_history_batches(evt_fpath, checkpoint_fpath, batch_size, fields)
+    else:
+        raise Exception("Read access denied for Task Scheduler operations event logs.")
+
+def collect(batches: Iterable[HistoryDataFrame], fields: list[str]|None=None) -> HistoryDataFrame:
+    """Concatenates history batches into a single data frame.
+
+    Parameters:
+        batches (`Iterable[HistoryDataFrame]`): Batches from `iter_task_scheduler_history`.
+        fields (`list[str]`): Extra event fields, used for the columns of an empty result.
+
+    Returns:
+        HistoryDataFrame object.
+    """
+    frames = list(batches)
+    if not frames:
+        fields = tuple(fields or ())
+        return _build_history_frame(_empty_event_data(fields), fields)
+    return HistoryDataFrame(pl.concat(frames, rechunk=True))
+
+def get_task_scheduler_history(
+    evt_fpath: str=TASK_SCHEDULER_EVTX_PATH,
+    workers: int|None=None,
+    fields: list[str]|None=None,
+    since: datetime|None=None,
+    until: datetime|None=None,
+    event_ids: list[int]|None=None,
+    task_names: list[str]|None=None
+) -> HistoryDataFrame:
+    """Get the task scheduler event history.
+
+    Parameters:
+        evt_fpath (`str`): Path to the event log file, a glob pattern or a directory of \
+            event log files, see `iter_task_scheduler_history`.
+        workers (`int`): Number of worker processes used to parse the logs.
+        fields (`list[str]`): Extra event fields to add as columns.
+        since (`datetime`): Only events written to the log at or after this time, naive \
+            datetimes are taken as UTC.
+        until (`datetime`): Only events written to the log at or before this time.
+        event_ids (`list[int]`): Only events with these event ids.
+        task_names (`list[str]`): Only events of these tasks, by task name or full task path.
+    """
+    return collect(
+        iter_task_scheduler_history(
+            evt_fpath=evt_fpath,
+            workers=workers,
+            fields=fields,
+            since=since,
+            until=until,
+            event_ids=event_ids,
+            task_names=task_names
+        ),
+        fields
+    )
+
+def get_new_task_scheduler_history(
+    checkpoint_fpath: str,
+    evt_fpath: str=TASK_SCHEDULER_EVTX_PATH,
+    fields: list[str]|None=None
+) -> HistoryDataFrame:
+    """Get the task scheduler events appended since the last read.
+
+    Parameters:
+        checkpoint_fpath (`str`): Path to the checkpoint file, created on the first read.
+        evt_fpath (`str`): Path to the task scheduler operational event log file.
+        fields (`list[str]`): Extra event fields to add as columns.
+    """
+    return collect(
+        iter_new_task_scheduler_history(checkpoint_fpath, evt_fpath=evt_fpath, fields=fields),
+        fields
+    )
+
+def _open_history_tail(
+    evt_fpath: str,
+    fields: list[str]|None,
+    event_ids: list[int]|None,
+    task_names: list[str]|None,
+    from_start: bool
+) -> _HistoryTail:
+    """Opens the event log for a live tail, with the event id and task name filters."""
+    history_filter = None
+    if event_ids is not None or task_names is not None:
+        history_filter = _HistoryFilter(event_ids=event_ids, task_names=task_names)
+    if os.access(evt_fpath, os.R_OK):
+        return _HistoryTail(evt_fpath, tuple(fields or ()), history_filter, from_start)
+    else:
+        raise Exception("Read access denied for Task Scheduler operations event logs.")
+
+async def _await(awaitable: Awaitable):
+    """Awaits an awaitable, so it can be run as a coroutine."""
+    return await awaitable
+
+def watch_task_scheduler_history(
+    callback: Callable[[HistoryDataFrame], object]|Callable[[HistoryDataFrame], Awaitable],
+    evt_fpath: str=TASK_SCHEDULER_EVTX_PATH,
+    interval: float=1.0,
+    batch_size: int=10_000,
+    fields: list[str]|None=None,
+    event_ids: list[int]|None=None,
+    task_names: list[str]|None=None,
+    from_start: bool=False,
+    stop: threading.Event|None=None,
+    loop: asyncio.AbstractEventLoop|None=None
+):
+    """Calls `callback` with the task scheduler events as they are logged.
+
+    The event log is kept open and checked every `interval` seconds for records appended \
+    to the chunk being filled or to new chunks, and only those records are decoded, so \
+    each check costs as much as the events logged since the last one. The events are \
+    passed to the callback in micro batches of at most `batch_size` events, the checks \
+    without new events are not passed on. This call blocks until `stop` is set, run it \
+    on a thread to watch in the background. An exception raised by the callback stops \
+    the watch.
+
+    The callback may be a coroutine function. Its coroutine is awaited before the next \
+    check, on `loop` when given, e.g. the loop of the application the watch thread was \
+    started from, otherwise on an event loop kept by the watch.
+
+    Parameters:
+        callback (`Callable`): Called with a HistoryDataFrame of each micro batch, a \
+            function or a coroutine function.
+        evt_fpath (`str`): Path to the task scheduler operational event log file.
+        interval (`float`): Seconds between the checks for new events.
+        batch_size (`int`): Maximum number of events in each micro batch.
+        fields (`list[str]`): Extra event fields to add as columns.
+        event_ids (`list[int]`): Only events with these event ids, e.g. `[101, 103, 111, 203]`.
+        task_names (`list[str]`): Only events of these tasks, by task name or full task path.
+        from_start (`bool`): Also pass the events already in the log, by default only the \
+            events logged after the call are.
+        stop (`threading.Event`): Stops the watch when set.
+        loop (`asyncio.AbstractEventLoop`): Running event loop the coroutines of an async \
+            callback are awaited on, it must not be the loop of the calling thread.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    stop = stop or threading.Event()
+
+    # event loop of the watch, created for the first coroutine when no loop is given.
+    own_loop = None
+    try:
+        with _open_history_tail(evt_fpath, fields, event_ids, task_names, from_start) as tail:
+            while not stop.is_set():
+                started = time.monotonic()
+                for batch in tail.read(batch_size):
+                    result = callback(batch)
+                    if not inspect.isawaitable(result):
+                        continue
+                    if loop is not None:
+                        asyncio.run_coroutine_threadsafe(_await(result), loop).result()
+                    else:
+                        own_loop = own_loop or asyncio.new_event_loop()
+                        own_loop.run_until_complete(result)
+                stop.wait(max(interval - (time.monotonic() - started), 0))
+    finally:
+        if own_loop is not None:
+            own_loop.close()
+
+async def tail_task_scheduler_history(
+    evt_fpath: str=TASK_SCHEDULER_EVTX_PATH,
+    interval: float=1.0,
+    batch_size: int=10_000,
+    fields: list[str]|None=None,
+    event_ids: list[int]|None=None,
+    task_names: list[str]|None=None,
+    from_start: bool=False
+) -> AsyncIterator[HistoryDataFrame]:
+    """Async iterator over the task scheduler events as they are logged, see \
+    `watch_task_scheduler_history`.
+
+    The new records are read on a worker thread, so the event loop is not blocked while \
+    they are decoded, e.g. `async for batch in tail_task_scheduler_history(): ...`.
+
+    Parameters:
+        evt_fpath (`str`): Path to the task scheduler operational event log file.
+        interval (`float`): Seconds between the checks for new events.
+        batch_size (`int`): Maximum number of events in each micro batch.
+        fields (`list[str]`): Extra event fields to add as columns.
+        event_ids (`list[int]`): Only events with these event ids.
+        task_names (`list[str]`): Only events of these tasks, by task name or full task path.
+        from_start (`bool`): Also yield the events already in the log.
+
+    Returns:
+        Async iterator of HistoryDataFrame objects.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+
+    tail = await asyncio.to_thread(
+        _open_history_tail, evt_fpath, fields, event_ids, task_names, from_start
+    )
+    try:
+        while True:
+            started = time.monotonic()
+            for batch in await asyncio.to_thread(list, tail.read(batch_size)):
+                yield batch
+            await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+    finally:
+        tail.close()
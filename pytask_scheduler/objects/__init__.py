@@ -4,8 +4,13 @@ from .objects import (
     TaskAction,
     TaskFolder,
     TaskScheduler,
+    MultiHostScheduler,
+    TaskInfoCache,
+    TaskSpec,
     TasksDataFrame,
-    HistoryDataFrame
+    TasksQuery,
+    HistoryDataFrame,
+    HistoryQuery
 )
 
 __all__ = [
@@ -14,6 +19,11 @@ __all__ = [
     "TaskAction",
     "TaskFolder",
     "TaskScheduler",
+    "MultiHostScheduler",
+    "TaskInfoCache",
+    "TaskSpec",
     "TasksDataFrame",
-    "HistoryDataFrame"
+    "TasksQuery",
+    "HistoryDataFrame",
+    "HistoryQuery"
 ]
\ No newline at end of file
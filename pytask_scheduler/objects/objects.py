@@ -1,24 +1,163 @@
+import time
+import queue
+import hashlib
+import threading
 import polars as pl
-import win32com.client
-from typing import Literal
-from datetime import datetime, timedelta
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, fields, replace
+from functools import cached_property, partial
+from typing import Callable, Literal
+from datetime import datetime, date, timedelta, time as dtime
 from pytask_scheduler import (
     TaskActionTypes,
     TaskTriggerTypes,
     TaskCreationTypes,
     TaskLogonTypes,
-    TaskValueDefinitions
+    TaskValueDefinitions,
+    TaskInstancePolicy,
+    TaskRunEvents
 )
+from pytask_scheduler.backends import ComBackend
+from pytask_scheduler.objects.taskxml import (
+    compile_task_xml,
+    definition_hash,
+    shift_start_boundaries,
+    task_triggers
+)
+from pytask_scheduler.schedule import expand_triggers
+from pytask_scheduler.schedule.schedule import TRIGGER_SCHEMA
+
+# columns of the preprocessed tasks data frame.
+TASK_COLUMNS = [
+    'task_source',
+    'task_path',
+    'task_folder_name',
+    'name',
+    'task_description',
+    'enabled',
+    'task_state',
+    'task_state_definition',
+    'next_run_time',
+    'last_run_time',
+    'last_task_result',
+    'last_task_result_definition',
+    'number_of_missed_runs',
+    'author',
+    'registration_date',
+    'execution_path',
+    'AllowDemandStart',
+    'StartWhenAvailable',
+    'Enabled',
+    'Hidden',
+    'RestartInterval',
+    'RestartCount',
+    'ExecutionTimeLimit',
+    'MultipleInstances'
+]
+
+# names of the task states, by state value.
+TASK_STATE_NAMES = ["unknown","disabled","queued","ready","running"]
+
+# columns the task statistics are rolled up by, see `TasksDataFrame.stats`.
+TASK_ROLLUP_COLUMNS = ["task_folder_name","last_task_result","author"]
+
+def _end_of_day(dt: datetime) -> datetime:
+    """Last microsecond of the day of a datetime."""
+    return datetime.combine(dt.date(), datetime.max.time())
 
 class TasksDataFrame(pl.DataFrame):
     """Data frame for scheduled tasks."""
     def __init__(self, data: pl.DataFrame):
         super().__init__(data)
-        self.df = data
+
+    @property
+    def df(self) -> pl.DataFrame:
+        """The tasks data frame, kept for compatibility with the earlier `df` attribute."""
+        return self
+
+    def query(self):
+        """Start a lazy query over the tasks, see `TasksQuery`."""
+        return TasksQuery(self.lazy())
 
     def preprocess(self):
         """Preprocess the tasks data frame."""
-        df = (self.df
+        return self.query().preprocess().collect()
+
+    @cached_property
+    def __stats(self) -> dict:
+        """Statistics on the tasks and their rollups, from a single group by over the tasks.
+
+        The tasks are grouped once by all the rollup columns, then the totals and each \
+        rollup are summed from the groups, which are far fewer than the tasks. The frame \
+        is not expected to change in place after the first call.
+        """
+        by = [column for column in TASK_ROLLUP_COLUMNS if column in self.columns]
+        groups = self.query().stats(by=by).collect()
+        stats = {None:groups.select(pl.exclude(by).sum())}
+        for column in by:
+            stats[column] = groups.group_by(column) \
+                .agg(pl.exclude(by).sum()) \
+                .sort(column, nulls_last=True)
+        return stats
+
+    def stats(
+        self,
+        by: Literal["task_folder_name","last_task_result","author"]|None=None
+    ) -> pl.DataFrame:
+        """Get statistics on all the tasks, or on the tasks of each folder, last task \
+        result or author. All the statistics are computed on the first call, in a single \
+        pass over the tasks, and reused by the later calls.
+
+        Parameters:
+            by (`str`): Column to roll the statistics up by, None for the totals.
+
+        Returns:
+            Data frame with the number of tasks, missed runs and tasks in each state, \
+            with a row per value of `by`.
+        """
+        if by not in self.__stats:
+            raise ValueError(f"Cannot roll up the task statistics by {by}, the tasks have no such column.")
+        return self.__stats[by]
+
+    def total_number_of_tasks(self):
+        """Total number of scheduled tasks, this will include disabled tasks."""
+        return self.height
+
+    def total_number_of_missed_runs(self):
+        """Total number of missed runs."""
+        return self.stats().item(0, "missed_runs_total")
+
+    def total_number_of_tasks_by_state(self, task_state: Literal[0,1,2,3,4]):
+        """Total number of scheduled tasks filtered by the task state."""
+        return self.stats().item(0, f"{TASK_STATE_NAMES[task_state]}_state_total")
+    
+    def get_tasks_completed_today(self):
+        """Get the scheduled tasks that were completed today."""
+        return self.query().get_tasks_completed_today().collect()
+    
+    def get_tasks_due_today(self):
+        """Get the tasks that are due to execute today."""
+        return self.query().get_tasks_due_today().collect()
+
+class TasksQuery:
+    """
+    Lazy query over the scheduled tasks.
+
+    Each method adds a step to the query plan and returns a new query, nothing is \
+    computed until `collect` runs the whole plan once, e.g. \
+    `tasks.query().preprocess().get_tasks_due_today().collect()`.
+
+    Attributes:
+        lf (`pl.LazyFrame`): Query plan.
+    """
+    def __init__(self, lf: pl.LazyFrame):
+        self.lf = lf
+
+    def preprocess(self):
+        """Preprocess the tasks."""
+        lf = (self.lf
             .with_columns(
                 pl.col("task_state")
                 .cast(str)
@@ -38,130 +177,147 @@ class TasksDataFrame(pl.DataFrame):
                 .otherwise(pl.col("task_folder_name").list.slice(1,2).list.first())
                 .name.keep()
             )
-            .select(
-                [
-                    'task_source',
-                    'task_path',
-                    'task_folder_name',
-                    'name',
-                    'task_description',
-                    'enabled',
-                    'task_state',
-                    'task_state_definition',
-                    'next_run_time',
-                    'last_run_time',
-                    'last_task_result',
-                    'last_task_result_definition',
-                    'number_of_missed_runs',
-                    'author',
-                    'registration_date',
-                    'execution_path',
-                    'AllowDemandStart',
-                    'StartWhenAvailable',
-                    'Enabled',
-                    'Hidden',
-                    'RestartInterval',
-                    'RestartCount',
-                    'ExecutionTimeLimit',
-                    'MultipleInstances'
-                ]
-            )
+            .select(*TASK_COLUMNS, pl.exclude(TASK_COLUMNS))
         )
-        return TasksDataFrame(df)
-
-    def stats(self) -> pl.DataFrame:
-        """Get statistics on all the tasks."""
-        stats_schema = {
-            "task_total":self.total_number_of_tasks(),
-            "missed_runs_total":self.total_number_of_missed_runs(),
-            "unknown_state_total":self.total_number_of_tasks_by_state(0),
-            "disabled_state_total":self.total_number_of_tasks_by_state(1),
-            "queued_state_total":self.total_number_of_tasks_by_state(2),
-            "ready_state_total":self.total_number_of_tasks_by_state(3),
-            "running_state_total":self.total_number_of_tasks_by_state(4)
-        }
+        return TasksQuery(lf)
 
-        return pl.DataFrame(stats_schema)
+    def filter(self, *predicates, **constraints):
+        """Filter the tasks, takes the same arguments as `pl.LazyFrame.filter`."""
+        return TasksQuery(self.lf.filter(*predicates, **constraints))
 
-    def total_number_of_tasks(self):
-        """Total number of scheduled tasks, this will include disabled tasks."""
-        return self.df.shape[0]
-
-    def total_number_of_missed_runs(self):
-        """Total number of missed runs."""
-        return self.df["number_of_missed_runs"].sum()
-
-    def total_number_of_tasks_by_state(self, task_state: Literal[0,1,2,3,4]):
-        """Total number of scheduled tasks filtered by the task state."""
-        return self.df.filter(pl.col("task_state")==task_state).shape[0]
-    
     def get_tasks_completed_today(self):
         """Get the scheduled tasks that were completed today."""
-        todays_date = datetime.today().date()
         current_datetime = datetime.now()
-        df = (self.df
+        lf = (self.lf
             .filter(
                 pl.col("last_run_time")
                 .cast(pl.Datetime)
-                .is_between(todays_date,current_datetime)
+                .is_between(current_datetime.date(),current_datetime)
             )
             .sort("last_run_time", descending=True)
         )
-        return TasksDataFrame(df)
-    
+        return TasksQuery(lf)
+
     def get_tasks_due_today(self):
         """Get the tasks that are due to execute today."""
-        MAX_HOUR = 23
-        MAX_MIN = 59
-        MAX_SEC = 59
-        MAX_MSEC = 999999
-
         current_dt = datetime.now()
-
-        lower_date = current_dt
-
-        thour = lower_date.hour
-        tmin = lower_date.minute
-        tsec = lower_date.second
-        tmsec = lower_date.microsecond
-
-        upper_date = (current_dt.date() +
-            timedelta(
-                hours=MAX_HOUR-thour,
-                minutes=MAX_MIN-tmin,
-                seconds=MAX_SEC-tsec,
-                microseconds=MAX_MSEC-tmsec
-            )
-        )
-
-        df = (self.df
+        lf = (self.lf
             .filter(
                 pl.col("next_run_time")
                 .cast(pl.Datetime)
                 .is_between(
-                    lower_date,
-                    upper_date
+                    current_dt,
+                    _end_of_day(current_dt)
                 )
             )
             .sort("next_run_time")
         )
+        return TasksQuery(lf)
+
+    def stats(self, by: list[str]|None=None) -> pl.LazyFrame:
+        """Statistics on the tasks, computed in a single pass over the tasks.
 
-        return TasksDataFrame(df)
+        Parameters:
+            by (`list[str]`): Columns to group the tasks by, None for the totals.
+        """
+        stats = [
+            pl.len().cast(pl.Int64).alias("task_total"),
+            pl.col("number_of_missed_runs").sum().alias("missed_runs_total"),
+            *[
+                (pl.col("task_state")==state).sum().cast(pl.Int64).alias(f"{name}_state_total")
+                for state, name in enumerate(TASK_STATE_NAMES)
+            ]
+        ]
+        if by:
+            return self.lf.group_by(by).agg(stats)
+        return self.lf.select(stats)
+
+    def count(self) -> int:
+        """Number of tasks in the query result."""
+        return self.lf.select(pl.len()).collect().item()
+
+    def collect(self) -> TasksDataFrame:
+        """Run the query plan.
+
+        Returns:
+            TasksDataFrame object.
+        """
+        return TasksDataFrame(self.lf.collect())
 
 class HistoryDataFrame(pl.DataFrame):
     """Data frame for the task history."""
     def __init__(self, data: pl.DataFrame):
         super().__init__(data)
-        self.df = data
+
+    @property
+    def df(self) -> pl.DataFrame:
+        """The history data frame, kept for compatibility with the earlier `df` attribute."""
+        return self
+
+    def query(self):
+        """Start a lazy query over the history, see `HistoryQuery`."""
+        return HistoryQuery(self.lazy())
 
     def preprocess(self):
         """Preprocessing for the historical data frame."""
-        df = (self.df
+        return self.query().preprocess().collect()
+
+    def get_todays_history(self):
+        """Filter the history data frame based on today's date."""
+        return self.query().get_todays_history().collect()
+
+    @cached_property
+    def __event_counts(self) -> pl.DataFrame:
+        """Event counts of each level, counted once. The frame is not expected to change \
+        in place after the first call."""
+        return self.query().event_counts().collect()
+
+    def event_counts(self) -> pl.DataFrame:
+        """Counts the information, error and warning events in a single pass, reused by \
+        the later calls and the event count methods."""
+        return self.__event_counts
+
+    def runs(self) -> pl.DataFrame:
+        """Pairs the start and end events of each task instance into a table of runs, \
+        see `HistoryQuery.runs`."""
+        return self.query().runs().collect()
+
+    def information_event_count(self) -> int:
+        """Returns the count of information events."""
+        return self.__event_counts.item(0, "information_event_count")
+
+    def error_event_count(self) -> int:
+        """Returns the count of error events."""
+        return self.__event_counts.item(0, "error_event_count")
+
+    def warning_event_count(self) -> int:
+        """Returns the count of warning events."""
+        return self.__event_counts.item(0, "warning_event_count")
+
+class HistoryQuery:
+    """
+    Lazy query over the task history.
+
+    Each method adds a step to the query plan and returns a new query, nothing is \
+    computed until `collect` runs the whole plan once. The query can also start from \
+    a scan of stored history, e.g. `HistoryQuery(store.scan()).get_todays_history()`.
+
+    Attributes:
+        lf (`pl.LazyFrame`): Query plan.
+    """
+    def __init__(self, lf: pl.LazyFrame):
+        self.lf = lf
+
+    def preprocess(self):
+        """Preprocessing for the raw history columns."""
+        lf = (self.lf
             .rename({
                 "event_created_time":"Event Created",
                 "event_level":"Event Level",
                 "event_id":"Event ID",
                 "task_name":"Task Name",
+                "event_record_id":"Event Record ID",
+                "activity_id":"Activity ID",
                 "event_id_description":"Event ID Description",
                 "event_log_description":"Event Log Description"
             }) 
@@ -171,33 +327,187 @@ class HistoryDataFrame(pl.DataFrame):
                 .name.keep(),
                 pl.col("Event Level").cast(pl.Int64),
                 pl.col("Event ID").cast(pl.Int64),
+                pl.col("Event Record ID").cast(pl.Int64),
                 pl.col("Task Name").str.split("\\").list.last().name.keep()
             )
         )
-        return HistoryDataFrame(df)
+        return HistoryQuery(lf)
+
+    def filter(self, *predicates, **constraints):
+        """Filter the history, takes the same arguments as `pl.LazyFrame.filter`."""
+        return HistoryQuery(self.lf.filter(*predicates, **constraints))
 
     def get_todays_history(self):
-        """Filter the history data frame based on today's date."""
-        df = self.df.filter(
+        """Filter the history based on today's date."""
+        lf = self.lf.filter(
             pl.col("Event Created").cast(pl.Date)==datetime.now().date()
         ).sort("Event Created", descending=True)
-        return HistoryDataFrame(df)
+        return HistoryQuery(lf)
 
-    def __event_count_by_criteria(self, filter_col: str, filter_criteria: str) -> int:
-        """Counts the number of events based on the filter column and criteria."""
-        return self.df.filter(pl.col(filter_col)==filter_criteria).shape[0]
+    def event_counts(self) -> pl.LazyFrame:
+        """Counts the information, error and warning events in a single pass."""
+        return self.lf.select(
+            (pl.col("Event Log Description")==level).sum().cast(pl.Int64).alias(f"{level.lower()}_event_count")
+            for level in ["INFORMATION","ERROR","WARNING"]
+        )
 
-    def information_event_count(self) -> int:
-        """Returns the count of information events."""
-        return self.__event_count_by_criteria("Event Log Description","INFORMATION")
+    def runs(self) -> pl.LazyFrame:
+        """Pairs the start and end events of each task instance into a table of runs.
 
-    def error_event_count(self) -> int:
-        """Returns the count of error events."""
-        return self.__event_count_by_criteria("Event Log Description","ERROR")
+        Events are grouped by their `Activity ID`, which holds the task instance id, \
+        so every run is built in a single grouped aggregation. The result code is read \
+        from the `ResultCode` column when the history was read with \
+        `fields=["ResultCode"]`.
 
-    def warning_event_count(self) -> int:
-        """Returns the count of warning events."""
-        return self.__event_count_by_criteria("Event Log Description","WARNING")
+        Returns:
+            LazyFrame with one row per run and the columns `Activity ID`, `Task Name`, \
+            `Trigger Type`, `Start Time`, `End Time`, `Duration`, `Status` and `Result Code`.
+        """
+        event_id = pl.col("Event ID")
+        created = pl.col("Event Created")
+        end_ids = list(TaskRunEvents.END)
+
+        if "ResultCode" in self.lf.collect_schema().names():
+            result_code = (pl.col("ResultCode")
+                .filter(event_id.is_in([201, *end_ids]) & pl.col("ResultCode").is_not_null())
+                .last()
+                .cast(pl.Int64, strict=False)
+            )
+        else:
+            result_code = pl.lit(None, pl.Int64)
+
+        lf = (self.lf
+            .filter(pl.col("Activity ID").is_not_null())
+            .sort("Event Created", "Event Record ID")
+            .group_by("Activity ID")
+            .agg(
+                pl.col("Task Name").drop_nulls().first(),
+                event_id.filter(event_id.is_in(list(TaskRunEvents.TRIGGERS))).first().alias("Trigger Type"),
+                created.filter(event_id==TaskRunEvents.START).min().alias("Start Time"),
+                created.filter(event_id.is_in(end_ids)).max().alias("End Time"),
+                event_id.filter(event_id.is_in(end_ids)).last().alias("Status"),
+                result_code.alias("Result Code")
+            )
+            .filter(pl.col("Start Time").is_not_null() | pl.col("End Time").is_not_null())
+            .with_columns(
+                pl.col("Trigger Type").replace_strict(TaskRunEvents.TRIGGERS, default=None),
+                (pl.col("End Time") - pl.col("Start Time")).alias("Duration"),
+                pl.col("Status")
+                .replace_strict(TaskRunEvents.END, default=None)
+                .fill_null("RUNNING")
+            )
+            .select(
+                "Activity ID",
+                "Task Name",
+                "Trigger Type",
+                "Start Time",
+                "End Time",
+                "Duration",
+                "Status",
+                "Result Code"
+            )
+            .sort("Start Time", nulls_last=True)
+        )
+        return lf
+
+    def count(self) -> int:
+        """Number of events in the query result."""
+        return self.lf.select(pl.len()).collect().item()
+
+    def collect(self) -> HistoryDataFrame:
+        """Run the query plan.
+
+        Returns:
+            HistoryDataFrame object.
+        """
+        return HistoryDataFrame(self.lf.collect())
+
+@dataclass
+class TaskSpec:
+    """
+    Specification of a task to register, the arguments of `TaskScheduler.create_task`.
+
+    Attributes:
+        task_name (`str`): Name of the task.
+        folder_name (`str`): Folder the task is registered to, by full folder path, or by \
+            name when no other folder has that name.
+        trigger_type (`str`): `Literal["daily","weekly","monthly","monthlydow","one-time"]`.
+        start_date (`datetime.date`): Date when the trigger is activated.
+        start_time (`datetime.time`): Time when the trigger is activated.
+        action_file (`str`): Path to the executable file of the action.
+        Other attributes are the optional arguments of `create_task`, settings left as \
+        None keep the Task Scheduler defaults.
+    """
+    task_name: str
+    folder_name: str
+    trigger_type: Literal["daily","weekly","monthly","monthlydow","one-time"]
+    start_date: date
+    start_time: dtime
+    action_file: str
+    days_interval: int|None=None
+    weeks_interval: int|None=None
+    days_of_week: int|None=None
+    days_of_month: int|None=None
+    months_of_year: int|None=None
+    weeks_of_month: int|None=None
+    action_type: Literal["exec","com-handler","email","show-message"]="exec"
+    action_arg: str|None=None
+    action_working_dir: str|None=None
+    task_description: str|None=None
+    allow_demand_start: bool|None=None
+    start_when_available: bool|None=None
+    enabled: bool|None=None
+    hidden: bool|None=None
+    restart_interval: str|None=None
+    restart_count: int|None=None
+    execution_time_limit: str|None=None
+    multiple_instances: int|None=None
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> list:
+        """Task specs from the rows of a data frame with a column per attribute, \
+        missing columns take the attribute defaults."""
+        names = {f.name for f in fields(cls)}
+        extra = set(df.columns) - names
+        if extra:
+            raise ValueError(f"Unknown task spec columns {sorted(extra)}")
+        return [cls(**row) for row in df.iter_rows(named=True)]
+
+    def to_xml(self) -> str:
+        """Compiles the spec into Task Scheduler 2.0 task xml, without a Task Scheduler \
+        connection. Raises ValueError when the spec is not a valid task.
+
+        Returns:
+            Task xml, registered with `TaskFolder.register_task_xml`.
+        """
+        return compile_task_xml(self)
+
+# columns of the data frame returned by `TaskScheduler.create_tasks`.
+CREATE_RESULT_SCHEMA = {
+    "folder_name":pl.String,
+    "task_name":pl.String,
+    "task_path":pl.String,
+    "status":pl.String,
+    "error":pl.String
+}
+
+# columns of the data frame returned by `TaskScheduler.reconcile`.
+RECONCILE_RESULT_SCHEMA = {
+    "folder_path":pl.String,
+    "task_name":pl.String,
+    "task_path":pl.String,
+    "action":pl.String,
+    "status":pl.String,
+    "error":pl.String
+}
+
+# columns of the data frame returned by `TaskScheduler.apply_start_times`.
+START_TIMES_RESULT_SCHEMA = {
+    "task_path":pl.String,
+    "shift":pl.Duration("us"),
+    "status":pl.String,
+    "error":pl.String
+}
 
 class TaskScheduler:
     """
@@ -207,10 +517,41 @@ class TaskScheduler:
         client (`CDispath`): The schedule.service com object from win32com.
         root_folder: Root folder object.
         folders (`list`): List of the subfolder names from the root folder.
+
+    Parameters:
+        server (`str`): Name of the computer to connect to, by default the local computer.
+        user (`str`): User name used to connect to the computer.
+        domain (`str`): Domain of the user.
+        password (`str`): Password of the user.
+        backend (`ComBackend|MemoryBackend`): Task Scheduler to connect to, by default the \
+            Windows Task Scheduler through win32com.
+        client: Connected Schedule.Service object to use, by default a new connection \
+            is made with the backend.
+        connect (`Callable`): Function returning a new connected Schedule.Service object, \
+            used to open a connection on each worker thread of `get_all_tasks`. By \
+            default each worker enters the backend apartment and connects with the backend.
     """
-    def __init__(self):
-        self.client = win32com.client.gencache.EnsureDispatch("Schedule.Service")
-        self.client.Connect()
+    def __init__(
+        self,
+        server: str|None=None,
+        user: str|None=None,
+        domain: str|None=None,
+        password: str|None=None,
+        backend=None,
+        client=None,
+        connect: Callable|None=None
+    ):
+        self.backend = backend if backend is not None else ComBackend()
+
+        # a given client can not be shared with worker threads, so without a connect \
+        # function only the backend connection can be opened again by the workers.
+        self.__apartment = nullcontext
+        if client is None and connect is None:
+            self.__apartment = self.backend.apartment
+            connect = partial(self.backend.connect, server, user, domain, password)
+        self.__connect = connect
+
+        self.client = client if client is not None else connect()
         self.root_folder = self.client.GetFolder("\\")
         self.folders = [f.Name for f in self.root_folder.GetFolders(0)]
 
@@ -229,7 +570,8 @@ class TaskScheduler:
         """Get the folder object.
         
         Parameters:
-            folder_name (`str`): Folder name to look for.
+            folder_name (`str`): Folder name to look for, or the full folder path \
+                starting with a backslash, e.g. `\\Microsoft\\Windows\\Defrag`.
 
         Returns:
             TaskFolder object.
@@ -237,6 +579,8 @@ class TaskScheduler:
 
         if folder_name is None:
             return TaskFolder(self.root_folder)
+        elif folder_name.startswith("\\"):
+            return TaskFolder(self.client.GetFolder(folder_name))
         else:
             folder_path = self.__find_folder(self.root_folder, folder_name)
             if folder_path:
@@ -245,32 +589,182 @@ class TaskScheduler:
             else:
                 raise ValueError(f"Could not find {folder_name}")
 
-    def __list_tasks_info_in_folder(self, folder, folder_name: str, tasks_info_list: list):
-        """Recursively list all tasks within folders."""
-
-        # extract and append all the tasks info in the list.
-        tasks = folder.tasks
-        for t in tasks:
-            tasks_info_list.append(folder.get_task(t).info())
-
-        # walk through all subfolders and get the tasks info.
-        subfolders = folder.subfolders
-        for sf in subfolders:
-            subfolder = self.get_folder(sf)
-            self.__list_tasks_info_in_folder(
-                subfolder,
-                folder_name + "\\" + sf,
-                tasks_info_list
-            )
+    def __split_folder_tree(self, units_wanted: int) -> list[tuple[str, bool]]:
+        """Splits the folder tree into units of work for the worker threads.
+
+        The top level subtrees are split a level further until there are enough units \
+        to keep the workers busy. Units are `(folder_path, recursive)` in the order a \
+        depth first walk visits them, non recursive units only cover a folder's own tasks.
+        """
+        units = [(self.root_folder, True)]
+        while sum(recursive for _, recursive in units) < units_wanted:
+            split = []
+            for folder, recursive in units:
+                subfolders = list(folder.GetFolders(0)) if recursive else []
+                if subfolders:
+                    split.append((folder, False))
+                    split.extend((subfolder, True) for subfolder in subfolders)
+                else:
+                    split.append((folder, recursive))
+            if len(split) == len(units):
+                break
+            units = split
+        return [(folder.Path, recursive) for folder, recursive in units]
+
+    def __list_tasks_info_worker(
+        self,
+        units: queue.SimpleQueue,
+        results: list,
+        source: str,
+        cache
+    ):
+        """Lists the tasks of folder units on a worker thread, using its own \
+        Schedule.Service connection."""
+        with self.__apartment():
+            self.__list_tasks_info_units(self.__connect(), units, results, source, cache)
+
+    def __list_tasks_info_units(
+        self,
+        client,
+        units: queue.SimpleQueue,
+        results: list,
+        source: str,
+        cache
+    ):
+        """Lists the tasks of folder units until the queue is empty. The COM objects are \
+        released when this returns, before the worker's apartment is closed."""
+        while True:
+            try:
+                index, (folder_path, recursive) = units.get_nowait()
+            except queue.Empty:
+                return
+
+            folder = client.GetFolder(folder_path)
+            tasks_info_list = []
+            if recursive:
+                self.__list_tasks_info_in_folder(folder, tasks_info_list, source, cache)
+            else:
+                for rtask in folder.GetTasks(0):
+                    tasks_info_list.append(self.__task_info(rtask, source, cache))
+            results[index] = tasks_info_list
+
+    def __task_info(self, rtask, source: str, cache):
+        """Information on a registered task, through the cache when one is given."""
+        if cache is None:
+            return RegisteredTask(rtask).info(source)
+        return cache.info(RegisteredTask(rtask), source)
+
+    def __list_tasks_info_in_folder(self, folder, tasks_info_list: list, source: str, cache):
+        """List all tasks within a folder and its subfolders.
+
+        The folder objects returned by `GetFolders` are walked depth first, so every \
+        folder is visited once by its full path and `GetFolders`/`GetTasks` are called \
+        once per folder.
+        """
+        stack = [folder]
+        while stack:
+            folder = stack.pop()
+
+            # extract and append all the tasks info in the list.
+            for rtask in folder.GetTasks(0):
+                tasks_info_list.append(self.__task_info(rtask, source, cache))
+
+            # visit the subfolders in order after the tasks of this folder.
+            stack.extend(reversed(list(folder.GetFolders(0))))
+
+    def get_all_triggers(self) -> pl.DataFrame:
+        """Time and calendar triggers of all the scheduled tasks, read from the task xml \
+        with one COM call per task, see `task_triggers`.
+
+        Returns:
+            Data frame with the task path and a row per trigger, with the columns of \
+            `TRIGGER_SCHEMA`.
+        """
+        rows = []
+        stack = [self.root_folder]
+        while stack:
+            folder = stack.pop()
+            for rtask in folder.GetTasks(0):
+                task_path = rtask.Path
+                rows += [{"task_path":task_path, **t} for t in task_triggers(rtask.Xml)]
+            stack.extend(reversed(list(folder.GetFolders(0))))
+        return pl.DataFrame(rows, schema=TRIGGER_SCHEMA)
+
+    def get_schedule(self, start: datetime|None=None, end: datetime|None=None) -> pl.DataFrame:
+        """Every scheduled run of the tasks between `start` and `end`, see `expand_triggers`.
+
+        Parameters:
+            start (`datetime`): Start of the horizon, now by default.
+            end (`datetime`): End of the horizon, 7 days after the start by default.
+
+        Returns:
+            Data frame of the task path and scheduled time of every run.
+        """
+        start = start or datetime.now().replace(microsecond=0)
+        end = end or start + timedelta(days=7)
+        return expand_triggers(self.get_all_triggers(), start, end)
+
+    def get_all_tasks(
+        self,
+        source: Literal["com","xml"]="xml",
+        workers: int|None=None,
+        cache=None,
+        details: bool=False
+    ) -> TasksDataFrame:
+        """Method for extracting all the scheduled tasks.
+
+        Parameters:
+            source (`str`): Where the task definitions are read from, see \
+                `RegisteredTask.info`. Reading them from the task xml takes one COM call \
+                per task instead of one per property.
+            workers (`int`): Number of threads listing the folder subtrees, each with \
+                its own Schedule.Service connection. By default the tasks are listed on \
+                the calling thread.
+            cache (`TaskInfoCache`): Cache of the task definitions from earlier listings, \
+                only new or changed task definitions are read again.
+            details (`bool`): Also return the trigger types, action arguments and principal \
+                columns read from the task xml. By default only the `TASK_COLUMNS` are \
+                returned, whatever the source.
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be a positive integer.")
+
+        if cache is not None:
+            cache.begin_refresh()
 
-    def get_all_tasks(self) -> pl.DataFrame:
-        """Method for extracting all the scheduled tasks."""
-        root_folder = self.get_folder()
         tasks_info_list = []
-        self.__list_tasks_info_in_folder(root_folder, "\\", tasks_info_list)
+        if workers is None or workers == 1:
+            self.__list_tasks_info_in_folder(self.root_folder, tasks_info_list, source, cache)
+        elif self.__connect is None:
+            raise ValueError("workers needs a connect function when a client is given.")
+        else:
+            units = self.__split_folder_tree(workers * 4)
+            unit_queue = queue.SimpleQueue()
+            for unit in enumerate(units):
+                unit_queue.put(unit)
+            results = [None] * len(units)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self.__list_tasks_info_worker, unit_queue, results, source, cache
+                    )
+                    for _ in range(workers)
+                ]
+                for future in futures:
+                    future.result()
+
+            for unit_tasks_info in results:
+                tasks_info_list.extend(unit_tasks_info)
+
+        if cache is not None:
+            cache.end_refresh()
+
         df = pl.DataFrame(tasks_info_list)
-        df = TasksDataFrame(df).preprocess()
-        return df
+        query = TasksQuery(df.lazy()).preprocess()
+        if not details:
+            query = TasksQuery(query.lf.select(TASK_COLUMNS))
+        return query.collect()
 
     def create_task(
         self,
@@ -334,63 +828,96 @@ class TaskScheduler:
             multiple_instances (`int`):
 
         """
+        spec = TaskSpec(
+            task_name=task_name,
+            folder_name=folder_name,
+            trigger_type=trigger_type,
+            start_date=start_date,
+            start_time=start_time,
+            action_file=action_file,
+            days_interval=days_interval,
+            weeks_interval=weeks_interval,
+            days_of_week=days_of_week,
+            days_of_month=days_of_month,
+            months_of_year=months_of_year,
+            weeks_of_month=weeks_of_month,
+            action_type=action_type,
+            action_arg=action_arg,
+            action_working_dir=action_working_dir,
+            task_description=task_description,
+            allow_demand_start=allow_demand_start,
+            start_when_available=start_when_available,
+            enabled=enabled,
+            hidden=hidden,
+            restart_interval=restart_interval,
+            restart_count=restart_count,
+            execution_time_limit=execution_time_limit,
+            multiple_instances=multiple_instances
+        )
         folder = self.get_folder(folder_name)
+        new_taskdef = self.__new_task_definition(self.client, spec)
+        folder.register_new_task(task_name,new_taskdef)
+        return NewTask(new_taskdef)
 
+    def __new_task_definition(self, client, spec: TaskSpec):
+        """Builds the task definition of a task spec."""
         # create task def.
-        new_taskdef = self.client.NewTask(0)
+        new_taskdef = client.NewTask(0)
 
         # create new trigger.
-        match trigger_type:
+        match spec.trigger_type:
             case "daily":
                 new_taskdef = TaskTrigger(new_taskdef).create_daily_trigger(
-                    start_date=start_date,
-                    start_time=start_time,
-                    days_interval=days_interval
+                    start_date=spec.start_date,
+                    start_time=spec.start_time,
+                    days_interval=spec.days_interval
                 )
 
             case "weekly":
                 new_taskdef = TaskTrigger(new_taskdef).create_weekly_trigger(
-                    start_date=start_date,
-                    start_time=start_time,
-                    weeks_interval=weeks_interval,
-                    days_of_week=days_of_week
+                    start_date=spec.start_date,
+                    start_time=spec.start_time,
+                    weeks_interval=spec.weeks_interval,
+                    days_of_week=spec.days_of_week
                 )
 
             case "monthly":
                 new_taskdef = TaskTrigger(new_taskdef).create_monthly_trigger(
                     trigger_type="month",
-                    start_date=start_date,
-                    start_time=start_time,
-                    days_of_month=days_of_month,
-                    days_of_week=days_of_week,
-                    months_of_year=months_of_year,
-                    weeks_of_month=weeks_of_month
+                    start_date=spec.start_date,
+                    start_time=spec.start_time,
+                    days_of_month=spec.days_of_month,
+                    days_of_week=spec.days_of_week,
+                    months_of_year=spec.months_of_year,
+                    weeks_of_month=spec.weeks_of_month
                 )
 
             case "monthlydow":
                 new_taskdef = TaskTrigger(new_taskdef).create_monthly_trigger(
                     trigger_type="dow",
-                    start_date=start_date,
-                    start_time=start_time,
-                    days_of_month=days_of_month,
-                    days_of_week=days_of_week,
-                    months_of_year=months_of_year,
-                    weeks_of_month=weeks_of_month
+                    start_date=spec.start_date,
+                    start_time=spec.start_time,
+                    days_of_month=spec.days_of_month,
+                    days_of_week=spec.days_of_week,
+                    months_of_year=spec.months_of_year,
+                    weeks_of_month=spec.weeks_of_month
                 )
 
             case "one-time":
                 new_taskdef = TaskTrigger(new_taskdef).create_one_time_trigger(
-                    start_date=start_date,
-                    start_time=start_time
+                    start_date=spec.start_date,
+                    start_time=spec.start_time
                 )
+            case _:
+                raise ValueError(f"Unknown trigger type {spec.trigger_type}")
 
         # create a new task action
-        match action_type:
+        match spec.action_type:
             case "exec":
                 new_action = TaskAction(new_taskdef).create_execution_action(
-                    argument=action_arg,
-                    filepath=action_file,
-                    working_dir=action_working_dir
+                    argument=spec.action_arg,
+                    filepath=spec.action_file,
+                    working_dir=spec.action_working_dir
                 )
             case "com-handler":
                 raise NotImplementedError("Create com handler action has not been implemented")
@@ -398,22 +925,484 @@ class TaskScheduler:
                 raise NotImplementedError("Create send email action has not been implemented")
             case "show-message":
                 raise NotImplementedError("Create show message action has not been implemented")
+            case _:
+                raise ValueError(f"Unknown action type {spec.action_type}")
 
         # add task description
-        new_taskdef.RegistrationInfo.Description = task_description
-
-        # task settings
-        new_taskdef.Settings.AllowDemandStart = allow_demand_start
-        new_taskdef.Settings.StartWhenAvailable = start_when_available
-        new_taskdef.Settings.Enabled = enabled
-        new_taskdef.Settings.Hidden = hidden
-        new_taskdef.Settings.RestartInterval = restart_interval
-        new_taskdef.Settings.RestartCount = restart_count
-        new_taskdef.Settings.ExecutionTimeLimit = execution_time_limit
-        new_taskdef.Settings.MultipleInstances = multiple_instances
+        if spec.task_description is not None:
+            new_taskdef.RegistrationInfo.Description = spec.task_description
+
+        # task settings, the settings left as None keep their defaults.
+        settings = new_taskdef.Settings
+        for attr, value in [
+            ("AllowDemandStart", spec.allow_demand_start),
+            ("StartWhenAvailable", spec.start_when_available),
+            ("Enabled", spec.enabled),
+            ("Hidden", spec.hidden),
+            ("RestartInterval", spec.restart_interval),
+            ("RestartCount", spec.restart_count),
+            ("ExecutionTimeLimit", spec.execution_time_limit),
+            ("MultipleInstances", spec.multiple_instances)
+        ]:
+            if value is not None:
+                setattr(settings, attr, value)
+        return new_taskdef
+
+    def __find_folder_paths(self, folder, folder_name: str, folder_paths: list):
+        """Collects the paths of every folder with the name, in depth first order."""
+        for subfolder in folder.GetFolders(0):
+            if subfolder.Name == folder_name:
+                folder_paths.append(subfolder.Path)
+            self.__find_folder_paths(subfolder, folder_name, folder_paths)
 
-        folder.register_new_task(task_name,new_taskdef)
-        return NewTask(new_taskdef)
+    def __resolve_folder_path(self, folder_name: str) -> str:
+        """Full path of a folder given by full path, or by a name only one folder has.
+
+        Folder names repeat in different branches of the tree, so a name matching more \
+        than one folder is refused rather than resolved to the first match.
+        """
+        if folder_name.startswith("\\"):
+            return folder_name
+        folder_paths = []
+        self.__find_folder_paths(self.root_folder, folder_name, folder_paths)
+        if not folder_paths:
+            raise ValueError(f"Could not find {folder_name}")
+        if len(folder_paths) > 1:
+            raise ValueError(
+                f"{folder_name} matches {len(folder_paths)} folders, "
+                f"use the full folder path, e.g. {folder_paths[0]}"
+            )
+        return folder_paths[0]
+
+    def __register_specs(
+        self,
+        client,
+        items: queue.SimpleQueue,
+        folder_paths: dict,
+        results: list,
+        method: str
+    ):
+        """Registers the queued specs with a connection, reusing one folder handle per folder."""
+        folders = {}
+        while True:
+            try:
+                i, spec = items.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                folder_path = folder_paths[spec.folder_name]
+                if isinstance(folder_path, Exception):
+                    raise folder_path
+                task_path = folder_path.rstrip("\\") + "\\" + spec.task_name
+                if folder_path not in folders:
+                    folders[folder_path] = client.GetFolder(folder_path)
+                if method == "xml":
+                    folders[folder_path].RegisterTask(
+                        spec.task_name,
+                        spec.to_xml(),
+                        TaskCreationTypes.TASK_CREATE_OR_UPDATE,
+                        "", # no username
+                        "", # no password
+                        TaskLogonTypes.TASK_LOGON_NONE
+                    )
+                else:
+                    folders[folder_path].RegisterTaskDefinition(
+                        spec.task_name,
+                        self.__new_task_definition(client, spec),
+                        TaskCreationTypes.TASK_CREATE_OR_UPDATE,
+                        "", # no username
+                        "", # no password
+                        TaskLogonTypes.TASK_LOGON_NONE
+                    )
+                results[i] = (spec.folder_name, spec.task_name, task_path, "registered", None)
+            except Exception as e:
+                results[i] = (spec.folder_name, spec.task_name, None, "failed", repr(e))
+
+    def __register_specs_worker(
+        self,
+        items: queue.SimpleQueue,
+        folder_paths: dict,
+        results: list,
+        method: str
+    ):
+        """Registers queued specs on a worker thread, with its own connection."""
+        with self.__apartment():
+            self.__register_specs(self.__connect(), items, folder_paths, results, method)
+
+    def create_tasks(
+        self,
+        specs: list[TaskSpec]|pl.DataFrame,
+        workers: int|None=None,
+        method: Literal["xml","com"]="xml"
+    ) -> pl.DataFrame:
+        """Creates many tasks, continuing past the tasks that fail to register.
+
+        Each target folder is looked up once and its folder handle reused for every task \
+        registered to it.
+
+        Parameters:
+            specs (`list[TaskSpec]|pl.DataFrame`): Task specs, or a data frame with a \
+                column per `TaskSpec` attribute.
+            workers (`int`): Number of threads registering the tasks, each with its own \
+                Schedule.Service connection. By default the tasks are registered on the \
+                calling thread.
+            method (`str`): `xml` compiles each spec into task xml registered with a single \
+                `RegisterTask` call, `com` builds each definition through the TaskDefinition \
+                objects, a COM call per property.
+
+        Returns:
+            Data frame with the folder name, task name, task path, status (`registered` or \
+            `failed`) and error of each spec, in the order of the specs. The task path is \
+            null for the specs that were not registered.
+        """
+        if isinstance(specs, pl.DataFrame):
+            specs = TaskSpec.from_frame(specs)
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be a positive integer.")
+        if method not in ("xml", "com"):
+            raise ValueError(f"Unknown method {method}")
+
+        folder_paths = {}
+        for folder_name in {spec.folder_name for spec in specs}:
+            try:
+                folder_paths[folder_name] = self.__resolve_folder_path(folder_name)
+            except Exception as e:
+                folder_paths[folder_name] = e
+
+        items = queue.SimpleQueue()
+        for item in enumerate(specs):
+            items.put(item)
+        results = [None] * len(specs)
+
+        if workers is None or workers == 1:
+            self.__register_specs(self.client, items, folder_paths, results, method)
+        elif self.__connect is None:
+            raise ValueError("workers needs a connect function when a client is given.")
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self.__register_specs_worker, items, folder_paths, results, method
+                    )
+                    for _ in range(workers)
+                ]
+                for future in futures:
+                    future.result()
+
+        return pl.DataFrame(results, schema=CREATE_RESULT_SCHEMA, orient="row")
+
+    def __ensure_folder(self, folder_path: str):
+        """Creates the missing folders of a folder path."""
+        folder = self.client.GetFolder("\\")
+        for name in filter(None, folder_path.split("\\")):
+            if name in {f.Name for f in folder.GetFolders(0)}:
+                folder = folder.GetFolder(name)
+            else:
+                folder = folder.CreateFolder(name)
+
+    def __current_hashes(self, folder_path: str) -> dict|None:
+        """Task name to the definition hash of the tasks of a folder, None when the folder \
+        does not exist."""
+        try:
+            folder = self.client.GetFolder(folder_path)
+        except Exception:
+            return None
+        # TASK_ENUM_HIDDEN, hidden tasks are managed too.
+        return {rtask.Name: definition_hash(rtask.Xml) for rtask in folder.GetTasks(1)}
+
+    def reconcile(
+        self,
+        desired: list[TaskSpec]|pl.DataFrame,
+        delete: bool|list[str]=False,
+        dry_run: bool=False,
+        workers: int|None=None
+    ) -> pl.DataFrame:
+        """Brings the folders of the desired tasks to the desired state with the fewest writes.
+
+        The task xml of each task in those folders is read once, normalized and hashed, and \
+        compared with the compiled xml of its spec (see `normalize_task_xml`). Only the \
+        missing tasks are created, the changed tasks updated and, with `delete`, the tasks \
+        not in `desired` deleted. Folders without a desired task are left alone, and the \
+        tasks of the root folder are only deleted when it is named in `delete`.
+
+        Parameters:
+            desired (`list[TaskSpec]|pl.DataFrame`): Task specs, or a data frame with a \
+                column per `TaskSpec` attribute.
+            delete (`bool|list[str]`): Delete the tasks that are not desired. True deletes \
+                them in every folder with a desired task except the root folder, a list of \
+                folder paths only in those folders, `\\` for the root folder. A folder name \
+                shared by several folders raises a ValueError. By default nothing is deleted.
+            dry_run (`bool`): Only report the changes, without writing anything.
+            workers (`int`): Number of threads registering the tasks, see `create_tasks`.
+
+        Returns:
+            Data frame with the folder path, task name, task path, action (`create`, \
+            `update`, `delete` or `unchanged`), status (`planned`, `applied`, `unchanged` \
+            or `failed`) and error of each task.
+        """
+        if isinstance(desired, pl.DataFrame):
+            desired = TaskSpec.from_frame(desired)
+
+        rows = []
+        by_folder = {}
+        folder_paths = {}
+        for spec in desired:
+            if spec.folder_name not in folder_paths:
+                try:
+                    folder_paths[spec.folder_name] = self.__resolve_folder_path(spec.folder_name)
+                except Exception as e:
+                    folder_paths[spec.folder_name] = e
+            folder_path = folder_paths[spec.folder_name]
+            if isinstance(folder_path, Exception):
+                rows.append((None, spec.task_name, None, "create", "failed", repr(folder_path)))
+                continue
+            folder_specs = by_folder.setdefault(folder_path, {})
+            if spec.task_name in folder_specs:
+                raise ValueError(f"{spec.task_name} is desired more than once in {folder_path}")
+            folder_specs[spec.task_name] = spec
+
+        if isinstance(delete, bool):
+            prune_paths = set(by_folder) - {"\\"} if delete else set()
+        else:
+            prune_paths = {self.__resolve_folder_path(folder_name) for folder_name in delete}
+
+        writes = []
+        deletes = []
+        for folder_path, folder_specs in by_folder.items():
+            current = self.__current_hashes(folder_path)
+            if current is None:
+                current = {}
+                if not dry_run:
+                    self.__ensure_folder(folder_path)
+            for task_name, spec in folder_specs.items():
+                task_path = folder_path.rstrip("\\") + "\\" + task_name
+                action = "update" if task_name in current else "create"
+                try:
+                    xml = spec.to_xml()
+                except Exception as e:
+                    rows.append((folder_path, task_name, task_path, action, "failed", repr(e)))
+                    continue
+                if action == "update" and current[task_name] == definition_hash(xml):
+                    rows.append((folder_path, task_name, task_path, "unchanged", "unchanged", None))
+                else:
+                    writes.append((folder_path, task_name, task_path, action, spec))
+            if folder_path in prune_paths:
+                for task_name in sorted(current.keys() - folder_specs.keys()):
+                    task_path = folder_path.rstrip("\\") + "\\" + task_name
+                    deletes.append((folder_path, task_name, task_path, "delete"))
+
+        if dry_run:
+            rows += [(*write[:4], "planned", None) for write in writes]
+            rows += [(*item, "planned", None) for item in deletes]
+        else:
+            # each spec is registered at its resolved folder path.
+            registered = self.create_tasks(
+                [replace(spec, folder_name=folder_path) for folder_path, *_, spec in writes],
+                workers=workers
+            )
+            for write, (status, error) in zip(writes, registered.select("status", "error").rows()):
+                rows.append((*write[:4], "applied" if status == "registered" else "failed", error))
+            for item in deletes:
+                try:
+                    self.client.GetFolder(item[0]).DeleteTask(item[1], 0)
+                    rows.append((*item, "applied", None))
+                except Exception as e:
+                    rows.append((*item, "failed", repr(e)))
+
+        return pl.DataFrame(rows, schema=RECONCILE_RESULT_SCHEMA, orient="row")
+
+    def apply_start_times(self, changes: pl.DataFrame, dry_run: bool=False) -> pl.DataFrame:
+        """Moves the start boundaries of tasks, as planned by `plan_start_times`.
+
+        The task xml of each task is read, the start boundary of its time and calendar \
+        triggers shifted (see `shift_start_boundaries`) and the task updated with a \
+        single `register_task_xml` call.
+
+        Parameters:
+            changes (`pl.DataFrame`): Task paths and shifts, see `plan_start_times`.
+            dry_run (`bool`): Only report the changes, without writing anything.
+
+        Returns:
+            Data frame with the task path, shift, status (`planned`, `applied` or \
+            `failed`) and error of each task.
+        """
+        if dry_run:
+            rows = [(*change, "planned", None) for change in changes.select("task_path", "shift").iter_rows()]
+            return pl.DataFrame(rows, schema=START_TIMES_RESULT_SCHEMA, orient="row")
+
+        # the tasks are updated folder by folder, each folder is opened once.
+        by_folder = {}
+        for task_path, shift in changes.select("task_path", "shift").iter_rows():
+            folder_path, _, task_name = task_path.rpartition("\\")
+            by_folder.setdefault(folder_path or "\\", []).append((task_path, task_name, shift))
+
+        rows = []
+        for folder_path, folder_changes in by_folder.items():
+            try:
+                folder = TaskFolder(self.client.GetFolder(folder_path))
+            except Exception as e:
+                rows += [(task_path, shift, "failed", repr(e)) for task_path, _, shift in folder_changes]
+                continue
+            for task_path, task_name, shift in folder_changes:
+                try:
+                    xml = shift_start_boundaries(folder.folder.GetTask(task_name).Xml, shift)
+                    folder.register_task_xml(task_name, xml)
+                    rows.append((task_path, shift, "applied", None))
+                except Exception as e:
+                    rows.append((task_path, shift, "failed", repr(e)))
+        return pl.DataFrame(rows, schema=START_TIMES_RESULT_SCHEMA, orient="row")
+
+class MultiHostScheduler:
+    """
+    Task scheduler inventory of several computers, listed concurrently.
+
+    Each host is listed on its own thread with its own COM apartment and connection, at \
+    most `workers` hosts at a time. A host that fails or does not answer within `timeout` \
+    seconds is left out of the result and recorded in `errors`, without holding up the \
+    other hosts.
+
+    Attributes:
+        hosts (`list`): Names of the computers.
+        workers (`int`): Maximum number of hosts listed at the same time.
+        timeout (`float`): Seconds each host is given to list its tasks.
+        errors (`dict`): Host name to the error of the hosts left out of the last listing.
+
+    Parameters:
+        backend (`ComBackend|MemoryBackend`): Task Scheduler to connect to, by default the \
+            Windows Task Scheduler through win32com.
+        connect (`Callable`): Function taking a host name and returning a new connected \
+            Schedule.Service object, by default each host is connected to with the backend \
+            using the given credentials.
+    """
+    def __init__(
+        self,
+        hosts: list[str],
+        workers: int=8,
+        timeout: float|None=120,
+        user: str|None=None,
+        domain: str|None=None,
+        password: str|None=None,
+        backend=None,
+        connect: Callable|None=None
+    ):
+        if workers < 1:
+            raise ValueError("workers must be a positive integer.")
+
+        self.hosts = list(hosts)
+        self.workers = workers
+        self.timeout = timeout
+        self.errors = {}
+        self.backend = backend if backend is not None else ComBackend()
+        self.__slots = threading.Semaphore(workers)
+        self.__apartment = nullcontext
+        if connect is None:
+            self.__apartment = self.backend.apartment
+            connect = lambda host: self.backend.connect(host, user, domain, password)
+        self.__connect = connect
+
+    def __host_tasks(self, host: str, source: str, details: bool) -> pl.DataFrame:
+        """Lists the tasks of a host, the COM objects are released when this returns."""
+        scheduler = TaskScheduler(backend=self.backend, connect=partial(self.__connect, host))
+        return scheduler.get_all_tasks(source, details=details) \
+            .with_columns(pl.lit(host).alias("host"))
+
+    def __list_host(self, host: str, source: str, details: bool, results: queue.SimpleQueue):
+        """Lists the tasks of a host on its own thread and puts the result on the queue.
+
+        The connection slot is released once the thread is done, before the result is \
+        put, so a host that timed out holds its slot until its listing really ends.
+        """
+        try:
+            with self.__apartment():
+                result = (host, self.__host_tasks(host, source, details), None)
+        except Exception as e:
+            result = (host, None, e)
+        self.__slots.release()
+        results.put(result)
+
+    def get_all_tasks(
+        self,
+        source: Literal["com","xml"]="xml",
+        details: bool=False
+    ) -> TasksDataFrame:
+        """Lists the scheduled tasks of every host.
+
+        A host that timed out is left out of the result, but its thread and connection \
+        keep counting against `workers` until they finish, so there are never more than \
+        `workers` connections open, across calls too. When every connection is held by \
+        hosts that timed out for another `timeout` seconds, the hosts not listed yet are \
+        left out as well.
+
+        Parameters:
+            source (`str`): Where the task definitions are read from, see \
+                `RegisteredTask.info`.
+            details (`bool`): Also return the columns read from the task xml, see \
+                `TaskScheduler.get_all_tasks`.
+
+        Returns:
+            TasksDataFrame object with a `host` column.
+        """
+        pending = list(self.hosts)
+        running = {}
+        frames = {}
+        results = queue.SimpleQueue()
+        self.errors = {}
+        blocked_since = None
+
+        while pending or running:
+            while pending and self.__slots.acquire(blocking=False):
+                host = pending.pop(0)
+                # daemon threads, so a host that never answers does not block the exit.
+                threading.Thread(
+                    target=self.__list_host, args=(host, source, details, results), daemon=True
+                ).start()
+                running[host] = time.monotonic()
+
+            # every slot is held by the threads of hosts that already timed out.
+            if pending and not running:
+                blocked_since = blocked_since or time.monotonic()
+            else:
+                blocked_since = None
+
+            wait = None
+            if self.timeout is not None:
+                started = min(running.values()) if running else blocked_since
+                wait = max(started + self.timeout - time.monotonic(), 0)
+            try:
+                host, df, error = results.get(timeout=wait)
+            except queue.Empty:
+                host = None
+
+            # results of hosts that already timed out are ignored.
+            if host in running:
+                del running[host]
+                if error is None:
+                    frames[host] = df
+                else:
+                    self.errors[host] = error
+
+            if self.timeout is not None:
+                now = time.monotonic()
+                for host, started in list(running.items()):
+                    if now - started >= self.timeout:
+                        del running[host]
+                        self.errors[host] = TimeoutError(
+                            f"{host} did not list its tasks within {self.timeout} seconds."
+                        )
+                if blocked_since is not None and now - blocked_since >= self.timeout:
+                    for host in pending:
+                        self.errors[host] = TimeoutError(
+                            f"{host} was not listed, every connection was held by hosts "
+                            "that timed out."
+                        )
+                    pending = []
+
+        frames = [frames[host] for host in self.hosts if host in frames]
+        if not frames:
+            return TasksDataFrame(pl.DataFrame(schema={"host":pl.String}))
+        df = pl.concat(frames, how="diagonal_relaxed")
+        return TasksDataFrame(df.select("host", pl.exclude("host")))
 
 class NewTask:
     """This object covers topics from the TaskDefinition scripting object.
@@ -422,19 +1411,70 @@ class NewTask:
     def __init__(self, taskdef_obj):
         self.taskdef = taskdef_obj
 
+# run time state of a registered task, read from the task object on every listing.
+TASK_RUNTIME_FIELDS = {
+    "task_state":"State",
+    "next_run_time":"NextRunTime",
+    "last_run_time":"LastRunTime",
+    "last_task_result":"LastTaskResult",
+    "number_of_missed_runs":"NumberOfMissedRuns"
+}
+
+# namespace of the task definition xml.
+TASK_XML_NS = {"t":"http://schemas.microsoft.com/windows/2004/02/mit/task"}
+
+def _xml_text(root, path: str, default=None):
+    """Text of an element in the task xml, or the default when it is not set."""
+    elem = root.find(path, TASK_XML_NS)
+    if elem is None or elem.text is None:
+        return default
+    return elem.text
+
+def _xml_bool(root, path: str, default: bool) -> bool:
+    """Boolean setting in the task xml, with the task scheduler default when it is not set."""
+    return _xml_text(root, path, str(default).lower()) == "true"
+
 class RegisteredTask:
     """This object covers some of the api from the RegisteredTask scripting object.
         https://learn.microsoft.com/en-us/windows/win32/taskschd/registeredtask
     """
     def __init__(self, rtask_obj):
         self.rtask = rtask_obj
-        self.xml = rtask_obj.Xml
-        self.taskdef = self.rtask.Definition
-        self.reg_info = self.taskdef.RegistrationInfo
-        self.task_settings = self.taskdef.Settings
 
-    def info(self) -> dict:
-        """Information on registered task."""
+    @cached_property
+    def xml(self) -> str:
+        """Task definition xml."""
+        return self.rtask.Xml
+
+    @cached_property
+    def taskdef(self):
+        """TaskDefinition object."""
+        return self.rtask.Definition
+
+    @cached_property
+    def reg_info(self):
+        """RegistrationInfo object."""
+        return self.taskdef.RegistrationInfo
+
+    @cached_property
+    def task_settings(self):
+        """TaskSettings object."""
+        return self.taskdef.Settings
+
+    def info(self, source: Literal["com","xml"]="com") -> dict:
+        """Information on registered task.
+
+        Parameters:
+            source (`str`): Where the task definition is read from. `com` reads each \
+                property from the task definition object, `xml` reads the whole definition \
+                from a single parse of the task xml and adds the trigger, action and \
+                principal details. The run time state is always read from the task object.
+        """
+        if source == "xml":
+            return self.__info_from_xml()
+        elif source != "com":
+            raise ValueError(f"Unknown info source {source}")
+
         return {
             "name":self.rtask.Name,
             "enabled":self.rtask.Enabled,
@@ -459,10 +1499,58 @@ class RegisteredTask:
             "execution_path":self.__extract_action_execpath()
         }
 
+    def __info_from_xml(self) -> dict:
+        """Information on registered task, with the definition read from the task xml."""
+        root = ET.fromstring(self.xml)
+        settings = "t:Settings/"
+        actions = root.findall("t:Actions/*", TASK_XML_NS)
+        execs = root.findall("t:Actions/t:Exec", TASK_XML_NS)
+        last_exec = execs[-1] if execs else root
+        triggers = root.findall("t:Triggers/*", TASK_XML_NS)
+        enabled = _xml_bool(root, settings + "t:Enabled", True)
+
+        return {
+            "name":self.rtask.Name,
+            "enabled":enabled,
+            "task_state":self.rtask.State,
+            "next_run_time":self.rtask.NextRunTime,
+            "last_run_time":self.rtask.LastRunTime,
+            "last_task_result":self.rtask.LastTaskResult,
+            "number_of_missed_runs":self.rtask.NumberOfMissedRuns,
+            "task_path":self.rtask.Path,
+            "author":_xml_text(root, "t:RegistrationInfo/t:Author"),
+            "registration_date":_xml_text(root, "t:RegistrationInfo/t:Date"),
+            "task_description":_xml_text(root, "t:RegistrationInfo/t:Description"),
+            "task_source":_xml_text(root, "t:RegistrationInfo/t:Source"),
+            "AllowDemandStart": _xml_bool(root, settings + "t:AllowStartOnDemand", True),
+            "StartWhenAvailable": _xml_bool(root, settings + "t:StartWhenAvailable", False),
+            "Enabled": enabled,
+            "Hidden": _xml_bool(root, settings + "t:Hidden", False),
+            "RestartInterval": _xml_text(root, settings + "t:RestartOnFailure/t:Interval"),
+            "RestartCount": int(_xml_text(root, settings + "t:RestartOnFailure/t:Count", 0)),
+            "ExecutionTimeLimit": _xml_text(root, settings + "t:ExecutionTimeLimit", "PT72H"),
+            "MultipleInstances": TaskInstancePolicy.xml_policies.get(
+                _xml_text(root, settings + "t:MultipleInstancesPolicy", "IgnoreNew")
+            ),
+            "execution_path":_xml_text(last_exec, "t:Command", ""),
+            "execution_arguments":_xml_text(last_exec, "t:Arguments"),
+            "working_directory":_xml_text(last_exec, "t:WorkingDirectory"),
+            "action_count":len(actions),
+            "trigger_types":[t.tag.split("}")[-1] for t in triggers],
+            "user_id":_xml_text(root, "t:Principals/t:Principal/t:UserId")
+                or _xml_text(root, "t:Principals/t:Principal/t:GroupId"),
+            "logon_type":_xml_text(root, "t:Principals/t:Principal/t:LogonType"),
+            "run_level":_xml_text(root, "t:Principals/t:Principal/t:RunLevel", "LeastPrivilege")
+        }
+
+    def runtime_info(self) -> dict:
+        """Run time state of the registered task, the fields that change without the \
+        task definition changing."""
+        return {col: getattr(self.rtask, prop) for col, prop in TASK_RUNTIME_FIELDS.items()}
+
     def __extract_action_execpath(self):
         """Gets the action file path from the tasks xml text."""
         exepath = ""
-        import xml.etree.ElementTree as ET
         root = ET.fromstring(self.xml)
         for act in root.findall('{http://schemas.microsoft.com/windows/2004/02/mit/task}Actions'):
             for exe in act.findall('{http://schemas.microsoft.com/windows/2004/02/mit/task}Exec'):
@@ -486,15 +1574,82 @@ class RegisteredTask:
         self.reg_info.Description = task_description
         return self.taskdef
 
+class TaskInfoCache:
+    """
+    Cache of the task information listed by `TaskScheduler.get_all_tasks`, keyed by task path.
+
+    Each task definition is stored with a fingerprint, a hash of the task xml which holds \
+    the registration date and the whole definition. On the next listing unchanged tasks \
+    only have their run time state read again, new or changed tasks have their definition \
+    read in full and tasks that were not listed are dropped.
+
+    Attributes:
+        entries (`dict`): Task path to the `(fingerprint, task info)` of the task.
+        read (`int`): Task definitions read in full by the last listing.
+        reused (`int`): Task definitions reused from the cache by the last listing.
+        dropped (`int`): Deleted tasks dropped by the last listing.
+    """
+    def __init__(self):
+        self.entries = {}
+        self.read = 0
+        self.reused = 0
+        self.dropped = 0
+        self.__listed = set()
+        self.__lock = threading.Lock()
+
+    def begin_refresh(self):
+        """Starts a listing of the tasks."""
+        self.read = 0
+        self.reused = 0
+        self.dropped = 0
+        self.__listed = set()
+
+    def end_refresh(self):
+        """Ends a listing of the tasks, dropping the tasks that were not listed."""
+        deleted = self.entries.keys() - self.__listed
+        for path in deleted:
+            del self.entries[path]
+        self.dropped = len(deleted)
+
+    def info(self, task: RegisteredTask, source: str) -> dict:
+        """Information on a registered task, reusing the cached definition when the \
+        task has not changed.
+
+        Parameters:
+            task (`RegisteredTask`): Registered task.
+            source (`str`): Where the task definition is read from, see `RegisteredTask.info`.
+
+        Returns:
+            Dictionary of the task information.
+        """
+        path = task.rtask.Path
+        fingerprint = (source, hashlib.sha1(task.xml.encode()).hexdigest())
+        entry = self.entries.get(path)
+
+        if entry is not None and entry[0] == fingerprint:
+            info = {**entry[1], **task.runtime_info()}
+            with self.__lock:
+                self.__listed.add(path)
+                self.reused += 1
+            return info
+
+        info = task.info(source)
+        with self.__lock:
+            self.__listed.add(path)
+            self.entries[path] = (fingerprint, info)
+            self.read += 1
+        return info
+
 class TaskAction:
     """This object covers topics from the Action scripting object.
     https://learn.microsoft.com/en-us/windows/win32/taskschd/action
     """
     def __init__(self, taskdef_obj):
-        self.action = taskdef_obj.Actions
+        self.actions = taskdef_obj.Actions
+        self.action = None
 
     def __set_action_type(self, action_type: int):
-        self.action.Create(action_type)
+        self.action = self.actions.Create(action_type)
 
     def create_execution_action(
         self,
@@ -611,6 +1766,31 @@ class TaskFolder:
             "", # no password
             TaskLogonTypes.TASK_LOGON_NONE
         )
+
+    def register_task_xml(
+        self,
+        task_name: str,
+        xml: str,
+        validate_only: bool=False
+    ):
+        """Registers a task from its task xml with a single call, see `TaskSpec.to_xml`.
+
+        Parameters:
+            task_name (`str`): Name of the task.
+            xml (`str`): Task Scheduler 2.0 task xml.
+            validate_only (`bool`): Only let Task Scheduler check the xml, without \
+                registering the task.
+        """
+        flags = TaskCreationTypes.TASK_VALIDATE_ONLY if validate_only \
+            else TaskCreationTypes.TASK_CREATE_OR_UPDATE
+        self.folder.RegisterTask(
+            task_name,
+            xml,
+            flags,
+            "", # no username
+            "", # no password
+            TaskLogonTypes.TASK_LOGON_NONE
+        )
  
 class TaskSettings:
     """This object covers topics from the TaskSettings object.
@@ -686,13 +1866,14 @@ class TaskTrigger:
     """
     def __init__(self, taskdef_obj):
         self.taskdef = taskdef_obj
-        self.trigger = self.taskdef.Triggers
+        self.triggers = self.taskdef.Triggers
+        self.trigger = None
 
     def __set_start_boundary(self, start_date: datetime.date, start_time: datetime.time):
         self.trigger.StartBoundary = datetime.combine(start_date, start_time).isoformat()
 
     def __set_cadence(self, trigger_type: int):
-        self.trigger.Create(trigger_type)
+        self.trigger = self.triggers.Create(trigger_type)
 
     def create_daily_trigger(
         self,
@@ -767,7 +1948,6 @@ class TaskTrigger:
             The `dow` trigger type can start a task every first Thursday of specific months.
         
         """
-        self.__set_start_boundary(start_date, start_time)
         match trigger_type:
             case "month":
                 self.__set_cadence(TaskTriggerTypes.TASK_TRIGGER_MONTHLY)
@@ -778,6 +1958,7 @@ class TaskTrigger:
                 self.trigger.DaysOfWeek = days_of_week
                 self.trigger.MonthsOfYear = months_of_year
                 self.trigger.WeeksOfMonth = weeks_of_month
+        self.__set_start_boundary(start_date, start_time)
         return self.taskdef
 
     def create_one_time_trigger(
@@ -0,0 +1,347 @@
+import re
+import hashlib
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from functools import lru_cache
+from string import Template
+from xml.sax.saxutils import escape
+from pytask_scheduler.constants import MonthlyTriggerValues, TaskInstancePolicy
+
+# namespace of the task definition xml.
+TASK_XML_NAMESPACE = "http://schemas.microsoft.com/windows/2004/02/mit/task"
+XML_NS = {"t":TASK_XML_NAMESPACE}
+
+TASK_TEMPLATE = Template(
+    '<?xml version="1.0" encoding="UTF-16"?>'
+    f'<Task version="1.2" xmlns="{TASK_XML_NAMESPACE}">'
+    "<RegistrationInfo>$registration</RegistrationInfo>"
+    "<Triggers>$trigger</Triggers>"
+    "<Settings>$settings</Settings>"
+    '<Actions Context="Author">$action</Actions>'
+    "</Task>"
+)
+
+# trigger xml by trigger type of `TaskSpec`, elements in the order of the task schema.
+TRIGGER_TEMPLATES = {
+    "one-time":Template("<TimeTrigger>$start</TimeTrigger>"),
+    "daily":Template(
+        "<CalendarTrigger>$start<ScheduleByDay>"
+        "<DaysInterval>$days_interval</DaysInterval>"
+        "</ScheduleByDay></CalendarTrigger>"
+    ),
+    "weekly":Template(
+        "<CalendarTrigger>$start<ScheduleByWeek>"
+        "<WeeksInterval>$weeks_interval</WeeksInterval>"
+        "<DaysOfWeek>$days_of_week</DaysOfWeek>"
+        "</ScheduleByWeek></CalendarTrigger>"
+    ),
+    "monthly":Template(
+        "<CalendarTrigger>$start<ScheduleByMonth>"
+        "<DaysOfMonth>$days_of_month</DaysOfMonth>"
+        "<Months>$months_of_year</Months>"
+        "</ScheduleByMonth></CalendarTrigger>"
+    ),
+    "monthlydow":Template(
+        "<CalendarTrigger>$start<ScheduleByMonthDayOfWeek>"
+        "<Weeks>$weeks_of_month</Weeks>"
+        "<DaysOfWeek>$days_of_week</DaysOfWeek>"
+        "<Months>$months_of_year</Months>"
+        "</ScheduleByMonthDayOfWeek></CalendarTrigger>"
+    )
+}
+
+# trigger bitmask bits to their xml elements, see `MonthlyTriggerValues`.
+DAY_OF_MONTH_ELEMENTS = {
+    bit:f"<Day>{day}</Day>" for day, bit in MonthlyTriggerValues.DAYS_OF_MONTH.items()
+}
+DAY_OF_WEEK_ELEMENTS = {
+    bit:f"<{day}/>" for day, bit in MonthlyTriggerValues.DAYS_OF_WEEK.items()
+}
+MONTH_ELEMENTS = {
+    bit:f"<{month}/>" for month, bit in MonthlyTriggerValues.MONTHS_OF_YEAR.items()
+}
+WEEK_OF_MONTH_ELEMENTS = {
+    bit:f"<Week>{week}</Week>"
+    for week, bit in enumerate(MonthlyTriggerValues.WEEKS_OF_MONTH.values(), start=1)
+}
+
+# bitmask attributes of `TaskSpec` to their xml elements and the trigger types using them.
+MASKS = {
+    "days_of_week":(DAY_OF_WEEK_ELEMENTS, ("weekly", "monthlydow")),
+    "days_of_month":(DAY_OF_MONTH_ELEMENTS, ("monthly",)),
+    "months_of_year":(MONTH_ELEMENTS, ("monthly", "monthlydow")),
+    "weeks_of_month":(WEEK_OF_MONTH_ELEMENTS, ("monthlydow",))
+}
+
+# MultipleInstancesPolicy values written in the task xml by policy value.
+XML_POLICY_NAMES = {v: k for k, v in TaskInstancePolicy.xml_policies.items()}
+
+@lru_cache(maxsize=4096)
+def _mask_xml(mask: int, elements_key: str) -> str:
+    """Xml elements of the bits set in a trigger bitmask."""
+    elements = MASKS[elements_key][0]
+    if mask & ~sum(elements):
+        raise ValueError(f"{elements_key} has bits outside of the valid values: {mask}")
+    return "".join(element for bit, element in elements.items() if mask & bit)
+
+def _element(tag: str, value) -> str:
+    """Xml element of a value, nothing when the value is None."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        value = str(value).lower()
+    return f"<{tag}>{escape(str(value))}</{tag}>"
+
+def _positive(spec, attr: str) -> int:
+    """Interval attribute of a spec, which must be a positive integer."""
+    value = getattr(spec, attr)
+    if not isinstance(value, int) or value < 1:
+        raise ValueError(f"{attr} must be a positive integer for a {spec.trigger_type} trigger.")
+    return value
+
+def _trigger_xml(spec) -> str:
+    """Trigger xml of a spec."""
+    template = TRIGGER_TEMPLATES.get(spec.trigger_type)
+    if template is None:
+        raise ValueError(f"Unknown trigger type {spec.trigger_type}")
+
+    start = datetime.combine(spec.start_date, spec.start_time).isoformat()
+    values = {"start":f"<StartBoundary>{start}</StartBoundary><Enabled>true</Enabled>"}
+    if spec.trigger_type == "daily":
+        values["days_interval"] = _positive(spec, "days_interval")
+    elif spec.trigger_type == "weekly":
+        values["weeks_interval"] = _positive(spec, "weeks_interval")
+
+    for attr, (_, trigger_types) in MASKS.items():
+        if spec.trigger_type in trigger_types:
+            mask = getattr(spec, attr)
+            if not mask:
+                raise ValueError(f"{attr} is required for a {spec.trigger_type} trigger.")
+            values[attr] = _mask_xml(mask, attr)
+    return template.substitute(values)
+
+def _settings_xml(spec) -> str:
+    """Settings xml of a spec, the settings left as None keep their defaults."""
+    restart = ""
+    if (spec.restart_interval is None) != (spec.restart_count is None):
+        raise ValueError("restart_interval and restart_count must be given together.")
+    if spec.restart_interval is not None:
+        restart = "<RestartOnFailure>" \
+            f"{_element('Interval', spec.restart_interval)}" \
+            f"{_element('Count', spec.restart_count)}</RestartOnFailure>"
+
+    policy = None
+    if spec.multiple_instances is not None:
+        if spec.multiple_instances not in XML_POLICY_NAMES:
+            raise ValueError(f"Unknown multiple instances policy {spec.multiple_instances}")
+        policy = XML_POLICY_NAMES[spec.multiple_instances]
+
+    return (
+        _element("AllowStartOnDemand", spec.allow_demand_start)
+        + restart
+        + _element("MultipleInstancesPolicy", policy)
+        + _element("StartWhenAvailable", spec.start_when_available)
+        + _element("Enabled", spec.enabled)
+        + _element("Hidden", spec.hidden)
+        + _element("ExecutionTimeLimit", spec.execution_time_limit)
+    )
+
+def _action_xml(spec) -> str:
+    """Action xml of a spec."""
+    if spec.action_type != "exec":
+        raise NotImplementedError(f"Compiling {spec.action_type} actions has not been implemented")
+    if not spec.action_file:
+        raise ValueError("action_file is required for an exec action.")
+    return "<Exec>" \
+        f"{_element('Command', spec.action_file)}" \
+        f"{_element('Arguments', spec.action_arg or None)}" \
+        f"{_element('WorkingDirectory', spec.action_working_dir or None)}</Exec>"
+
+def compile_task_xml(spec) -> str:
+    """Compiles a task spec into Task Scheduler 2.0 task xml, checking the spec values.
+
+    Parameters:
+        spec (`TaskSpec`): Task spec.
+
+    Returns:
+        Task xml, for `TaskFolder.RegisterTask`.
+    """
+    return TASK_TEMPLATE.substitute(
+        registration=_element("Description", spec.task_description),
+        trigger=_trigger_xml(spec),
+        settings=_settings_xml(spec),
+        action=_action_xml(spec)
+    )
+
+# settings a `TaskSpec` sets, with the values Task Scheduler uses when they are left out.
+SETTING_DEFAULTS = {
+    "AllowStartOnDemand":"true",
+    "MultipleInstancesPolicy":"IgnoreNew",
+    "StartWhenAvailable":"false",
+    "Enabled":"true",
+    "Hidden":"false",
+    "ExecutionTimeLimit":"PT72H"
+}
+
+# elements that are the same as left out when they are empty.
+OPTIONAL_VALUES = {"Arguments", "WorkingDirectory", "EndBoundary"}
+
+def _canonical(elem, ordered: bool=False) -> str:
+    """Canonical text of an element, the children are sorted unless their order matters."""
+    tag = elem.tag.split("}")[-1]
+    children = [
+        _canonical(child) for child in elem
+        if not (child.tag.split("}")[-1] in OPTIONAL_VALUES and not (child.text or "").strip())
+        # triggers are enabled unless they say otherwise.
+        and not (child.tag.endswith("}Enabled") and (child.text or "").strip() == "true")
+    ]
+    if not ordered:
+        children.sort()
+    return f"<{tag}>{(elem.text or '').strip()}{''.join(children)}</{tag}>"
+
+def normalize_task_xml(xml: str) -> str:
+    """Normalized form of the parts of a task xml a `TaskSpec` describes.
+
+    Settings left out take their defaults, and the registration date, author, principal \
+    and other parts Task Scheduler fills in are left out, so the xml of a registered task \
+    and the compiled xml of its spec normalize the same.
+
+    Parameters:
+        xml (`str`): Task Scheduler 2.0 task xml.
+
+    Returns:
+        Normalized task definition text.
+    """
+    root = ET.fromstring(xml)
+    description = (root.findtext("t:RegistrationInfo/t:Description", "", XML_NS) or "").strip()
+    triggers = sorted(_canonical(t) for t in root.iterfind("t:Triggers/*", XML_NS))
+
+    settings = dict(SETTING_DEFAULTS)
+    restart = ""
+    node = root.find("t:Settings", XML_NS)
+    if node is not None:
+        for child in node:
+            tag = child.tag.split("}")[-1]
+            if tag in settings:
+                settings[tag] = (child.text or "").strip()
+            elif tag == "RestartOnFailure":
+                restart = _canonical(child)
+
+    actions = [_canonical(a) for a in root.iterfind("t:Actions/*", XML_NS)]
+    return "\n".join([
+        f"<Description>{description}</Description>",
+        *triggers,
+        *(f"<{k}>{v}</{k}>" for k, v in settings.items()),
+        restart,
+        *actions
+    ])
+
+def definition_hash(xml: str) -> str:
+    """Hash of the normalized task xml, see `normalize_task_xml`."""
+    return hashlib.sha1(normalize_task_xml(xml).encode()).hexdigest()
+
+# trigger xml elements to their bitmask bits, see `MonthlyTriggerValues`.
+XML_MASK_BITS = {
+    "DaysOfWeek":MonthlyTriggerValues.DAYS_OF_WEEK,
+    "DaysOfMonth":{str(k): v for k, v in MonthlyTriggerValues.DAYS_OF_MONTH.items()},
+    "Months":MonthlyTriggerValues.MONTHS_OF_YEAR,
+    "Weeks":dict(zip("1234", MonthlyTriggerValues.WEEKS_OF_MONTH.values()))
+}
+
+# schedule elements of a calendar trigger to the trigger type of `TaskSpec`.
+XML_SCHEDULES = {
+    "ScheduleByDay":"daily",
+    "ScheduleByWeek":"weekly",
+    "ScheduleByMonth":"monthly",
+    "ScheduleByMonthDayOfWeek":"monthlydow"
+}
+
+def _xml_mask(schedule, tag: str) -> int|None:
+    """Bitmask of the child elements of a schedule element."""
+    node = schedule.find(f"t:{tag}", XML_NS)
+    if node is None:
+        return None
+    bits = XML_MASK_BITS[tag]
+    names = [child.text if child.text else child.tag.split("}")[-1] for child in node]
+    return sum(bits[name] for name in names if name in bits)
+
+def _boundary(text: str|None) -> datetime|None:
+    """Local time of a trigger boundary, boundaries with a time zone are converted."""
+    if not text:
+        return None
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+def task_triggers(xml: str) -> list[dict]:
+    """Time and calendar triggers of a task xml, with the attributes of `TaskSpec`.
+
+    Triggers of other kinds, such as boot or logon triggers, have no schedule and are \
+    left out. A trigger is enabled when both the trigger and the task are.
+
+    Parameters:
+        xml (`str`): Task Scheduler 2.0 task xml.
+
+    Returns:
+        List of triggers, with their type, start and end boundaries, enabled flag, \
+        intervals and bitmasks.
+    """
+    root = ET.fromstring(xml)
+    task_enabled = root.findtext("t:Settings/t:Enabled", "true", XML_NS).strip() == "true"
+    triggers = []
+    for node in root.iterfind("t:Triggers/*", XML_NS):
+        kind = node.tag.split("}")[-1]
+        schedule = None
+        if kind == "TimeTrigger":
+            trigger_type = "one-time"
+        elif kind == "CalendarTrigger":
+            schedule = next(
+                (child for child in node if child.tag.split("}")[-1] in XML_SCHEDULES), None
+            )
+            if schedule is None:
+                continue
+            trigger_type = XML_SCHEDULES[schedule.tag.split("}")[-1]]
+        else:
+            continue
+
+        interval = lambda tag: int(schedule.findtext(f"t:{tag}", "1", XML_NS))
+        mask = lambda tag: _xml_mask(schedule, tag) if schedule is not None else None
+        triggers.append({
+            "trigger_type":trigger_type,
+            "start_boundary":_boundary(node.findtext("t:StartBoundary", None, XML_NS)),
+            "end_boundary":_boundary(node.findtext("t:EndBoundary", None, XML_NS)),
+            "enabled":task_enabled and node.findtext("t:Enabled", "true", XML_NS).strip() == "true",
+            "days_interval":interval("DaysInterval") if trigger_type == "daily" else None,
+            "weeks_interval":interval("WeeksInterval") if trigger_type == "weekly" else None,
+            "days_of_week":mask("DaysOfWeek"),
+            "days_of_month":mask("DaysOfMonth"),
+            "months_of_year":mask("Months"),
+            "weeks_of_month":mask("Weeks"),
+            "run_on_last_week_of_month":schedule is not None and any(
+                week.text == "Last" for week in schedule.iterfind("t:Weeks/t:Week", XML_NS)
+            )
+        })
+    return triggers
+
+SCHEDULED_TRIGGER_PATTERN = re.compile(r"<(TimeTrigger|CalendarTrigger)\b.*?</\1>", re.S)
+START_BOUNDARY_PATTERN = re.compile(r"(<StartBoundary>)\s*([^<\s]+)\s*(</StartBoundary>)")
+
+def shift_start_boundaries(xml: str, shift: timedelta) -> str:
+    """Moves the start boundary of the time and calendar triggers of a task xml by \
+    `shift`, keeping their time zone. The rest of the xml is left as is.
+
+    Parameters:
+        xml (`str`): Task Scheduler 2.0 task xml.
+        shift (`timedelta`): Shift of the start boundaries, negative to start earlier.
+
+    Returns:
+        Task xml with the shifted start boundaries.
+    """
+    def shift_boundary(match) -> str:
+        boundary = datetime.fromisoformat(match.group(2)) + shift
+        return match.group(1) + boundary.isoformat() + match.group(3)
+    return SCHEDULED_TRIGGER_PATTERN.sub(
+        lambda trigger: START_BOUNDARY_PATTERN.sub(shift_boundary, trigger.group(0)),
+        xml
+    )
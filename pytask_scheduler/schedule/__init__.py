@@ -0,0 +1,15 @@
+from .schedule import (
+    ConcurrencyForecast,
+    expand_triggers,
+    forecast_concurrency,
+    plan_start_times,
+    task_durations
+)
+
+__all__ = [
+    "ConcurrencyForecast",
+    "expand_triggers",
+    "forecast_concurrency",
+    "plan_start_times",
+    "task_durations"
+]
\ No newline at end of file
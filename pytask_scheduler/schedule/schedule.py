@@ -0,0 +1,583 @@
+import heapq
+import polars as pl
+from bisect import bisect_left
+from math import ceil
+from operator import add
+from datetime import date, datetime, timedelta, time as dtime
+
+# columns of the trigger data frames, see `TaskScheduler.get_all_triggers`.
+TRIGGER_SCHEMA = {
+    "task_path":pl.String,
+    "trigger_type":pl.String,
+    "start_boundary":pl.Datetime("us"),
+    "end_boundary":pl.Datetime("us"),
+    "enabled":pl.Boolean,
+    "days_interval":pl.Int64,
+    "weeks_interval":pl.Int64,
+    "days_of_week":pl.Int64,
+    "days_of_month":pl.Int64,
+    "months_of_year":pl.Int64,
+    "weeks_of_month":pl.Int64,
+    "run_on_last_week_of_month":pl.Boolean
+}
+
+# columns of the data frame returned by `expand_triggers`.
+SCHEDULE_SCHEMA = {"task_path":pl.String, "scheduled_time":pl.Datetime("us")}
+
+# bit of the last day of the month in `MonthlyTriggerValues.DAYS_OF_MONTH`.
+LAST_DAY_OF_MONTH = 2**31
+
+# days of the week from Sunday, with their bit in `MonthlyTriggerValues.DAYS_OF_WEEK`.
+WEEKDAYS = pl.DataFrame({"weekday":range(7), "weekday_bit":[2**i for i in range(7)]})
+
+EPOCH = date(1970, 1, 1)
+
+def _has_bit(mask: str, bit: pl.Expr) -> pl.Expr:
+    """Whether the bit is set in a bitmask column, masks left out have no bits set."""
+    return (pl.col(mask).fill_null(0) & bit) != 0
+
+def _strides(
+    lf: pl.LazyFrame,
+    first: pl.Expr,
+    step: pl.Expr,
+    start_day: int,
+    end_day: int
+) -> pl.LazyFrame:
+    """Days every `step` days from the `first` day within the horizon, with a row per \
+    trigger and day. Days are given as days since the epoch."""
+    k_start = ((start_day - first + step - 1) // step).clip(lower_bound=0)
+    k_end = (end_day - first) // step
+    return lf.with_columns(k=pl.int_ranges(k_start, k_end + 1)) \
+        .explode("k") \
+        .filter(pl.col("k").is_not_null()) \
+        .with_columns(day=(first + pl.col("k") * step).cast(pl.Int32).cast(pl.Date))
+
+def expand_triggers(triggers: pl.DataFrame, start: datetime, end: datetime) -> pl.DataFrame:
+    """Expands triggers into every time they fire between `start` and `end`.
+
+    Every step is evaluated over whole columns. Daily triggers fire every `days_interval` \
+    days from their first day, and weekly triggers every `weeks_interval` weeks on each \
+    day set in `days_of_week`, so their days are generated as ranges. Monthly triggers are \
+    joined with the days of the horizon, keeping the days set in their days of month, \
+    weeks of month and months bitmasks (see `MonthlyTriggerValues`). One-time triggers \
+    fire once, at their start boundary. Disabled triggers, and times outside a trigger's \
+    start and end boundaries, are left out.
+
+    Parameters:
+        triggers (`pl.DataFrame`): Triggers with the columns of `TRIGGER_SCHEMA`, as \
+            returned by `TaskScheduler.get_all_triggers`.
+        start (`datetime`): Start of the horizon, included.
+        end (`datetime`): End of the horizon, excluded.
+
+    Returns:
+        Data frame of the task path and scheduled time of every run, by scheduled time.
+    """
+    if end <= start:
+        raise ValueError("end must be after start.")
+
+    triggers = triggers.select(TRIGGER_SCHEMA.keys()) \
+        .filter(pl.col("enabled") & pl.col("start_boundary").is_not_null()) \
+        .with_row_index("trigger")
+    # the task paths are gathered after the expansion, instead of repeated for every day.
+    paths = triggers.get_column("task_path")
+    lf = triggers.lazy().drop("task_path", "enabled")
+    one_time = lf.filter(pl.col("trigger_type") == "one-time") \
+        .select("trigger", "end_boundary", scheduled_time=pl.col("start_boundary"))
+
+    start_day = (start.date() - EPOCH).days
+    end_day = (end.date() - EPOCH).days
+    first_day = pl.col("start_boundary").dt.date().cast(pl.Int32)
+    # Sunday of the week of the first day, the weeks of the weekly triggers start on Sunday.
+    first_week = first_day - pl.col("start_boundary").dt.weekday() % 7
+
+    # the daily and weekly triggers fire on every `step` days from their first day.
+    daily = _strides(
+        lf.filter(pl.col("trigger_type") == "daily"),
+        first_day,
+        pl.col("days_interval").fill_null(1),
+        start_day,
+        end_day
+    )
+    weekly = _strides(
+        lf.filter(pl.col("trigger_type") == "weekly")
+            .join(WEEKDAYS.lazy(), how="cross")
+            .filter(_has_bit("days_of_week", pl.col("weekday_bit"))),
+        first_week + pl.col("weekday"),
+        7 * pl.col("weeks_interval").fill_null(1),
+        start_day,
+        end_day
+    )
+
+    # the monthly triggers are joined with the days of the horizon, keeping the days they fire on.
+    day = pl.col("day")
+    day_of_month = day.dt.day()
+    days_in_month = day.dt.month_end().dt.day()
+    weekday_bit = pl.lit(2, pl.Int64).pow(day.dt.weekday() % 7)
+    month_bit = pl.lit(2, pl.Int64).pow(day.dt.month() - 1)
+    week_of_month_bit = pl.lit(2, pl.Int64).pow((day_of_month - 1) // 7)
+    day_of_month_bit = pl.lit(2, pl.Int64).pow(day_of_month - 1)
+    fires = {
+        "monthly":_has_bit("months_of_year", month_bit) & (
+            _has_bit("days_of_month", day_of_month_bit)
+            | (_has_bit("days_of_month", pl.lit(LAST_DAY_OF_MONTH)) & (day_of_month == days_in_month))
+        ),
+        "monthlydow":_has_bit("months_of_year", month_bit)
+            & _has_bit("days_of_week", weekday_bit)
+            & (
+                ((day_of_month <= 28) & _has_bit("weeks_of_month", week_of_month_bit))
+                | (pl.col("run_on_last_week_of_month").fill_null(False) & (day_of_month + 7 > days_in_month))
+            )
+    }
+    days = pl.LazyFrame({"day":pl.date_range(start.date(), end.date(), eager=True)})
+    monthly = [
+        lf.filter(pl.col("trigger_type") == trigger_type)
+            .join(days, how="cross")
+            .filter(trigger_fires)
+        for trigger_type, trigger_fires in fires.items()
+    ]
+
+    calendar = [
+        frame.filter(day >= pl.col("start_boundary").dt.date()).select(
+            "trigger",
+            "end_boundary",
+            scheduled_time=day.dt.combine(pl.col("start_boundary").dt.time())
+        )
+        for frame in [daily, weekly, *monthly]
+    ]
+
+    return pl.concat([one_time, *calendar]) \
+        .filter(
+            pl.col("scheduled_time").is_between(start, end, closed="left")
+            & (pl.col("end_boundary").is_null() | (pl.col("scheduled_time") <= pl.col("end_boundary")))
+        ) \
+        .sort("scheduled_time", maintain_order=True) \
+        .collect() \
+        .select(task_path=pl.lit(paths).gather("trigger"), scheduled_time="scheduled_time") \
+        .cast(SCHEDULE_SCHEMA)
+
+# columns of the data frame returned by `task_durations`.
+DURATION_SCHEMA = {"task_name":pl.String, "runs":pl.UInt32, "durations":pl.List(pl.Float64)}
+
+def _task_name(path: pl.Expr) -> pl.Expr:
+    """Name of a task from its path, the history keeps the task name only."""
+    return path.str.split("\\").list.last()
+
+def task_durations(runs: pl.DataFrame, quantiles: int=10) -> pl.DataFrame:
+    """Run duration distribution of each task, as `quantiles` evenly spaced quantiles.
+
+    Parameters:
+        runs (`pl.DataFrame`): Runs with the `Task Name` and `Duration` columns, see \
+            `HistoryDataFrame.runs`.
+        quantiles (`int`): Number of quantiles describing each distribution, the \
+            midpoints of `quantiles` equally likely duration ranges.
+
+    Returns:
+        Data frame with the task name, number of finished runs and the duration quantiles \
+        in seconds.
+    """
+    if quantiles < 1:
+        raise ValueError("quantiles must be a positive integer.")
+    seconds = pl.col("Duration").dt.total_seconds(fractional=True)
+    return runs.lazy() \
+        .filter(pl.col("Duration").is_not_null() & (pl.col("Duration") >= timedelta(0))) \
+        .group_by(task_name=_task_name(pl.col("Task Name"))) \
+        .agg(
+            runs=pl.len(),
+            durations=pl.concat_list(
+                seconds.quantile((i + 0.5) / quantiles, interpolation="linear")
+                for i in range(quantiles)
+            ).first()
+        ) \
+        .sort("task_name") \
+        .collect() \
+        .cast(DURATION_SCHEMA)
+
+class ConcurrencyForecast:
+    """
+    Expected number of tasks running at the same time, minute by minute.
+
+    Each scheduled run is given the duration quantiles of its task, a run of a task \
+    without history takes the default duration. The run is counted in every minute it \
+    overlaps, weighted by the share of its quantile: `expected` is the expected number \
+    of running tasks and `upper` the number running when every run takes its highest \
+    quantile. The timeline is a sweep over the start and end minutes of the runs, summed \
+    over whole columns.
+
+    Attributes:
+        intervals (`pl.DataFrame`): Task path, start and end minutes, and weight of \
+            each run and quantile.
+        timeline (`pl.DataFrame`): Expected and upper concurrency of each minute.
+    """
+    def __init__(self, intervals: pl.DataFrame, timeline: pl.DataFrame):
+        self.intervals = intervals
+        self.timeline = timeline
+
+    def peak_windows(self, threshold: float|None=None, top: int=10) -> pl.DataFrame:
+        """Windows of consecutive minutes where the expected concurrency reaches the threshold.
+
+        Parameters:
+            threshold (`float`): Expected concurrency of a peak, by default the 95th \
+                percentile of the minutes running any task.
+            top (`int`): Number of windows, the highest peaks first.
+
+        Returns:
+            Data frame with the start and end of each window, its peak expected and upper \
+            concurrency, and the tasks running in it with their expected share of the \
+            concurrency over the window, the largest first.
+        """
+        if threshold is None:
+            threshold = self.timeline.filter(pl.col("expected") > 0) \
+                .get_column("expected").quantile(0.95) or 0.0
+
+        windows = self.timeline.lazy() \
+            .filter(pl.col("expected") >= threshold) \
+            .with_columns(
+                window=(pl.col("minute").diff() != timedelta(minutes=1)).fill_null(True).cum_sum()
+            ) \
+            .group_by("window") \
+            .agg(
+                window_start=pl.col("minute").min(),
+                window_end=pl.col("minute").max() + timedelta(minutes=1),
+                peak_expected=pl.col("expected").max(),
+                peak_upper=pl.col("upper").max()
+            ) \
+            .sort("peak_expected", "window_start", descending=[True, False]) \
+            .head(top) \
+            .collect()
+
+        # each run's share of a window is its weighted overlap over the window length, the
+        # runs of each of the few windows are found with a filter.
+        shares = [pl.LazyFrame(schema={"window":pl.UInt32, "task_path":pl.String, "share":pl.Float64})]
+        for window, window_start, window_end in windows.select("window", "window_start", "window_end").iter_rows():
+            overlap = pl.min_horizontal("end", pl.lit(window_end)) \
+                - pl.max_horizontal("start", pl.lit(window_start))
+            shares.append(self.intervals.lazy()
+                .filter((pl.col("start") < window_end) & (pl.col("end") > window_start))
+                .select(
+                    window=pl.lit(window, pl.UInt32),
+                    task_path="task_path",
+                    share=pl.col("weight") * overlap.dt.total_seconds()
+                        / (window_end - window_start).total_seconds()
+                )
+            )
+        tasks = pl.concat(shares) \
+            .group_by("window", "task_path") \
+            .agg(pl.col("share").sum()) \
+            .sort("share", "task_path", descending=[True, False]) \
+            .group_by("window", maintain_order=True) \
+            .agg(tasks=pl.struct("task_path", "share"))
+
+        return windows.lazy() \
+            .join(tasks, on="window", how="left", maintain_order="left") \
+            .drop("window") \
+            .collect()
+
+def forecast_concurrency(
+    schedule: pl.DataFrame,
+    durations: pl.DataFrame,
+    default_duration: timedelta=timedelta(minutes=5)
+) -> ConcurrencyForecast:
+    """Forecasts how many tasks run at the same time from their scheduled runs and their \
+    historical durations.
+
+    Parameters:
+        schedule (`pl.DataFrame`): Scheduled runs, see `expand_triggers`.
+        durations (`pl.DataFrame`): Duration quantiles of each task, see `task_durations`. \
+            Tasks are matched by name.
+        default_duration (`timedelta`): Duration of the runs of tasks without history.
+
+    Returns:
+        ConcurrencyForecast object.
+    """
+    default = pl.lit([default_duration.total_seconds()], pl.List(pl.Float64))
+    minute = timedelta(minutes=1)
+    intervals = schedule.lazy() \
+        .join(
+            durations.lazy().select("task_name", "durations"),
+            left_on=_task_name(pl.col("task_path")),
+            right_on="task_name",
+            how="left"
+        ) \
+        .with_columns(durations=pl.col("durations").fill_null(default)) \
+        .with_columns(
+            quantiles=pl.col("durations").list.len(),
+            quantile=pl.int_ranges(pl.col("durations").list.len())
+        ) \
+        .explode("durations", "quantile") \
+        .with_columns(
+            start=pl.col("scheduled_time").dt.truncate("1m"),
+            end=pl.col("scheduled_time")
+                + pl.duration(microseconds=(pl.col("durations") * 1e6).cast(pl.Int64))
+        ) \
+        .select(
+            "task_path",
+            "start",
+            # a run is counted in every minute it overlaps, at least its start minute.
+            end=pl.max_horizontal(
+                (pl.col("end") - pl.duration(microseconds=1)).dt.truncate("1m") + minute,
+                pl.col("start") + minute
+            ),
+            weight=1 / pl.col("quantiles"),
+            # the quantiles are ascending, the last one is the upper bound of the run.
+            is_upper=pl.col("quantile") == pl.col("quantiles") - 1
+        ) \
+        .collect()
+
+    return ConcurrencyForecast(intervals, _sweep(intervals))
+
+def _sweep(intervals: pl.DataFrame) -> pl.DataFrame:
+    """Concurrency of each minute, the running sum of the runs started minus the runs ended."""
+    schema = {"minute":pl.Datetime("us"), "expected":pl.Float64, "upper":pl.Float64}
+    if intervals.is_empty():
+        return pl.DataFrame(schema=schema)
+
+    upper = pl.col("is_upper").cast(pl.Float64)
+    deltas = pl.concat([
+        intervals.select(minute="start", expected="weight", upper=upper),
+        intervals.select(minute="end", expected=-pl.col("weight"), upper=-upper)
+    ]).group_by("minute").agg(pl.col("expected", "upper").sum())
+
+    minutes = pl.datetime_range(
+        intervals.get_column("start").min(),
+        intervals.get_column("end").max(),
+        "1m",
+        time_unit="us",
+        eager=True
+    )
+    return minutes.alias("minute").to_frame() \
+        .join(deltas, on="minute", how="left") \
+        .sort("minute") \
+        .select("minute", pl.col("expected", "upper").fill_null(0).cum_sum().round(9)) \
+        .cast(schema)
+
+# columns of the data frame returned by `plan_start_times`.
+START_PLAN_SCHEMA = {
+    "task_path":pl.String,
+    "start_boundary":pl.Datetime("us"),
+    "new_start_boundary":pl.Datetime("us"),
+    "shift":pl.Duration("us")
+}
+
+DAY_SECONDS = 86400
+
+def _run_profile(offset: int, durations: list[float], step: int) -> list[float]:
+    """Expected share of a run in each step from its first step, for a run starting \
+    `offset` seconds into its first step and taking each duration with the same chance."""
+    length = max(1, ceil((offset + max(durations)) / step))
+    profile = [sum(offset + d > k * step for d in durations) / len(durations) for k in range(length)]
+    profile[0] = 1.0
+    return profile
+
+def _in_window(seconds: int, window: tuple[int, int]) -> bool:
+    """Whether a time of day is in a window, windows ending before they start span midnight."""
+    window_start, window_end = window
+    if window_start <= window_end:
+        return window_start <= seconds <= window_end
+    return seconds >= window_start or seconds <= window_end
+
+def _starts_after(start_times: list[int], start: int, duration: float) -> bool:
+    """Whether one of the sorted start times of day is at least `duration` seconds after \
+    `start`, each day."""
+    end = start + duration
+    if end >= start + DAY_SECONDS:
+        return False
+    if end <= DAY_SECONDS:
+        inside = bisect_left(start_times, end) - bisect_left(start_times, start)
+    else:
+        inside = len(start_times) - bisect_left(start_times, start) + bisect_left(start_times, end - DAY_SECONDS)
+    return inside < len(start_times)
+
+def _seconds_of_day(t: dtime) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+def plan_start_times(
+    triggers: pl.DataFrame,
+    durations: pl.DataFrame,
+    start: datetime,
+    end: datetime,
+    movable: list[str]|None=None,
+    windows: pl.DataFrame|None=None,
+    dependencies: pl.DataFrame|None=None,
+    step: timedelta=timedelta(minutes=5),
+    max_shift: timedelta=timedelta(hours=2),
+    default_duration: timedelta=timedelta(minutes=5)
+) -> pl.DataFrame:
+    """Plans new start times of the movable tasks that flatten the peak concurrency.
+
+    A task is moved as a whole, every trigger by the same shift, so each run of the task \
+    moves with it. The load of the fixed tasks over the horizon is laid out first, as in \
+    `forecast_concurrency`, then the movable tasks are placed one at a time, the most \
+    running time first, each at the shift keeping the peak of the load lowest. Ties go \
+    to the least loaded shift, then to the smallest shift, so tasks only move when it \
+    helps. A task is placed after the tasks it depends on, and starts each day after they \
+    end in their highest duration quantile. Tasks without runs in the horizon stay put.
+
+    Parameters:
+        triggers (`pl.DataFrame`): Triggers with the columns of `TRIGGER_SCHEMA`, see \
+            `TaskScheduler.get_all_triggers`.
+        durations (`pl.DataFrame`): Duration quantiles of each task, see `task_durations`.
+        start (`datetime`): Start of the horizon, included.
+        end (`datetime`): End of the horizon, excluded.
+        movable (`list[str]`): Paths of the tasks that can be moved, all the tasks by default.
+        windows (`pl.DataFrame`): Allowed start times of tasks, with the `task_path`, \
+            `window_start` and `window_end` time columns. A window ending before it \
+            starts spans midnight. Tasks without a window move at most `max_shift`.
+        dependencies (`pl.DataFrame`): Tasks that must run after others, with the \
+            `task_path` and `depends_on` columns.
+        step (`timedelta`): Granularity of the load and of the shifts, whole seconds.
+        max_shift (`timedelta`): Largest shift of a task without an allowed window, \
+            earlier or later.
+        default_duration (`timedelta`): Duration of the runs of tasks without history.
+
+    Returns:
+        Data frame of the moved tasks with their current and new start boundary, the \
+        earliest of their triggers, and the shift, applied with \
+        `TaskScheduler.apply_start_times`.
+    """
+    step = int(step.total_seconds())
+    if step < 1:
+        raise ValueError("step must be at least a second.")
+    default = [default_duration.total_seconds()]
+
+    triggers = triggers.filter(pl.col("enabled") & pl.col("start_boundary").is_not_null())
+    anchors = triggers.group_by("task_path") \
+        .agg(
+            anchor=pl.col("start_boundary").min(),
+            times=pl.col("start_boundary").dt.time().unique()
+        )
+    anchor = dict(anchors.select("task_path", "anchor").iter_rows())
+    anchor_time = {path: _seconds_of_day(task_anchor.time()) for path, task_anchor in anchor.items()}
+    trigger_times = {
+        path: [_seconds_of_day(t) for t in task_times]
+        for path, task_times in anchors.select("task_path", "times").iter_rows()
+    }
+
+    # the runs of each task, grouped by their offset into their step, share a profile.
+    seconds = (pl.col("scheduled_time") - start).dt.total_seconds()
+    runs = expand_triggers(triggers, start, end) \
+        .group_by("task_path", offset=seconds % step) \
+        .agg(steps=seconds // step)
+    quantiles = dict(durations.select("task_name", "durations").iter_rows())
+    runs_of = {}
+    for path, offset, steps in runs.iter_rows():
+        task_quantiles = quantiles.get(path.split("\\")[-1]) or default
+        runs_of.setdefault(path, []).append((steps, _run_profile(offset, task_quantiles, step)))
+    upper = {path: max(quantiles.get(path.split("\\")[-1]) or default) for path in anchor}
+
+    windows = {} if windows is None else {
+        path: (_seconds_of_day(window_start), _seconds_of_day(window_end))
+        for path, window_start, window_end in windows.select("task_path", "window_start", "window_end").iter_rows()
+    }
+    depends_on = {}
+    dependents = {}
+    if dependencies is not None:
+        for path, dependency in dependencies.select("task_path", "depends_on").iter_rows():
+            if path in anchor and dependency in anchor:
+                depends_on.setdefault(path, set()).add(dependency)
+                dependents.setdefault(dependency, set()).add(path)
+
+    planned = set(runs_of) if movable is None else set(movable) & set(runs_of)
+    max_steps = int(max_shift.total_seconds()) // step
+    half_day = DAY_SECONDS // 2 // step
+    pad = max(max_steps, half_day)
+    length = max((len(profile) for task_runs in runs_of.values() for _, profile in task_runs), default=1)
+    load = [0.0] * (2 * pad + ceil((end - start).total_seconds() / step) + length + 1)
+
+    def place(path: str, shift: int):
+        for steps, profile in runs_of[path]:
+            for first in steps:
+                i = pad + first + shift
+                load[i:i + len(profile)] = map(add, load[i:i + len(profile)], profile)
+
+    shifts = {}
+    for path in runs_of.keys() - planned:
+        place(path, 0)
+
+    # the shifts a movable task may take, keeping the start time of its triggers in its window.
+    allowed = {}
+    for path in planned:
+        bound = half_day if path in windows else max_steps
+        allowed[path] = [
+            shift for shift in range(-bound, bound + 1)
+            if path not in windows
+            or all(_in_window((t + shift * step) % DAY_SECONDS, windows[path]) for t in trigger_times[path])
+        ]
+        if not allowed[path]:
+            raise ValueError(f"{path} has no start time in its window.")
+
+    waiting = {path: len(depends_on.get(path, set()) & planned) for path in planned}
+    order = [path for path, count in waiting.items() if count == 0]
+    counts = dict(waiting)
+    for path in order:
+        for dependent in dependents.get(path, set()) & planned:
+            counts[dependent] -= 1
+            if counts[dependent] == 0:
+                order.append(dependent)
+    if len(order) < len(planned):
+        raise ValueError("The dependencies of the movable tasks have a cycle.")
+
+    # the shifts of each task leaving the tasks depending on it a start time after it ends,
+    # from the last tasks of the dependency chains back.
+    for path in reversed(order):
+        for dependent in dependents.get(path, ()):
+            start_times = sorted({
+                (anchor_time[dependent] + shift * step) % DAY_SECONDS
+                for shift in (allowed[dependent] if dependent in planned else [0])
+            })
+            allowed[path] = [
+                shift for shift in allowed[path]
+                if _starts_after(start_times, (anchor_time[path] + shift * step) % DAY_SECONDS, upper[path])
+            ]
+        if not allowed[path]:
+            raise ValueError(f"{path} has no start time in its window ending before the tasks depending on it start.")
+
+    def candidates(path: str) -> list[int]:
+        """Allowed shifts of a task starting after the placed tasks it depends on end."""
+        started = [
+            ((anchor_time[dependency] + shifts.get(dependency, 0) * step) % DAY_SECONDS, upper[dependency])
+            for dependency in depends_on.get(path, ())
+        ]
+        return [
+            shift for shift in allowed[path]
+            if all((anchor_time[path] + shift * step - time) % DAY_SECONDS >= duration for time, duration in started)
+        ]
+
+    running = {
+        path: sum(len(steps) * sum(profile) for steps, profile in runs_of[path])
+        for path in planned
+    }
+    ready = [(-running[path], path) for path, count in waiting.items() if count == 0]
+    heapq.heapify(ready)
+    while ready:
+        _, path = heapq.heappop(ready)
+        task_candidates = candidates(path)
+        if not task_candidates:
+            raise ValueError(f"{path} has no start time in its window after the tasks it depends on.")
+
+        best = None
+        for shift in task_candidates:
+            peak = total = 0.0
+            for steps, profile in runs_of[path]:
+                width = len(profile)
+                for first in steps:
+                    i = pad + first + shift
+                    window_load = load[i:i + width]
+                    peak = max(peak, max(map(add, window_load, profile)))
+                    total += sum(window_load)
+            key = (round(peak, 9), round(total, 9), abs(shift))
+            if best is None or key < best[0]:
+                best = (key, shift)
+        shifts[path] = best[1]
+        place(path, best[1])
+
+        for dependent in dependents.get(path, set()) & planned:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                heapq.heappush(ready, (-running[dependent], dependent))
+
+    rows = [
+        (path, anchor[path], anchor[path] + timedelta(seconds=shift * step), timedelta(seconds=shift * step))
+        for path, shift in sorted(shifts.items())
+        if shift != 0
+    ]
+    return pl.DataFrame(rows, schema=START_PLAN_SCHEMA, orient="row")
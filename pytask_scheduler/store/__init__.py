@@ -0,0 +1,5 @@
+from .store import HistoryStore
+
+__all__ = [
+    "HistoryStore"
+]
\ No newline at end of file
@@ -0,0 +1,194 @@
+import os
+import glob
+import uuid
+import polars as pl
+from datetime import date, datetime, timezone
+from pytask_scheduler import HistoryDataFrame, HistoryQuery
+from pytask_scheduler.functions import collect, iter_new_task_scheduler_history
+from pytask_scheduler.functions.functions import TASK_SCHEDULER_EVTX_PATH
+
+STORE_FORMATS = ("parquet", "ipc")
+
+# partitions of events without a created time.
+UNKNOWN_PARTITION = "date=unknown"
+
+def _utc(value: datetime|None) -> datetime|None:
+    """Converts a datetime to naive UTC, the clock of the `Event Created` column."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class HistoryStore:
+    """
+    Local store of the task scheduler history, partitioned by event date.
+
+    Events are appended to Parquet or Arrow IPC files under one directory per day, \
+    e.g. `date=2024-09-01/part-<id>.parquet`, so the history is kept after the \
+    event log rotates and queries are answered by scanning the files lazily.
+
+    Attributes:
+        path (`str`): Directory of the store.
+        format (`str`): File format of the store, `parquet` or `ipc`.
+        fields (`tuple`): Extra event fields stored as columns.
+        checkpoint_fpath (`str`): Checkpoint of the incremental reads used by `update`.
+    """
+    def __init__(self, path: str, format: str="parquet", fields: list[str]|None=None):
+        if format not in STORE_FORMATS:
+            raise ValueError(f"format must be one of {STORE_FORMATS}.")
+
+        self.path = path
+        self.format = format
+        self.fields = tuple(fields or ())
+        self.checkpoint_fpath = os.path.join(path, "checkpoint.json")
+        os.makedirs(path, exist_ok=True)
+
+    def __partition(self, key: date|None) -> str:
+        """Directory of the partition holding the events of a date."""
+        if key is None:
+            return os.path.join(self.path, UNKNOWN_PARTITION)
+        return os.path.join(self.path, f"date={key.isoformat()}")
+
+    def __write(self, df: pl.DataFrame, fpath: str):
+        """Writes a data frame in the store format, replacing the file atomically."""
+        tmp_fpath = fpath + ".tmp"
+        if self.format == "parquet":
+            df.write_parquet(tmp_fpath)
+        else:
+            df.write_ipc(tmp_fpath)
+        os.replace(tmp_fpath, fpath)
+
+    def __files(self, since: datetime|None=None, until: datetime|None=None) -> list[str]:
+        """Lists the store files, skipping the partitions outside the time window."""
+        files = []
+        for partition in sorted(glob.glob(os.path.join(self.path, "date=*"))):
+            name = os.path.basename(partition)
+            if name != UNKNOWN_PARTITION:
+                day = date.fromisoformat(name.split("=", 1)[1])
+                if (since is not None and day < since.date()) \
+                        or (until is not None and day > until.date()):
+                    continue
+            elif since is not None or until is not None:
+                continue
+            files.extend(sorted(glob.glob(os.path.join(partition, f"*.{self.format}"))))
+        return files
+
+    def append(self, history: HistoryDataFrame) -> int:
+        """Appends history events to the store.
+
+        Parameters:
+            history (`HistoryDataFrame`): Preprocessed history events.
+
+        Returns:
+            Number of events appended.
+        """
+        if history.height == 0:
+            return 0
+
+        partitions = (history
+            .with_columns(pl.col("Event Created").cast(pl.Date).alias("_date"))
+            .partition_by("_date", as_dict=True, include_key=False, maintain_order=True)
+        )
+        for (key,), df in partitions.items():
+            partition = self.__partition(key)
+            os.makedirs(partition, exist_ok=True)
+            self.__write(df, os.path.join(partition, f"part-{uuid.uuid4().hex}.{self.format}"))
+        return history.height
+
+    def update(self, evt_fpath: str=TASK_SCHEDULER_EVTX_PATH, batch_size: int=10_000) -> int:
+        """Appends the events written to the event log since the last update.
+
+        Parameters:
+            evt_fpath (`str`): Path to the task scheduler operational event log file.
+            batch_size (`int`): Maximum number of events read at a time.
+
+        Returns:
+            Number of events appended.
+        """
+        batches = iter_new_task_scheduler_history(
+            self.checkpoint_fpath,
+            batch_size=batch_size,
+            evt_fpath=evt_fpath,
+            fields=list(self.fields)
+        )
+        return sum(self.append(batch) for batch in batches)
+
+    def compact(self):
+        """Rewrites each partition holding several files as a single file."""
+        for partition in glob.glob(os.path.join(self.path, "date=*")):
+            files = sorted(glob.glob(os.path.join(partition, f"*.{self.format}")))
+            if len(files) < 2:
+                continue
+
+            df = self.__scan(files).collect()
+            self.__write(df, os.path.join(partition, f"part-{uuid.uuid4().hex}.{self.format}"))
+            for fpath in files:
+                os.remove(fpath)
+
+    def __scan(self, files: list[str]) -> pl.LazyFrame:
+        """Scans store files lazily."""
+        if self.format == "parquet":
+            return pl.scan_parquet(files)
+        return pl.scan_ipc(files)
+
+    def scan(self, since: datetime|None=None, until: datetime|None=None) -> pl.LazyFrame:
+        """Lazily scans the stored history.
+
+        Only the partitions inside the time window are read, and the filters and column \
+        selections of the query are pushed down into the file scans.
+
+        Parameters:
+            since (`datetime`): Only events created at or after this time, naive datetimes \
+                are taken as UTC.
+            until (`datetime`): Only events created at or before this time.
+
+        Returns:
+            LazyFrame with the `HistoryDataFrame` columns.
+        """
+        since, until = _utc(since), _utc(until)
+        files = self.__files(since, until)
+        if not files:
+            return collect([], list(self.fields)).lazy()
+
+        lf = self.__scan(files)
+        if since is not None:
+            lf = lf.filter(pl.col("Event Created") >= since)
+        if until is not None:
+            lf = lf.filter(pl.col("Event Created") <= until)
+        return lf
+
+    def query(self, since: datetime|None=None, until: datetime|None=None) -> HistoryQuery:
+        """Start a lazy history query over the stored history, see `HistoryQuery`.
+
+        Parameters:
+            since (`datetime`): Only events created at or after this time.
+            until (`datetime`): Only events created at or before this time.
+
+        Returns:
+            HistoryQuery object.
+        """
+        return HistoryQuery(self.scan(since, until))
+
+    def history(
+        self,
+        since: datetime|None=None,
+        until: datetime|None=None,
+        event_ids: list[int]|None=None,
+        task_names: list[str]|None=None
+    ) -> HistoryDataFrame:
+        """Get the stored task scheduler history.
+
+        Parameters:
+            since (`datetime`): Only events created at or after this time.
+            until (`datetime`): Only events created at or before this time.
+            event_ids (`list[int]`): Only events with these event ids.
+            task_names (`list[str]`): Only events of these tasks, by task name or full task path.
+
+        Returns:
+            HistoryDataFrame object.
+        """
+        lf = self.scan(since, until)
+        if event_ids is not None:
+            lf = lf.filter(pl.col("Event ID").is_in(list(event_ids)))
+        if task_names is not None:
+            lf = lf.filter(pl.col("Task Name").is_in([n.split("\\")[-1] for n in task_names]))
+        return HistoryDataFrame(lf.sort("Event Created", "Event Record ID").collect())
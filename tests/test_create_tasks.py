@@ -0,0 +1,35 @@
+from datetime import date, time
+from pytask_scheduler import TaskScheduler, TaskSpec, MemoryBackend
+
+def spec(task_name, folder_name, **kwargs):
+    return TaskSpec(
+        task_name, folder_name, "daily", date(2024, 1, 1), time(1), "C:\\jobs\\run.exe",
+        **{"days_interval":1, **kwargs}
+    )
+
+def test_create_tasks_results():
+    scheduler = TaskScheduler(backend=MemoryBackend(0, 0))
+    scheduler.root_folder.CreateFolder("ETL")
+    results = scheduler.create_tasks([
+        spec("ok", "ETL"),
+        spec("bad", "ETL", days_interval=None),
+        spec("lost", "Missing")
+    ])
+
+    assert results.rows() == [
+        ("ETL", "ok", "\\ETL\\ok", "registered", None),
+        ("ETL", "bad", None, "failed", results.item(1, "error")),
+        ("Missing", "lost", None, "failed", results.item(2, "error"))
+    ]
+    assert "days_interval" in results.item(1, "error")
+
+def test_create_tasks_refuses_ambiguous_folder_names():
+    scheduler = TaskScheduler(backend=MemoryBackend(30, 1, distinct_names=10))
+    before = scheduler.get_all_tasks()
+    results = scheduler.create_tasks([spec("new", "Folder3"), spec("new", "\\Folder3")])
+
+    assert results["status"].to_list() == ["failed", "registered"]
+    assert "matches 3 folders" in results.item(0, "error")
+    assert results.item(1, "task_path") == "\\Folder3\\new"
+    after = scheduler.get_all_tasks()
+    assert set(after["task_path"]) - set(before["task_path"]) == {"\\Folder3\\new"}
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import pytest
+from itertools import islice
+from evtx_writer import EvtxWriter
+from fixtures import task_events
+from pytask_scheduler import get_task_scheduler_history, watch_task_scheduler_history
+from pytask_scheduler.functions.functions import _HistoryTail
+
+def read_ids(tail: _HistoryTail, batch_size: int=100) -> list[int]:
+    return [int(i) for batch in tail.read(batch_size) for i in batch["Event Record ID"]]
+
+@pytest.fixture
+def log(tmp_path):
+    events = task_events(5000)
+    writer = EvtxWriter(str(tmp_path / "live.evtx"))
+    writer.add(islice(events, 500)).flush()
+    return writer, events
+
+def test_tail_reads_appended_records_once(log):
+    writer, events = log
+    with _HistoryTail(writer.path) as tail:
+        assert read_ids(tail) == []
+        delivered = []
+        # several reads per chunk and batches spanning the chunk boundaries.
+        for count in (1, 37, 150, 400, 3):
+            first = writer.next_record
+            writer.add(islice(events, count)).flush()
+            ids = read_ids(tail)
+            assert ids == list(range(first, writer.next_record))
+            delivered += ids
+            assert read_ids(tail) == []
+
+    assert writer.chunk_count > 3
+    assert delivered == list(range(501, writer.next_record))
+
+def test_tail_from_start_matches_full_read(log):
+    writer, _ = log
+    with _HistoryTail(writer.path, from_start=True) as tail:
+        batches = list(tail.read(128))
+    full = get_task_scheduler_history(evt_fpath=writer.path)
+
+    assert [b.height for b in batches] == [128, 128, 128, 116]
+    assert all(b.equals(f) for b, f in zip(batches, full.iter_slices(128)))
+
+def test_tail_after_clear(log):
+    writer, _ = log
+    with _HistoryTail(writer.path) as tail:
+        # the cleared log is refilled past the last record read.
+        writer = EvtxWriter(writer.path)
+        writer.add(task_events(700, seed=1)).flush()
+        assert read_ids(tail) == list(range(1, 701))
+
+        writer.add(islice(task_events(10, seed=2), 10)).flush()
+        assert read_ids(tail) == list(range(701, 711))
+
+def test_tail_after_wrap(log):
+    writer, events = log
+    with _HistoryTail(writer.path) as tail:
+        writer.add(islice(events, 300)).flush()
+        assert read_ids(tail) == list(range(501, 801))
+
+        # the next chunks overwrite the oldest chunks, like a full log.
+        chunk_count = writer.chunk_count
+        writer.add(islice(events, 1)).flush()
+        writer.chunk, writer.chunk_count = None, 0
+        first = writer.next_record
+        writer.add(islice(events, 250)).flush()
+
+        assert writer.chunk_count == 2 < chunk_count
+        assert read_ids(tail) == list(range(801, writer.next_record))
+        assert first == 802
+
+def watch(writer, callback, **kwargs):
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=watch_task_scheduler_history,
+        args=(callback,),
+        kwargs={"evt_fpath":writer.path, "interval":0.05, "stop":stop, "from_start":True, **kwargs}
+    )
+    watcher.start()
+    return stop, watcher
+
+def test_watch_awaits_async_callbacks(log):
+    writer, events = log
+    delivered = []
+    done = threading.Event()
+
+    async def callback(batch):
+        await asyncio.sleep(0)
+        delivered.extend(int(i) for i in batch["Event Record ID"])
+        if len(delivered) >= 800:
+            done.set()
+
+    stop, watcher = watch(writer, callback, batch_size=64)
+    writer.add(islice(events, 300)).flush()
+    assert done.wait(10)
+    stop.set()
+    watcher.join(10)
+
+    assert delivered == list(range(1, 801))
+
+def test_watch_awaits_async_callbacks_on_a_given_loop(log):
+    writer, _ = log
+    loop = asyncio.new_event_loop()
+    runner = threading.Thread(target=loop.run_forever)
+    runner.start()
+    delivered = []
+    done = threading.Event()
+
+    async def callback(batch):
+        assert asyncio.get_running_loop() is loop
+        delivered.extend(int(i) for i in batch["Event Record ID"])
+        if len(delivered) >= 500:
+            done.set()
+
+    try:
+        stop, watcher = watch(writer, callback, loop=loop)
+        assert done.wait(10)
+        stop.set()
+        watcher.join(10)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        runner.join()
+        loop.close()
+
+    assert delivered == list(range(1, 501))
@@ -0,0 +1,92 @@
+import time
+import threading
+import pytest
+from pytask_scheduler import MultiHostScheduler, MemoryBackend
+
+class Fleet:
+    """Connect function over a MemoryBackend whose hanging hosts block until released, \
+    counting the connections open at the same time."""
+    def __init__(self, hanging=(), refused=(), delay=0.01):
+        self.backend = MemoryBackend(3, 2, unreachable=list(refused))
+        self.hanging = set(hanging)
+        self.delay = delay
+        self.released = threading.Event()
+        self.lock = threading.Lock()
+        self.open = 0
+        self.peak = 0
+
+    def connect(self, host):
+        with self.lock:
+            self.open += 1
+            self.peak = max(self.peak, self.open)
+        try:
+            if host in self.hanging:
+                self.released.wait()
+            else:
+                time.sleep(self.delay)
+            return self.backend.connect(host)
+        finally:
+            with self.lock:
+                self.open -= 1
+
+@pytest.fixture
+def fleet_factory():
+    fleets = []
+    def factory(**kwargs):
+        fleets.append(Fleet(**kwargs))
+        return fleets[-1]
+    yield factory
+    for fleet in fleets:
+        fleet.released.set()
+
+def test_at_most_workers_connections(fleet_factory):
+    hosts = [f"HOST{i}" for i in range(10)]
+    fleet = fleet_factory(hanging=hosts[:2], refused=hosts[2:4])
+    scheduler = MultiHostScheduler(
+        hosts, workers=3, timeout=0.5, backend=fleet.backend, connect=fleet.connect
+    )
+    tasks = scheduler.get_all_tasks()
+
+    assert fleet.peak <= 3
+    assert sorted(tasks["host"].unique()) == hosts[4:]
+    assert {h: type(e) for h, e in scheduler.errors.items()} == {
+        **dict.fromkeys(hosts[:2], TimeoutError),
+        **dict.fromkeys(hosts[2:4], ConnectionError)
+    }
+
+def test_timed_out_hosts_keep_their_slot(fleet_factory):
+    fleet = fleet_factory(hanging=["SLOW"])
+    scheduler = MultiHostScheduler(
+        ["SLOW", "FAST"], workers=1, timeout=0.2, backend=fleet.backend, connect=fleet.connect
+    )
+    tasks = scheduler.get_all_tasks()
+
+    # the slot of the timed out host is still held, so the other host never started.
+    assert fleet.peak == 1
+    assert tasks.height == 0
+    assert set(scheduler.errors) == {"SLOW", "FAST"}
+    assert "was not listed" in str(scheduler.errors["FAST"])
+
+    # once the hanging listing ends its slot is free again, for the later calls too.
+    fleet.released.set()
+    deadline = time.monotonic() + 5
+    while fleet.open and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.hosts = ["FAST"]
+    assert scheduler.get_all_tasks()["host"].unique().to_list() == ["FAST"]
+    assert scheduler.errors == {}
+
+def test_returns_when_every_slot_stays_held(fleet_factory):
+    hosts = [f"HOST{i}" for i in range(6)]
+    fleet = fleet_factory(hanging=hosts)
+    scheduler = MultiHostScheduler(
+        hosts, workers=2, timeout=0.2, backend=fleet.backend, connect=fleet.connect
+    )
+    started = time.monotonic()
+    tasks = scheduler.get_all_tasks()
+
+    assert time.monotonic() - started < 2
+    assert fleet.peak == 2
+    assert tasks.height == 0
+    assert set(scheduler.errors) == set(hosts)
+    assert all(isinstance(e, TimeoutError) for e in scheduler.errors.values())
@@ -0,0 +1,56 @@
+import pytest
+from datetime import date, time
+from pytask_scheduler import TaskScheduler, TaskSpec, MemoryBackend
+
+def spec(task_name, folder_name):
+    return TaskSpec(
+        task_name, folder_name, "daily", date(2024, 1, 1), time(1), "C:\\jobs\\run.exe",
+        days_interval=1
+    )
+
+@pytest.fixture
+def scheduler():
+    scheduler = TaskScheduler(backend=MemoryBackend(0, 0))
+    scheduler.root_folder.CreateFolder("ETL")
+    specs = [spec(f"job{i}", "ETL") for i in range(5)] + [spec("r1", "\\"), spec("r2", "\\")]
+    assert scheduler.reconcile(specs)["action"].to_list() == ["create"] * 7
+    return scheduler
+
+def task_paths(scheduler):
+    return set(scheduler.get_all_tasks()["task_path"])
+
+def test_reconcile_keeps_undesired_tasks_by_default(scheduler):
+    desired = [spec(f"job{i}", "ETL") for i in range(3)]
+    result = scheduler.reconcile(desired)
+
+    assert result["action"].to_list() == ["unchanged"] * 3
+    assert len(task_paths(scheduler)) == 7
+
+def test_reconcile_delete_skips_the_root_folder(scheduler):
+    desired = [spec(f"job{i}", "ETL") for i in range(3)] + [spec("r1", "\\")]
+    result = scheduler.reconcile(desired, delete=True)
+
+    assert result.filter(action="delete")["task_path"].to_list() == ["\\ETL\\job3", "\\ETL\\job4"]
+    assert "\\r2" in task_paths(scheduler)
+
+    result = scheduler.reconcile(desired, delete=["\\"])
+    assert result.filter(action="delete")["task_path"].to_list() == ["\\r2"]
+    assert task_paths(scheduler) == {"\\ETL\\job0", "\\ETL\\job1", "\\ETL\\job2", "\\r1"}
+
+def test_reconcile_refuses_ambiguous_folder_names():
+    scheduler = TaskScheduler(backend=MemoryBackend(30, 3, distinct_names=10))
+    before = task_paths(scheduler)
+    desired = [spec("Task0", "\\Folder3")]
+
+    with pytest.raises(ValueError, match="matches 3 folders"):
+        scheduler.reconcile(desired, delete=["Folder3"])
+    assert task_paths(scheduler) == before
+
+    result = scheduler.reconcile([spec("new", "Folder3")], delete=True)
+    assert result.rows() == [(None, "new", None, "create", "failed", result.item(0, "error"))]
+    assert task_paths(scheduler) == before
+
+    result = scheduler.reconcile(desired, delete=["\\Folder3"])
+    deleted = result.filter(action="delete")["task_path"].to_list()
+    assert deleted == ["\\Folder3\\Task1", "\\Folder3\\Task2"]
+    assert task_paths(scheduler) == before - set(deleted)
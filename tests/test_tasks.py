@@ -0,0 +1,23 @@
+import polars as pl
+from pytask_scheduler import TaskScheduler, TasksDataFrame, MemoryBackend
+from pytask_scheduler.objects.objects import TASK_COLUMNS
+
+def test_get_all_tasks_returns_tasks_data_frame():
+    scheduler = TaskScheduler(backend=MemoryBackend(20, 3))
+    tasks = scheduler.get_all_tasks()
+
+    assert isinstance(tasks, TasksDataFrame)
+    assert tasks.columns == TASK_COLUMNS
+    stats = tasks.stats()
+    assert stats.item(0, "task_total") == tasks.height == 63
+    assert stats.item(0, "missed_runs_total") == tasks["number_of_missed_runs"].sum()
+    assert tasks.stats(by="task_folder_name")["task_total"].sum() == tasks.height
+    assert isinstance(tasks.get_tasks_due_today(), TasksDataFrame)
+
+def test_get_all_tasks_sources_match():
+    scheduler = TaskScheduler(backend=MemoryBackend(20, 3))
+
+    assert scheduler.get_all_tasks().equals(scheduler.get_all_tasks(source="com"))
+    details = scheduler.get_all_tasks(details=True)
+    assert isinstance(details, TasksDataFrame)
+    assert details.schema["trigger_types"] == pl.List(pl.String)